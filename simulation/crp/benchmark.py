@@ -0,0 +1,321 @@
+# This file implements the benchmark harness that compares the routers across
+# topology sizes, packet counts and congestion profiles. Every case runs in a fresh
+# worker process so its peak memory is its own, and results are written as stable,
+# sorted JSON so two runs (e.g. two commits) can be diffed line by line or with
+# `compare_results`.
+
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from .experiments import derive_seed
+from .routing.dumb_router import find_path_dijkstra
+from .routing.cognitive_node import CompactCognitiveRouter
+from .topology import random_geometric
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then reported as nan.
+    resource = None
+
+# Congestion profiles: which links can congest, how often a traversal is congested,
+# and by how much its latency is multiplied.
+#   none:    no congestion
+#   hotspot: the middle link of the shortest gateway-to-gateway path, as in the
+#            reference scenario of run_cognitive_sim.py
+#   uniform: every link, rarely
+CONGESTION_PROFILES = {
+    'none': {'scope': None, 'chance': 0.0, 'multiplier': 1.0},
+    'hotspot': {'scope': 'path', 'chance': 0.4, 'multiplier': 10.0},
+    'uniform': {'scope': 'all', 'chance': 0.05, 'multiplier': 5.0},
+}
+
+ROUTERS = ('dijkstra', 'cognitive')
+
+# --- Default case parameters ---
+DEFAULT_CASE = {
+    'router': 'dijkstra',
+    'nodes': 1000,
+    'packets': 1000,
+    'congestion': 'hotspot',
+    'mean_degree': 10.0,
+    'reward_factor': 100.0,
+    'min_max_hops': 25,      # the hop limit is max(this, 4 x the shortest path's hop count)
+    'warmup_packets': 1000,  # untimed, uncounted packets a learning router routes first
+    'seed': 42,
+}
+
+# Metrics compared by `compare_results`, and whether higher is better.
+COMPARED_METRICS = {
+    'mean_latency': False,
+    'success_rate': True,
+    'packets_per_sec': True,
+    'peak_rss_mb': False,
+}
+
+def benchmark_matrix(nodes, packets, congestion=tuple(CONGESTION_PROFILES), routers=ROUTERS, seed: int = 42) -> list:
+    """Builds the case list for every combination of the given axes."""
+    return [{**DEFAULT_CASE, 'router': router, 'nodes': n, 'packets': p, 'congestion': c, 'seed': seed}
+            for n, p, c, router in itertools.product(nodes, packets, congestion, routers)]
+
+def run_case(case: dict) -> dict:
+    """
+    Runs one benchmark case on a random geometric mesh between its two gateways.
+
+    Both routers forward every packet hop by hop, drawing each hop's latency as
+    it is taken, and see the same topology and the same congestion draws for a
+    given seed. `dijkstra` looks the next hop up in a forwarding table built from
+    the shortest path (computed once, timed as part of the run). `cognitive`
+    chooses it with UCB1 over the compact topology (CompactCognitiveRouter, which
+    takes the same decisions as CognitiveNode with a UCB1Policy). As
+    TrafficSimulator does for per-destination CognitiveNodes, each finished packet
+    credits every decision on its path with `reward_factor / total latency` (0 if
+    it failed); the single destination makes the router's per-slot arms
+    per-destination state. It first routes `warmup_packets` untimed packets.
+
+    A learner that has never reached the destination has nothing to credit, so on
+    long paths (roughly 15+ hops) it can exhaust the warm-up and the measured
+    packets without a delivery; such cases report `delivered` 0 and a NaN
+    `mean_latency` rather than a latency.
+
+    Returns:
+        The case merged with its measurements:
+        - routable: whether the gateways are connected (every metric is NaN if not)
+        - mean_latency (ms, delivered packets), delivered and success_rate: routing quality
+        - build_s: topology generation time (not part of the routing cost)
+        - warmup_s: time spent routing warm-up packets (not part of the routing cost)
+        - route_s and packets_per_sec: routing cost
+        - path_hops and max_hops: hop count of the shortest path and the hop limit
+        - peak_rss_mb: peak resident memory of the process running the case
+    """
+    case = {**DEFAULT_CASE, **case}
+    profile = CONGESTION_PROFILES[case['congestion']]
+
+    started = time.perf_counter()
+    topology = random_geometric(case['nodes'], case['mean_degree'], seed=derive_seed(case['seed'], 'topology'))
+    build_s = time.perf_counter() - started
+
+    source_id, destination_id = topology.node_ids[0], topology.node_ids[1]
+    started = time.perf_counter()
+    path, _ = find_path_dijkstra(topology, source_id, destination_id)
+    dijkstra_s = time.perf_counter() - started
+    if path is None:
+        # The gateways landed in different components of the mesh.
+        return {**case, 'routable': False, 'mean_latency': math.nan, 'delivered': 0,
+                'success_rate': math.nan, 'build_s': build_s, 'warmup_s': math.nan, 'route_s': math.nan,
+                'packets_per_sec': math.nan, 'path_hops': -1, 'max_hops': -1, 'peak_rss_mb': _peak_rss_mb()}
+
+    path_indices = [topology.get_index(node_id) for node_id in path]
+    path_slots = [topology.find_slot(a, b) for a, b in zip(path_indices, path_indices[1:])]
+    max_hops = max(case['min_max_hops'], 4 * len(path_slots))
+    hot = _hot_slots(topology, path_indices, profile['scope'])
+    chance, multiplier = profile['chance'], profile['multiplier']
+    latency = topology.latency
+
+    def congestion(purpose):
+        """A link latency function with its own congestion draws."""
+        rng = random.Random(derive_seed(case['seed'], purpose))
+
+        def link_latency(slot):
+            if (hot is None or slot in hot) and chance and rng.random() < chance:
+                return latency[slot] * multiplier
+            return latency[slot]
+        return link_latency
+
+    warmup_s = 0.0
+    if case['router'] == 'dijkstra':
+        started = time.perf_counter()
+        latencies = _route_static(topology, path_indices, path_slots, case['packets'], congestion('congestion'))
+        route_s = dijkstra_s + time.perf_counter() - started
+    elif case['router'] == 'cognitive':
+        router = CompactCognitiveRouter(topology)
+        started = time.perf_counter()
+        _route_cognitive(router, path_indices[0], path_indices[-1], case['warmup_packets'], max_hops,
+                         case['reward_factor'], congestion('warmup'))
+        warmup_s = time.perf_counter() - started
+        started = time.perf_counter()
+        latencies = _route_cognitive(router, path_indices[0], path_indices[-1], case['packets'], max_hops,
+                                     case['reward_factor'], congestion('congestion'))
+        route_s = time.perf_counter() - started
+    else:
+        raise ValueError(f"Unknown router '{case['router']}'")
+
+    return {
+        **case,
+        'routable': True,
+        'mean_latency': math.fsum(latencies) / len(latencies) if latencies else math.nan,
+        'delivered': len(latencies),
+        'success_rate': len(latencies) / case['packets'],
+        'build_s': build_s,
+        'warmup_s': warmup_s,
+        'route_s': route_s,
+        'packets_per_sec': case['packets'] / route_s if route_s > 0 else math.nan,
+        'path_hops': len(path_slots),
+        'max_hops': max_hops,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def comparable_cases(results: list):
+    """
+    Splits results into cases where every router delivered packets, so their
+    latencies can be compared, and the rest, with the reason each one was left out.
+
+    Returns:
+        A tuple (comparable rows, [(row, reason), ...]).
+    """
+    delivered_everywhere = {}
+    for row in results:
+        key = (row['nodes'], row['packets'], row['congestion'])
+        delivered_everywhere[key] = delivered_everywhere.get(key, True) and row['delivered'] > 0
+    comparable, excluded = [], []
+    for row in results:
+        if delivered_everywhere[(row['nodes'], row['packets'], row['congestion'])]:
+            comparable.append(row)
+        elif not row['routable']:
+            excluded.append((row, "the gateways are not connected"))
+        elif row['delivered'] == 0:
+            excluded.append((row, f"no packet arrived within {row['max_hops']} hops after "
+                                  f"{row['warmup_packets']} warm-up packets ({row['path_hops']}-hop shortest path)"))
+        else:
+            excluded.append((row, "another router delivered no packets in this case"))
+    return comparable, excluded
+
+def run_benchmark(cases: list, processes: int = 1, case_fn=run_case) -> list:
+    """
+    Runs every case in its own fresh worker process (so peak RSS is per case) and
+    returns the results in case order. Keep `processes` at 1 for stable timings;
+    more workers finish sooner but contend for cores and memory bandwidth.
+    """
+    with multiprocessing.Pool(processes, maxtasksperchild=1) as pool:
+        return pool.map(case_fn, cases, chunksize=1)
+
+def environment() -> dict:
+    """Describes where the benchmark ran: commit, interpreter and machine."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+def write_results(results: list, path: str, meta: dict = None):
+    """
+    Writes results as JSON: an 'environment' object and one 'results' entry per
+    case, sorted by case key with sorted fields, so reruns diff cleanly.
+    NaN values are written as null.
+    """
+    rows = sorted(({k: _json_value(v) for k, v in row.items()} for row in results), key=_case_key)
+    document = {'environment': meta if meta is not None else environment(), 'results': rows}
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+def load_results(path: str) -> list:
+    with open(path) as f:
+        return json.load(f)['results']
+
+def compare_results(old: list, new: list, metrics=COMPARED_METRICS) -> list:
+    """
+    Matches cases present in both result lists and reports, per metric, the old
+    and new value, the relative change and whether it is a regression.
+    """
+    old_by_key = {_case_key(row): row for row in old}
+    rows = []
+    for row in new:
+        previous = old_by_key.get(_case_key(row))
+        if previous is None:
+            continue
+        for metric, higher_is_better in metrics.items():
+            before, after = previous.get(metric), row.get(metric)
+            if before is None or after is None or _is_nan(before) or _is_nan(after):
+                continue
+            change = (after - before) / before if before else math.nan
+            rows.append({'router': row['router'], 'nodes': row['nodes'], 'packets': row['packets'],
+                         'congestion': row['congestion'], 'metric': metric, 'old': before,
+                         'new': after, 'change': change,
+                         'regression': (change < 0) if higher_is_better else (change > 0)})
+    return rows
+
+
+# --- Internals ---
+
+def _route_static(topology, path_indices, path_slots, num_packets: int, link_latency) -> list:
+    """Forwards packets hop by hop through a next-hop table of the shortest path; returns their latencies."""
+    next_slot = dict(zip(path_indices, path_slots))
+    destination, neighbors = path_indices[-1], topology.neighbors
+    latencies = []
+    for _ in range(num_packets):
+        node, total = path_indices[0], 0.0
+        while node != destination:
+            slot = next_slot[node]
+            total += link_latency(slot)
+            node = neighbors[slot]
+        latencies.append(total)
+    return latencies
+
+def _route_cognitive(router, source: int, destination: int, num_packets: int, max_hops: int,
+                     reward_factor: float, link_latency) -> list:
+    """
+    Routes packets hop by hop with UCB1, crediting each finished packet's decisions
+    with `reward_factor / total latency` (0 on failure). Returns the latencies of
+    delivered packets.
+    """
+    choose, update, neighbors = router.choose_next_hop, router.update_reward, router.topology.neighbors
+    latencies = []
+    slots = []
+    for _ in range(num_packets):
+        node, prev, total, hops = source, -1, 0.0, 0
+        del slots[:]
+        while node != destination and hops <= max_hops:
+            slot = choose(node, prev)
+            if slot < 0:
+                break
+            slots.append(slot)
+            total += link_latency(slot)
+            prev, node = node, neighbors[slot]
+            hops += 1
+        reward = reward_factor / total if node == destination and total > 0 else 0.0
+        for slot in slots:
+            update(slot, reward)
+        if node == destination:
+            latencies.append(total)
+    return latencies
+
+def _hot_slots(topology, path_indices, scope):
+    """Edge slots that can congest: a set, or None for every link."""
+    if scope == 'all':
+        return None
+    if scope == 'path' and len(path_indices) > 1:
+        middle = (len(path_indices) - 2) // 2
+        a, b = path_indices[middle], path_indices[middle + 1]
+        return {topology.find_slot(a, b), topology.find_slot(b, a)}
+    return set()
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return math.nan
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _case_key(row: dict):
+    return (row['router'], row['nodes'], row['packets'], row['congestion'])
+
+def _is_nan(value) -> bool:
+    return isinstance(value, float) and math.isnan(value)
+
+def _json_value(value):
+    return None if _is_nan(value) else value
@@ -0,0 +1,234 @@
+# This file implements checkpoints of learned routing state: the bandit (or
+# Q-routing) tables of every learning node, the states of named random number
+# generators and the simulation clock, in a compact versioned binary file.
+# Restoring matches nodes, destinations and neighbors by ID, so a checkpoint can
+# warm-start a network whose topology has changed since it was taken.
+
+import struct
+import sys
+from array import array
+
+from .storage import StorageFormatError
+
+# --- Checkpoint file (.crpk) ---
+# Header, string table, RNG states, then one record per learned table:
+#   header   magic, version, reserved, clock f64, #strings u32, #rngs u32, #tables u32
+#   string   u32 byte length + UTF-8 bytes (node IDs, destinations, names)
+#   rng      name u32, version u32, #words u32, words u32[], has_gauss u8, gauss f64
+#   table    node u32, destination i32 (-1: shared), policy name u32, #arms u32,
+#            arm IDs u32[], #columns u16, #scalars u16, #sequences u16, then
+#            column:   name u32, typecode u8, values[#arms]
+#            scalar:   name u32, value f64
+#            sequence: name u32, typecode u8, count u64, values[count]
+# Strings are referenced by their index in the string table. All little-endian.
+CHECKPOINT_MAGIC = b'CRPK'
+CHECKPOINT_VERSION = 1
+_HEADER = struct.Struct('<4sHHdIII')
+_RNG_HEADER = struct.Struct('<III')
+_GAUSS = struct.Struct('<Bd')
+_TABLE_HEADER = struct.Struct('<IiII')
+_COUNTS = struct.Struct('<HHH')
+_COLUMN = struct.Struct('<IB')
+_SCALAR = struct.Struct('<Id')
+_SEQUENCE = struct.Struct('<IBQ')
+_U32 = struct.Struct('<I')
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+class Checkpoint:
+    """
+    A snapshot of everything a learning network needs to resume.
+
+    Attributes:
+        clock (float): The simulation time the snapshot was taken at.
+        rng_states (dict): RNG name -> state as returned by `Random.getstate()`.
+        tables (list): (node_id, destination_id, policy name, policy state) for
+            every learned table, in the format of `get_learned_state`.
+    """
+    def __init__(self, clock: float = 0.0, rng_states: dict = None, tables: list = None):
+        self.clock = clock
+        self.rng_states = rng_states if rng_states is not None else {}
+        self.tables = tables if tables is not None else []
+
+    @classmethod
+    def capture(cls, network, clock: float = 0.0, rngs: dict = None) -> 'Checkpoint':
+        """
+        Snapshots every node of `network` that has learned state (CognitiveNode,
+        QRoutingNode) together with the generators its policies or Q-routing
+        draws from, the simulation clock, and the RNGs in `rngs` (name -> an
+        object with getstate(), e.g. a random.Random or the random module).
+        """
+        tables = []
+        for node_id, node in network.nodes.items():
+            if hasattr(node, 'get_learned_state'):
+                for destination_id, policy_name, state in node.get_learned_state():
+                    tables.append((node_id, destination_id, policy_name, state))
+        rng_states = {name: rng.getstate() for name, rng in (rngs or {}).items()}
+        return cls(clock, rng_states, tables)
+
+    def restore(self, network, rngs: dict = None, scheduler=None) -> dict:
+        """
+        Loads the snapshot into `network`, the RNGs in `rngs` (name -> an object
+        with setstate()) and, if given, an EventScheduler with no pending events.
+
+        Nodes, destinations and neighbors are matched by ID. State for nodes or
+        destinations that no longer exist is skipped; new nodes and new neighbors
+        keep their fresh state.
+
+        Returns:
+            A report with counts of nodes restored, nodes missing from the network,
+            learning nodes absent from the checkpoint, arms restored and tables skipped.
+        """
+        if scheduler is not None:
+            if scheduler.pending():
+                raise ValueError("Restore the clock before any events are scheduled")
+            scheduler.now = self.clock
+        for name, rng in (rngs or {}).items():
+            if name in self.rng_states:
+                rng.setstate(self.rng_states[name])
+
+        by_node = {}
+        for node_id, destination_id, policy_name, state in self.tables:
+            by_node.setdefault(node_id, []).append((destination_id, policy_name, state))
+
+        report = {'nodes_restored': 0, 'nodes_missing': 0, 'nodes_new': 0, 'arms_restored': 0, 'tables_skipped': 0}
+        nodes = network.nodes
+        for node_id, tables in by_node.items():
+            node = nodes.get(node_id)
+            if node is None or not hasattr(node, 'set_learned_state'):
+                report['nodes_missing'] += 1
+                continue
+            usable = [table for table in tables if table[0] is None or table[0] in nodes]
+            report['tables_skipped'] += len(tables) - len(usable)
+            report['arms_restored'] += node.set_learned_state(usable)
+            report['nodes_restored'] += 1
+        report['nodes_new'] = sum(1 for node_id, node in nodes.items()
+                                  if hasattr(node, 'set_learned_state') and node_id not in by_node)
+        return report
+
+    def __repr__(self):
+        return f"Checkpoint(clock={self.clock}, tables={len(self.tables)}, rngs={len(self.rng_states)})"
+
+
+def save_checkpoint(checkpoint: Checkpoint, path: str):
+    """Writes a checkpoint to a binary checkpoint file."""
+    strings = _StringTable()
+    body = bytearray()
+
+    for name, (version, words, gauss) in checkpoint.rng_states.items():
+        body += _RNG_HEADER.pack(strings.ref(name), version, len(words))
+        body += _little_endian(array('I', words))
+        body += _GAUSS.pack(gauss is not None, gauss or 0.0)
+
+    for node_id, destination_id, policy_name, state in checkpoint.tables:
+        arms, columns = state['arms'], state['columns']
+        scalars, sequences = state['scalars'], state['sequences']
+        body += _TABLE_HEADER.pack(strings.ref(node_id),
+                                   -1 if destination_id is None else strings.ref(destination_id),
+                                   strings.ref(policy_name), len(arms))
+        body += _little_endian(array('I', (strings.ref(arm_id) for arm_id in arms)))
+        body += _COUNTS.pack(len(columns), len(scalars), len(sequences))
+        for name, column in columns.items():
+            body += _COLUMN.pack(strings.ref(name), ord(column.typecode))
+            body += _little_endian(column)
+        for name, value in scalars.items():
+            body += _SCALAR.pack(strings.ref(name), value)
+        for name, sequence in sequences.items():
+            body += _SEQUENCE.pack(strings.ref(name), ord(sequence.typecode), len(sequence))
+            body += _little_endian(sequence)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, 0, checkpoint.clock,
+                             len(strings.values), len(checkpoint.rng_states), len(checkpoint.tables)))
+        for value in strings.values:
+            raw = value.encode()
+            f.write(_U32.pack(len(raw)))
+            f.write(raw)
+        f.write(body)
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """Reads a binary checkpoint file."""
+    with open(path, 'rb') as f:
+        reader = _Reader(f.read())
+    magic, version, _, clock, num_strings, num_rngs, num_tables = reader.unpack(_HEADER)
+    if magic != CHECKPOINT_MAGIC:
+        raise StorageFormatError(f"{path} is not a {CHECKPOINT_MAGIC.decode()} file")
+    if version > CHECKPOINT_VERSION:
+        raise StorageFormatError(f"{path} uses format version {version}; "
+                                 f"this reader supports up to {CHECKPOINT_VERSION}")
+
+    strings = [reader.bytes(reader.unpack(_U32)[0]).decode() for _ in range(num_strings)]
+
+    rng_states = {}
+    for _ in range(num_rngs):
+        name, rng_version, num_words = reader.unpack(_RNG_HEADER)
+        words = tuple(reader.array('I', num_words))
+        has_gauss, gauss = reader.unpack(_GAUSS)
+        rng_states[strings[name]] = (rng_version, words, gauss if has_gauss else None)
+
+    tables = []
+    for _ in range(num_tables):
+        node, destination, policy_name, num_arms = reader.unpack(_TABLE_HEADER)
+        arms = [strings[i] for i in reader.array('I', num_arms)]
+        num_columns, num_scalars, num_sequences = reader.unpack(_COUNTS)
+        columns, scalars, sequences = {}, {}, {}
+        for _ in range(num_columns):
+            name, typecode = reader.unpack(_COLUMN)
+            columns[strings[name]] = reader.array(chr(typecode), num_arms)
+        for _ in range(num_scalars):
+            name, value = reader.unpack(_SCALAR)
+            scalars[strings[name]] = value
+        for _ in range(num_sequences):
+            name, typecode, count = reader.unpack(_SEQUENCE)
+            sequences[strings[name]] = reader.array(chr(typecode), count)
+        state = {'arms': arms, 'columns': columns, 'scalars': scalars, 'sequences': sequences}
+        tables.append((strings[node], None if destination < 0 else strings[destination],
+                       strings[policy_name], state))
+    return Checkpoint(clock, rng_states, tables)
+
+
+# --- Internals ---
+
+class _StringTable:
+    """Assigns each distinct string an index in first-use order."""
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def ref(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+class _Reader:
+    """Sequential reader over the bytes of a checkpoint file."""
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    def bytes(self, size: int) -> bytes:
+        end = self.position + size
+        if end > len(self.data):
+            raise StorageFormatError("File is truncated")
+        raw = self.data[self.position:end]
+        self.position = end
+        return raw
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        return layout.unpack(self.bytes(layout.size))
+
+    def array(self, typecode: str, count: int) -> array:
+        values = array(typecode)
+        values.frombytes(self.bytes(values.itemsize * count))
+        if not _NATIVE_LITTLE_ENDIAN and values.itemsize > 1:
+            values.byteswap()
+        return values
+
+def _little_endian(values: array) -> bytes:
+    if not _NATIVE_LITTLE_ENDIAN and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
@@ -0,0 +1,328 @@
+# This file implements the live routing daemon: every CognitiveNode runs as an
+# asyncio datagram endpoint on a loopback UDP socket and forwards real Packet
+# messages using the same choose_next_hop / update_reward logic as the simulator.
+# Many nodes can share one event loop, or the node set can be split over several
+# processes on one host that all agree on the same port directory.
+
+import asyncio
+import socket
+import struct
+import time
+from collections import deque
+
+from .network.packet import Packet
+
+# --- Wire format ---
+# Every datagram is a fixed header followed by NUL-separated UTF-8 strings.
+#   DATA:   packet in flight. strings = source, destination, *path_taken
+#   ACK:    hop acknowledgement sent straight back to the previous hop.
+#           strings = acknowledging node ID; echo_ns = the DATA's send time
+#   INJECT: ask a node to originate a packet. strings = source, destination
+#   REPORT: delivery/failure notice to a collector. strings = source, destination, *path
+MSG_DATA = 0
+MSG_ACK = 1
+MSG_INJECT = 2
+MSG_REPORT = 3
+
+_HEADER = struct.Struct('<BBQqd')  # kind, delivered flag, packet_id, echo_ns, total_latency
+
+# Loopback bursts overflow the default socket receive buffer; ask for more (the
+# kernel caps the request at net.core.rmem_max).
+RECEIVE_BUFFER_BYTES = 4 * 1024 * 1024
+
+def encode_message(kind: int, packet_id: int, echo_ns: int, total_latency: float, strings, delivered: bool = False) -> bytes:
+    return _HEADER.pack(kind, delivered, packet_id, echo_ns, total_latency) + '\0'.join(strings).encode()
+
+def decode_message(data: bytes):
+    """Returns (kind, delivered, packet_id, echo_ns, total_latency, strings)."""
+    kind, delivered, packet_id, echo_ns, total_latency = _HEADER.unpack_from(data)
+    body = data[_HEADER.size:]
+    strings = body.decode().split('\0') if body else []
+    return kind, bool(delivered), packet_id, echo_ns, total_latency, strings
+
+def port_directory(node_ids, base_port: int, host: str = '127.0.0.1') -> dict:
+    """Assigns consecutive ports to nodes in sorted ID order, so processes agree without talking."""
+    return {node_id: (host, base_port + i) for i, node_id in enumerate(sorted(node_ids))}
+
+async def _wait_for_completions(counter, count: int, timeout: float = None) -> bool:
+    """Waits until `counter.completed` reaches `count`, waking on `counter._idle`. False on timeout."""
+    async def wait():
+        while counter.completed < count:
+            counter._idle.clear()
+            await counter._idle.wait()
+    try:
+        await asyncio.wait_for(wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+class NodeDaemon(asyncio.DatagramProtocol):
+    """
+    The runtime of one CognitiveNode on its own UDP socket.
+
+    On every DATA packet the daemon acknowledges the hop, records the one-way hop
+    latency (both ends share CLOCK_MONOTONIC on one host), and either delivers the
+    packet or forwards it to `node.choose_next_hop`. When the ACK for a forwarded
+    packet returns, the measured round-trip time becomes the reward
+    `reward_factor / rtt_ms` for that neighbor. ACKs return in any order, so the
+    selection probability of a decision (EXP3 policies) is kept per (packet,
+    neighbor) until its ACK arrives. UDP can lose either datagram, so a
+    probability whose ACK has not come back within `ack_timeout` seconds is
+    dropped; a later ACK is then rewarded without it.
+
+    With `emulate_latency`, each send is delayed by the link's configured latency
+    so learning sees the modelled topology rather than raw loopback timings.
+    """
+    def __init__(self, node, directory: dict, reward_factor: float = 100.0, max_hops: int = 25,
+                 emulate_latency: bool = True, on_complete=None, report_addr=None, ack_timeout: float = 5.0):
+        self.node = node
+        self.directory = directory
+        self.reward_factor = reward_factor
+        self.max_hops = max_hops
+        self.emulate_latency = emulate_latency
+        self.on_complete = on_complete
+        self.report_addr = report_addr
+        self.transport = None
+        self.ack_timeout = ack_timeout
+        # (packet_id, neighbor_id) -> (selection probability, send time in ns) of a decision awaiting its ACK
+        self._probabilities = {}
+        # The same keys with their send times, oldest first, for expiry
+        self._sent = deque()
+        self.stats = {'decisions': 0, 'forwarded': 0, 'delivered': 0, 'failed': 0, 'acks': 0, 'decision_ns': 0,
+                      'expired_acks': 0}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        kind, _, packet_id, echo_ns, total_latency, strings = decode_message(data)
+        if kind == MSG_DATA:
+            now = time.monotonic_ns()
+            self.transport.sendto(encode_message(MSG_ACK, packet_id, echo_ns, 0.0, [self.node.node_id]), addr)
+            packet = Packet(packet_id, strings[0], strings[1])
+            packet.path_taken = strings[2:]
+            packet.total_latency = total_latency
+            packet.log_hop(self.node.node_id, (now - echo_ns) / 1e6)
+            self.handle(packet)
+        elif kind == MSG_ACK:
+            rtt_ms = (time.monotonic_ns() - echo_ns) / 1e6
+            self.stats['acks'] += 1
+            pending = self._probabilities.pop((packet_id, strings[0]), None)
+            self.node.update_reward(strings[0], self.reward_factor / max(rtt_ms, 1e-6),
+                                    probability=pending[0] if pending is not None else None)
+        elif kind == MSG_INJECT:
+            self.handle(Packet(packet_id, strings[0], strings[1]))
+
+    def handle(self, packet: Packet):
+        """Delivers a packet that has reached its destination or forwards it one hop."""
+        if packet.destination_id == self.node.node_id:
+            self._complete(packet, True)
+            return
+        hops = len(packet.path_taken) - 1
+        if hops > self.max_hops:
+            self._complete(packet, False)
+            return
+
+        started = time.perf_counter_ns()
+        next_node_id = self.node.choose_next_hop(packet.path_taken[-2] if hops else None)
+        self.stats['decision_ns'] += time.perf_counter_ns() - started
+        self.stats['decisions'] += 1
+        if next_node_id is None:
+            self._complete(packet, False)
+            return
+        sent_ns = time.monotonic_ns()
+        if self._sent:
+            self._expire_probabilities(sent_ns)
+        probability = getattr(self.node, 'selection_probability', None)
+        if probability is not None:
+            key = (packet.packet_id, next_node_id)
+            self._probabilities[key] = (probability, sent_ns)
+            self._sent.append((sent_ns, key))
+
+        self.stats['forwarded'] += 1
+        message = encode_message(MSG_DATA, packet.packet_id, sent_ns, packet.total_latency,
+                                 [packet.source_id, packet.destination_id, *packet.path_taken])
+        address = self.directory[next_node_id]
+        if self.emulate_latency:
+            delay = self.node.neighbors[next_node_id]['latency'] / 1000.0
+            asyncio.get_running_loop().call_later(delay, self.transport.sendto, message, address)
+        else:
+            self.transport.sendto(message, address)
+
+    def _expire_probabilities(self, now_ns: int):
+        """Drops the selection probabilities whose ACK is overdue, oldest first."""
+        deadline = now_ns - self.ack_timeout * 1e9
+        sent, probabilities = self._sent, self._probabilities
+        while sent and sent[0][0] < deadline:
+            sent_ns, key = sent.popleft()
+            pending = probabilities.get(key)
+            # The key may have been ACKed, or reused by a later decision since.
+            if pending is not None and pending[1] == sent_ns:
+                del probabilities[key]
+                self.stats['expired_acks'] += 1
+
+    def _complete(self, packet: Packet, success: bool):
+        self.stats['delivered' if success else 'failed'] += 1
+        if self.on_complete is not None:
+            self.on_complete(packet, success)
+        if self.report_addr is not None:
+            self.transport.sendto(encode_message(MSG_REPORT, packet.packet_id, 0, packet.total_latency,
+                                                 [packet.source_id, packet.destination_id, *packet.path_taken],
+                                                 delivered=success), self.report_addr)
+
+
+class LoopbackCluster:
+    """
+    Runs a set of CognitiveNodes from a Network as NodeDaemons in the current event loop.
+
+    With `base_port=0` every node binds an ephemeral port (single-process use).
+    With a fixed `base_port`, ports come from `port_directory` over all nodes of the
+    network, so several processes can each serve a subset (`node_ids`) and still
+    reach each other.
+    """
+    def __init__(self, network, node_ids=None, host: str = '127.0.0.1', base_port: int = 0,
+                 reward_factor: float = 100.0, max_hops: int = 25, emulate_latency: bool = True,
+                 report_addr=None):
+        self.network = network
+        self.node_ids = list(node_ids) if node_ids is not None else list(network.nodes)
+        self.host = host
+        self.base_port = base_port
+        self.daemon_options = dict(reward_factor=reward_factor, max_hops=max_hops,
+                                   emulate_latency=emulate_latency, report_addr=report_addr)
+        self.directory = port_directory(network.nodes, base_port, host) if base_port else {}
+        self.daemons = {}
+        self.completed = 0
+        self.delivered = 0
+        self.latency_total = 0.0
+        self._packet_ids = 0
+        self._idle = None
+
+    async def start(self):
+        """Binds one UDP endpoint per served node."""
+        loop = asyncio.get_running_loop()
+        self._idle = asyncio.Event()
+        for node_id in self.node_ids:
+            daemon = NodeDaemon(self.network.get_node(node_id), self.directory,
+                                on_complete=self._on_complete, **self.daemon_options)
+            local_addr = self.directory.get(node_id, (self.host, 0))
+            transport, _ = await loop.create_datagram_endpoint(lambda d=daemon: d, local_addr=local_addr)
+            transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+            self.directory[node_id] = transport.get_extra_info('sockname')[:2]
+            self.daemons[node_id] = daemon
+
+    def inject(self, source_id: str, destination_id: str) -> int:
+        """Originates a packet at a locally served node. Returns its packet ID."""
+        self._packet_ids += 1
+        self._idle.clear()
+        self.daemons[source_id].handle(Packet(self._packet_ids, source_id, destination_id))
+        return self._packet_ids
+
+    async def wait_for(self, count: int, timeout: float = None) -> bool:
+        """
+        Waits until at least `count` packets have been delivered or failed here.
+        Returns False on timeout: UDP gives no delivery guarantee, so datagrams
+        lost in transit never complete.
+        """
+        return await _wait_for_completions(self, count, timeout)
+
+    def decision_stats(self) -> dict:
+        """Total forwarding decisions and the mean time spent choosing a next hop."""
+        decisions = sum(d.stats['decisions'] for d in self.daemons.values())
+        decision_ns = sum(d.stats['decision_ns'] for d in self.daemons.values())
+        return {'decisions': decisions, 'ns_per_decision': decision_ns / decisions if decisions else 0.0}
+
+    def close(self):
+        for daemon in self.daemons.values():
+            if daemon.transport is not None:
+                daemon.transport.close()
+
+    def _on_complete(self, packet: Packet, success: bool):
+        self.completed += 1
+        if success:
+            self.delivered += 1
+            self.latency_total += packet.total_latency
+        self._idle.set()
+
+
+class ReportCollector(asyncio.DatagramProtocol):
+    """
+    The driver of a multi-process run: originates packets at remote nodes with
+    INJECT messages and counts the REPORT notices that NodeDaemons send to their
+    `report_addr` when a packet is delivered or fails.
+
+    Start it before the `serve_nodes` processes and hand them its `address` as
+    `report_addr`; `directory` is the same `port_directory` they serve on.
+    """
+    def __init__(self, directory: dict):
+        self.directory = directory
+        self.transport = None
+        self.completed = 0
+        self.delivered = 0
+        self.latency_total = 0.0
+        self._packet_ids = 0
+        self._idle = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0):
+        """Binds the collector's UDP endpoint (an ephemeral port by default)."""
+        self._idle = asyncio.Event()
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+
+    @property
+    def address(self):
+        """The (host, port) to pass as `report_addr`."""
+        return self.transport.get_extra_info('sockname')[:2]
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        kind, delivered, _, _, total_latency, _ = decode_message(data)
+        if kind != MSG_REPORT:
+            return
+        self.completed += 1
+        if delivered:
+            self.delivered += 1
+            self.latency_total += total_latency
+        self._idle.set()
+
+    def inject(self, source_id: str, destination_id: str) -> int:
+        """Asks the (possibly remote) daemon of `source_id` to originate a packet. Returns its packet ID."""
+        self._packet_ids += 1
+        self._idle.clear()
+        self.transport.sendto(encode_message(MSG_INJECT, self._packet_ids, 0, 0.0, [source_id, destination_id]),
+                              self.directory[source_id])
+        return self._packet_ids
+
+    async def wait_for(self, count: int, timeout: float = None) -> bool:
+        """Waits until `count` REPORTs have arrived. Returns False on timeout, as in LoopbackCluster."""
+        return await _wait_for_completions(self, count, timeout)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+
+def serve_nodes(network_factory, node_ids, base_port: int, duration: float, host: str = '127.0.0.1',
+                report_addr=None, ready=None, **options):
+    """
+    Process entry point: builds the network with `network_factory()` and serves
+    `node_ids` on their directory ports for `duration` seconds.
+
+    Start one such process per node subset (e.g. with multiprocessing) to spread
+    a topology over several cores; completion notices go to `report_addr`,
+    typically a ReportCollector. `ready` (e.g. a multiprocessing.Event) is set
+    once every served node is bound, so the driver knows when to inject.
+    """
+    async def main():
+        cluster = LoopbackCluster(network_factory(), node_ids, host, base_port,
+                                  report_addr=report_addr, **options)
+        await cluster.start()
+        if ready is not None:
+            ready.set()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            cluster.close()
+    asyncio.run(main())
@@ -0,0 +1,544 @@
+# This file implements the discrete-event engine that drives packets through a Network.
+# Events are kept in a single time-ordered binary heap, so any number of packets can
+# be in flight at once and contend for the same links.
+
+import heapq
+import itertools
+
+from .network.link import Link
+from .network.packet import Packet, PacketPool
+from .routing.dumb_router import find_path_dijkstra
+from .routing.dynamic_router import DynamicShortestPathTree
+from .routing.route_cache import RouteCache
+
+# --- Built-in event kinds ---
+# Kinds are small integers so the dispatch loop can index a plain list of handlers.
+PACKET_INJECT = 0
+HOP_ARRIVAL = 1
+LINK_FREE = 2
+CONGESTION_CHANGE = 3
+TRACE_REPLAY = 4
+METRICS_SNAPSHOT = 5
+WORKLOAD_ARRIVAL = 6
+SHARD_MESSAGE = 7
+
+
+# --- Node roles ---
+# How the simulator treats a node's hops, looked up once per node (see _role).
+_NO_FEEDBACK = 0
+_HOP_REWARD = 1     # update_reward after every hop (CognitiveNode)
+_PATH_CREDIT = 2    # update_reward once the packet finishes (per-destination CognitiveNode)
+_ESTIMATE = 3       # update_estimate after every hop (QRoutingNode)
+
+
+def _back_step(packet: Packet, node_id: str):
+    """
+    The node that first forwarded a packet to `node_id`, or None at its source.
+    A per-destination packet stuck there returns to it and searches on depth
+    first, instead of failing at the first cul-de-sac. `packet.visited` holds
+    the path index of the node's first decision, so this is O(1).
+    """
+    index = packet.visited[node_id]
+    return packet.path_taken[index - 1] if index else None
+
+def _path_indices(path: list):
+    """The first and the last path index of every node on a path, in one pass."""
+    first, last = {}, {}
+    for index, node_id in enumerate(path):
+        if node_id not in first:
+            first[node_id] = index
+        last[node_id] = index
+    return first, last
+
+def _decision_reward(path: list, index: int, reward: float, first: dict, last: dict):
+    """
+    The credit of the hop from path[index] of a finished packet: None for a
+    back-step (not a decision of the policy), 0 for a decision the packet later
+    had to back out of, and `reward` for the decisions on the route it kept.
+    `first` and `last` come from `_path_indices(path)`.
+    """
+    if first[path[index + 1]] <= index:
+        return None
+    return 0.0 if last[path[index]] > index + 1 else reward
+
+def _probability_at(probabilities: list, index: int):
+    """The selection probability recorded for the decision at path index `index`, if any."""
+    if probabilities is None or index >= len(probabilities):
+        return None
+    return probabilities[index]
+
+class EventScheduler:
+    """
+    A heap-based discrete-event scheduler.
+
+    Events are stored as (time, sequence, kind, payload) tuples. The sequence number
+    breaks ties between events scheduled for the same instant, so events at equal
+    times are dispatched in the order they were scheduled (FIFO) and payloads are
+    never compared.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self.events_processed = 0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._handlers = []
+
+    def register(self, kind: int, handler):
+        """Registers the callable invoked as handler(payload) for events of a given kind."""
+        if kind >= len(self._handlers):
+            self._handlers.extend([None] * (kind + 1 - len(self._handlers)))
+        self._handlers[kind] = handler
+
+    def schedule(self, delay: float, kind: int, payload=None):
+        """Schedules an event `delay` time units after the current simulation time."""
+        heapq.heappush(self._queue, (self.now + delay, next(self._sequence), kind, payload))
+
+    def schedule_at(self, time: float, kind: int, payload=None):
+        """Schedules an event at an absolute simulation time."""
+        if time < self.now:
+            raise ValueError(f"Cannot schedule an event in the past (t={time} < now={self.now})")
+        heapq.heappush(self._queue, (time, next(self._sequence), kind, payload))
+
+    def pending(self) -> int:
+        """Returns the number of events still waiting in the queue."""
+        return len(self._queue)
+
+    def next_time(self) -> float:
+        """Returns the time of the earliest pending event, or inf if there is none."""
+        return self._queue[0][0] if self._queue else float('inf')
+
+    def run(self, until: float = None, max_events: int = None) -> int:
+        """
+        Dispatches events in time order until the queue is empty, the next event lies
+        beyond `until`, or `max_events` events have been processed.
+
+        Returns:
+            The number of events dispatched by this call.
+        """
+        # Local bindings keep the hot loop free of attribute lookups.
+        queue = self._queue
+        handlers = self._handlers
+        pop = heapq.heappop
+        horizon = float('inf') if until is None else until
+        budget = -1 if max_events is None else max_events
+        processed = 0
+
+        while queue and processed != budget:
+            if queue[0][0] > horizon:
+                break
+            time, _, kind, payload = pop(queue)
+            self.now = time
+            handlers[kind](payload)
+            processed += 1
+
+        if until is not None and self.now < until and (not queue or queue[0][0] > until):
+            self.now = until
+        self.events_processed += processed
+        return processed
+
+
+class TrafficSimulator:
+    """
+    Drives many concurrent packets through a Network on top of an EventScheduler.
+
+    Nodes that implement `choose_next_hop` (CognitiveNode) decide every hop on arrival
+    and receive a reward when the hop completes (none for a zero-latency hop, whose
+    reward would be unbounded). When a node reports the `selection_probability`
+    of its choice (EXP3 policies), it is kept on the packet and handed back with
+    that decision's reward, however late or out of order the reward arrives. Plain nodes follow the static
+    shortest path computed by `find_path_dijkstra` at injection time.
+
+    With `adaptive_routing`, plain nodes instead follow the shortest path under the
+    current congestion multipliers: every source keeps a DynamicShortestPathTree
+    that is repaired on each congestion change, and a packet takes the tree's path
+    at injection time. This is the adaptive Dijkstra baseline (it sees scripted
+    congestion, not the queueing that emerges under the bandwidth model).
+
+    With a `route_cache`, static paths are kept in it (LRU, within its budget), and
+    learned routes of delivered cognitive packets that the nodes trust are cached
+    per (source, destination) flow: later packets of the flow follow the cached
+    route without per-hop decisions, while every hop still feeds its reward back.
+    Congestion changes invalidate the cached learned routes crossing the affected
+    link; static paths do not depend on congestion and stay cached.
+
+    Nodes with `routes_per_destination` (QRoutingNode) are also given the packet's
+    destination and the set of nodes it has visited when choosing a hop. After each hop a
+    QRoutingNode receives the next node's remaining-latency estimate, while a
+    per-destination CognitiveNode is rewarded once the packet completes, with
+    reward_factor / end-to-end latency for every hop it chose (0 if the packet failed).
+    A packet stuck at such a node (every onward neighbor visited) steps back to
+    the node that first forwarded it there and searches on, depth first, until
+    it arrives or exceeds `max_hops`; the decision that led into the dead end
+    is fed back as one (QRoutingNode: penalty, CognitiveNode: reward 0).
+
+    Each directed link is a FIFO server (see `Link`): a packet occupies the link
+    for its service time before the next queued packet may start, which is what
+    lets queueing and contention emerge when many packets are in flight.
+
+    - With `bandwidth_model` enabled the service time is the serialization delay
+      of the packet's size over the link's bandwidth, and a link's buffer holds at
+      most `buffer_size` waiting packets; packets arriving at a full buffer are
+      dropped. Congestion then emerges from the offered load.
+    - Otherwise every packet takes the fixed `service_time`. With the default of 0
+      links never block and packets only pay latency.
+
+    With a `packet_pool`, packets are drawn from it and released back to it once
+    their completion callbacks have run, so a long run reuses a bounded set of
+    Packet objects instead of allocating one per packet.
+    """
+    def __init__(self, network, scheduler: EventScheduler = None, latency_fn=None,
+                 reward_factor: float = 100.0, max_hops: int = 25, service_time: float = 0.0,
+                 bandwidth_model: bool = False, buffer_size: int = None, packet_size: int = 1500,
+                 route_cache: RouteCache = None, packet_pool: PacketPool = None, adaptive_routing: bool = False):
+        self.network = network
+        self.scheduler = scheduler or EventScheduler()
+        self.latency_fn = latency_fn or self.congested_latency
+        self.reward_factor = reward_factor
+        self.max_hops = max_hops
+        self.service_time = service_time
+        self.bandwidth_model = bandwidth_model
+        self.buffer_size = buffer_size
+        self.packet_size = packet_size
+        self.route_cache = route_cache
+        self.packet_pool = packet_pool
+        self.adaptive_routing = adaptive_routing
+
+        # Link state is keyed by the directed (from_id, to_id) pair.
+        self.congestion = {}
+        self.links = {}
+        self._static_paths = {}
+        # node_id -> (node, decides, routes per destination, feedback role); see _role
+        self._roles = {}
+        # Adaptive routing: source_id -> DynamicShortestPathTree under the current congestion
+        self._trees = {}
+        self._packet_ids = itertools.count()
+        self.completion_callbacks = []
+        # Whether finished packets credit per-destination bandit decisions (see _credit_path).
+        self._credits_paths = any(getattr(node, 'routes_per_destination', False) and hasattr(node, 'update_reward')
+                                  for node in network.nodes.values())
+
+        self.stats = {'injected': 0, 'delivered': 0, 'failed': 0, 'dropped': 0,
+                      'total_latency': 0.0, 'hops': 0}
+
+        self.scheduler.register(PACKET_INJECT, self._on_inject)
+        self.scheduler.register(HOP_ARRIVAL, self._on_hop_arrival)
+        self.scheduler.register(LINK_FREE, self._on_link_free)
+        self.scheduler.register(CONGESTION_CHANGE, self._on_congestion_change)
+
+    # --- Public API ---
+
+    def inject(self, source_id: str, destination_id: str, at: float = None, size: int = None) -> int:
+        """
+        Creates a packet of `size` bytes (default: the simulator's packet size) and
+        schedules its injection at `at` (default: now). The packet's creation time
+        is its injection time on the simulation clock.
+
+        Returns:
+            The new packet's ID. The Packet itself belongs to the simulator (with a
+            `packet_pool` it is reused once it finishes), so results are read in a
+            completion callback or from a PacketStore, matched by this ID.
+        """
+        size = self.packet_size if size is None else size
+        created = self.scheduler.now if at is None else at
+        if self.packet_pool is None:
+            packet = Packet(next(self._packet_ids), source_id, destination_id, size, created)
+        else:
+            packet = self.packet_pool.acquire(next(self._packet_ids), source_id, destination_id, size, created)
+        if at is None:
+            self.scheduler.schedule(0.0, PACKET_INJECT, packet)
+        else:
+            self.scheduler.schedule_at(at, PACKET_INJECT, packet)
+        return packet.packet_id
+
+    def set_congestion(self, node_a_id: str, node_b_id: str, multiplier: float, at: float = None):
+        """Schedules a change of the latency multiplier on the link between two nodes."""
+        payload = (node_a_id, node_b_id, multiplier)
+        if at is None:
+            self.scheduler.schedule(0.0, CONGESTION_CHANGE, payload)
+        else:
+            self.scheduler.schedule_at(at, CONGESTION_CHANGE, payload)
+
+    def run(self, until: float = None, max_events: int = None) -> int:
+        """Runs the underlying scheduler. See EventScheduler.run."""
+        return self.scheduler.run(until, max_events)
+
+    def get_link(self, from_id: str, to_id: str) -> Link:
+        """Returns the queue state of a directed link, creating it on first use."""
+        link = self.links.get((from_id, to_id))
+        if link is None:
+            bandwidth = self.network.get_node(from_id).neighbors[to_id]['bandwidth']
+            link = self.links[(from_id, to_id)] = Link(from_id, to_id, bandwidth, self.buffer_size)
+        return link
+
+    def congested_latency(self, node, neighbor_id: str) -> float:
+        """Default latency model: the link's base latency times its current congestion multiplier."""
+        base_latency = node.neighbors[neighbor_id]['latency']
+        return base_latency * self.congestion.get((node.node_id, neighbor_id), 1.0)
+
+    # --- Event handlers ---
+
+    def _on_inject(self, packet: Packet):
+        self.stats['injected'] += 1
+        role = self._roles.get(packet.source_id) or self._role(packet.source_id)
+        if role is None:
+            self._finish(packet, False)
+            return
+        if not role[1]:
+            packet.route = self._static_path(packet.source_id, packet.destination_id)
+        elif self.route_cache is not None:
+            packet.route = self.route_cache.get(packet.source_id, packet.destination_id)
+        self._forward(packet, role)
+
+    def _on_hop_arrival(self, packet: Packet):
+        from_id, to_id, latency = packet.current_location_id, packet.next_hop_id, packet.hop_latency
+        # Packet.log_hop, inlined on the hottest path.
+        packet.current_location_id = to_id
+        packet.path_taken.append(to_id)
+        packet.total_latency += latency
+        self.stats['hops'] += 1
+        roles = self._roles
+        to_role = roles.get(to_id) or self._role(to_id)
+        from_role = roles.get(from_id) or self._role(from_id)
+        if from_role is None:
+            self._remote_hop_feedback(packet, from_id, to_role[0], latency)
+        else:
+            feedback = from_role[3]
+            if feedback == _HOP_REWARD:
+                if latency > 0:
+                    probabilities = packet.selection_probabilities
+                    if probabilities is None:
+                        from_role[0].update_reward(to_id, self.reward_factor / latency)
+                    else:
+                        from_role[0].update_reward(to_id, self.reward_factor / latency,
+                                                   probability=_probability_at(probabilities,
+                                                                               len(packet.path_taken) - 2))
+            elif feedback == _ESTIMATE:
+                remaining = self._hop_remaining(packet, to_role[0])
+                if remaining is None:
+                    from_role[0].report_dead_end(to_id, packet.destination_id, latency)
+                else:
+                    from_role[0].update_estimate(to_id, packet.destination_id, latency, remaining)
+        self._forward(packet, to_role)
+
+    def _on_link_free(self, link: Link):
+        if link.queue:
+            packet, enqueued_at = link.queue.popleft()
+            self._transmit(packet, link, enqueued_at)
+        else:
+            link.busy = False
+
+    def _on_congestion_change(self, payload):
+        node_a_id, node_b_id, multiplier = payload
+        self.congestion[(node_a_id, node_b_id)] = multiplier
+        self.congestion[(node_b_id, node_a_id)] = multiplier
+        if self._trees:
+            latency = self.network.get_node(node_a_id).neighbors[node_b_id]['latency'] * multiplier
+            for tree in self._trees.values():
+                tree.update_link(node_a_id, node_b_id, latency)
+        if self.route_cache is not None:
+            self.route_cache.invalidate_link(node_a_id, node_b_id, learned_only=True)
+
+    # --- Internals ---
+
+    def _forward(self, packet: Packet, role: tuple):
+        """
+        Chooses the packet's next hop at a node and hands it to the outgoing link.
+        `role` is the node's entry from `_role`.
+        """
+        node = role[0]
+        if node.node_id == packet.destination_id:
+            self._finish(packet, True)
+            return
+        hops = len(packet.path_taken) - 1
+        if hops > self.max_hops:
+            self._finish(packet, False)
+            return
+
+        route = packet.route
+        if route is not None:
+            next_node_id = route[hops + 1] if hops + 1 < len(route) else None
+        elif role[1]:
+            prev_node_id = packet.path_taken[-2] if hops else None
+            if role[2]:
+                self._mark_visited(packet, node.node_id, hops)
+                next_node_id = node.choose_next_hop(prev_node_id, packet.destination_id, packet.visited)
+                if next_node_id is None and hops:
+                    next_node_id = _back_step(packet, node.node_id)
+            else:
+                next_node_id = node.choose_next_hop(prev_node_id)
+            probability = getattr(node, 'selection_probability', None)
+            if probability is not None:
+                self._record_probability(packet, hops, probability)
+        else:
+            next_node_id = None
+
+        if next_node_id is None:
+            self._finish(packet, False)
+            return
+
+        if self.service_time <= 0.0 and not self.bandwidth_model:
+            latency = self.latency_fn(node, next_node_id)
+            self._schedule_hop(latency, packet, node.node_id, next_node_id, latency)
+            return
+
+        link = self.get_link(node.node_id, next_node_id)
+        if not link.busy:
+            link.busy = True
+            self._transmit(packet, link, self.scheduler.now)
+        elif not link.enqueue(packet, self.scheduler.now):
+            self.stats['dropped'] += 1
+            self._finish(packet, False)
+
+    def _transmit(self, packet: Packet, link: Link, enqueued_at: float):
+        """Starts sending a packet over a link that has just become available."""
+        node = self.network.get_node(link.from_id)
+        waited = self.scheduler.now - enqueued_at
+        if self.bandwidth_model:
+            service_time = link.serialization_delay(packet.size)
+        else:
+            service_time = self.service_time
+        link.record_transmission(packet.size, service_time, waited)
+        delay = service_time + self.latency_fn(node, link.to_id)
+        self.scheduler.schedule(service_time, LINK_FREE, link)
+        self._schedule_hop(delay, packet, link.from_id, link.to_id, waited + delay)
+
+    def _schedule_hop(self, delay: float, packet: Packet, from_id: str, to_id: str, latency: float):
+        """
+        Schedules the arrival of a packet at the far end of a link, `delay` from now.
+        The hop travels on the packet itself, so the event needs no payload of its own.
+        """
+        packet.next_hop_id = to_id
+        packet.hop_latency = latency
+        scheduler = self.scheduler
+        heapq.heappush(scheduler._queue, (scheduler.now + delay, next(scheduler._sequence), HOP_ARRIVAL, packet))
+
+    def _remaining_latency(self, node, destination_id: str) -> float:
+        """A node's estimate of the latency still needed to reach a destination."""
+        if hasattr(node, 'remaining_latency'):
+            return node.remaining_latency(destination_id)
+        return 0.0 if node.node_id == destination_id else float('inf')
+
+    def _hop_remaining(self, packet: Packet, to_node):
+        """
+        The remaining latency `to_node` reports back for the hop a packet just took,
+        or None if the packet is stuck there: every onward neighbor is the node it
+        came from or, for per-destination routing, already visited. The sender
+        then folds in its dead-end penalty instead of the estimate, so one hop is
+        one sample either way.
+        """
+        destination_id = packet.destination_id
+        if packet.route is None and to_node.node_id != destination_id:
+            prev_node_id = packet.path_taken[-2]
+            visited = packet.visited if getattr(to_node, 'routes_per_destination', False) else None
+            if all(neighbor_id == prev_node_id or (visited and neighbor_id in visited)
+                   for neighbor_id in to_node.neighbors):
+                return None
+        return self._remaining_latency(to_node, destination_id)
+
+    def _remote_hop_feedback(self, packet: Packet, from_id: str, to_node, latency: float):
+        """
+        Feedback for a hop sent by a node outside this simulator's network. A
+        single simulator never sees one; see crp.sharding.
+        """
+
+    def _credit_path(self, packet: Packet, success: bool):
+        """
+        Rewards the per-destination bandit decisions along a finished packet's path
+        (see `_decision_reward` for the hops around dead ends).
+        """
+        reward = self.reward_factor / packet.total_latency if success and packet.total_latency > 0 else 0.0
+        path, destination_id, get_node = packet.path_taken, packet.destination_id, self.network.get_node
+        probabilities = packet.selection_probabilities
+        first, last = _path_indices(path)
+        for i in range(len(path) - 1):
+            node = get_node(path[i])
+            if getattr(node, 'routes_per_destination', False) and hasattr(node, 'update_reward'):
+                credit = _decision_reward(path, i, reward, first, last)
+                if credit is not None:
+                    node.update_reward(path[i + 1], credit, destination_id, _probability_at(probabilities, i))
+
+    def _record_probability(self, packet: Packet, hop: int, probability: float):
+        """Keeps the selection probability of the decision taken at path index `hop`."""
+        probabilities = packet.selection_probabilities
+        if probabilities is None:
+            probabilities = packet.selection_probabilities = []
+        if len(probabilities) <= hop:
+            probabilities.extend([None] * (hop + 1 - len(probabilities)))
+        probabilities[hop] = probability
+
+    def _mark_visited(self, packet: Packet, node_id: str, hops: int):
+        """Records that a node decided for the packet, keeping the path index of its first decision."""
+        visited = packet.visited
+        if visited is None:
+            packet.visited = {node_id: hops}
+        elif node_id not in visited:
+            visited[node_id] = hops
+
+    def _role(self, node_id: str):
+        """
+        Looks a node up and classifies it once: returns and caches (node, whether it
+        chooses its own hops, whether it routes per destination, its feedback role),
+        or None for a node outside the network. The hot path reads these instead of
+        probing every node's attributes on every hop.
+        """
+        node = self.network.get_node(node_id)
+        if node is None:
+            return None
+        per_destination = getattr(node, 'routes_per_destination', False)
+        if hasattr(node, 'update_estimate'):
+            feedback = _ESTIMATE
+        elif hasattr(node, 'update_reward'):
+            feedback = _PATH_CREDIT if per_destination else _HOP_REWARD
+        else:
+            feedback = _NO_FEEDBACK
+        role = self._roles[node_id] = (node, hasattr(node, 'choose_next_hop'), per_destination, feedback)
+        return role
+
+    def _static_path(self, source_id: str, destination_id: str) -> list:
+        """
+        The shortest path for a flow, computed once and then served from the cache,
+        or with `adaptive_routing` read off the source's shortest-path tree.
+        """
+        if self.adaptive_routing:
+            return self._tree(source_id).path(destination_id)
+        cache = self.route_cache
+        if cache is None:
+            key = (source_id, destination_id)
+            if key not in self._static_paths:
+                self._static_paths[key] = find_path_dijkstra(self.network, *key)[0]
+            return self._static_paths[key]
+        path = cache.get(source_id, destination_id)
+        if path is None:
+            path = find_path_dijkstra(self.network, source_id, destination_id)[0]
+            if path is not None:
+                cache.put(source_id, destination_id, path)
+        return path
+
+    def _tree(self, source_id: str) -> DynamicShortestPathTree:
+        """The source's shortest-path tree, built on first use under the congestion so far."""
+        tree = self._trees.get(source_id)
+        if tree is None:
+            tree = self._trees[source_id] = DynamicShortestPathTree(self.network, source_id)
+            for (node_a_id, node_b_id), multiplier in self.congestion.items():
+                tree.update_link(node_a_id, node_b_id,
+                                 self.network.get_node(node_a_id).neighbors[node_b_id]['latency'] * multiplier)
+        return tree
+
+    def _finish(self, packet: Packet, success: bool):
+        if success:
+            self.stats['delivered'] += 1
+            self.stats['total_latency'] += packet.total_latency
+            # A hop-by-hop delivery the nodes are confident in becomes the flow's cached route.
+            cache = self.route_cache
+            if cache is not None and packet.route is None and \
+                    (packet.source_id, packet.destination_id) not in cache and \
+                    cache.trusts(self.network, packet.path_taken):
+                cache.put(packet.source_id, packet.destination_id, list(packet.path_taken), learned=True)
+        else:
+            self.stats['failed'] += 1
+        if self._credits_paths:
+            self._credit_path(packet, success)
+        for callback in self.completion_callbacks:
+            callback(packet, success)
+        if self.packet_pool is not None:
+            self.packet_pool.release(packet)
@@ -0,0 +1,242 @@
+# This file implements the Monte Carlo experiment runner used to compare the routers
+# across many seeded trials. Trials are independent and fan out over a process pool;
+# every random draw inside a trial comes from streams derived from the trial's seed,
+# so rerunning a sweep reproduces it bit for bit regardless of worker scheduling.
+
+import csv
+import hashlib
+import inspect
+import itertools
+import math
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+from .network.node import Node, Gateway
+from .routing.dumb_router import find_path_dijkstra
+from .routing.cognitive_node import CognitiveNode, CognitiveGateway, route_packet
+from .routing.policies import POLICIES
+from .topology import reference_mesh, random_geometric, barabasi_albert, grid, hierarchical_depin, to_network
+
+# --- Default trial parameters ---
+# These mirror the constants of simulations/run_cognitive_sim.py.
+DEFAULT_PARAMS = {
+    'seed': 42,
+    'topology': 'mesh7',
+    'policy': 'ucb1',
+    'num_packets': 1000,
+    'max_hops': 25,
+    'congested_link': ('NODE_2', 'NODE_3'),
+    'congestion_chance': 0.4,
+    'congestion_multiplier': 10,
+    'reward_factor': 100.0,
+    'source': 'GATEWAY_WEST',
+    'destination': 'GATEWAY_EAST',
+}
+
+def derive_seed(*keys) -> int:
+    """
+    Derives an independent 64-bit seed from any sequence of keys.
+
+    Hashing (rather than e.g. seed + i) keeps streams for neighbouring trials and
+    for different purposes within one trial statistically unrelated.
+    """
+    digest = hashlib.blake2b(repr(keys).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def generated_topology(generator, *args, **options):
+    """
+    Adapts a crp.topology generator to the builder signature of TOPOLOGIES: the
+    generator is seeded from the trial's topology stream and its CompactTopology
+    is expanded into a Network of the requested node types.
+    """
+    def build(rng, node_factory=Node, gateway_factory=Gateway):
+        topology = generator(*args, seed=rng.getrandbits(64), **options)
+        return to_network(topology, node_factory, gateway_factory)
+    return build
+
+# Topology builders by name: builder(rng, node_factory, gateway_factory) -> Network
+TOPOLOGIES = {
+    'mesh7': reference_mesh,
+    'geometric100': generated_topology(random_geometric, 100, mean_degree=10.0),
+    'ba100': generated_topology(barabasi_albert, 100),
+    'grid10': generated_topology(grid, 10, 10),
+    'torus10': generated_topology(grid, 10, 10, torus=True),
+    'depin4x25': generated_topology(hierarchical_depin, 4, 25),
+}
+
+# Per-topology defaults, applied over DEFAULT_PARAMS. A congested_link of None
+# congests the middle link of the baseline's static shortest path.
+TOPOLOGY_PARAMS = {
+    'geometric100': {'source': 'GATEWAY_0', 'destination': 'GATEWAY_1', 'congested_link': None},
+    'ba100': {'source': 'NODE_50', 'destination': 'NODE_99', 'congested_link': None},
+    'grid10': {'congested_link': None},
+    'torus10': {'congested_link': None},
+    'depin4x25': {'source': 'GATEWAY_0_0', 'destination': 'NODE_2_24', 'congested_link': None},
+}
+
+def make_policy(name: str, rng: random.Random):
+    """Instantiates a policy by name, handing it `rng` if it draws random numbers."""
+    policy_class = POLICIES[name]
+    if 'rng' in inspect.signature(policy_class).parameters:
+        return policy_class(rng=rng)
+    return policy_class()
+
+def run_trial(params: dict) -> dict:
+    """
+    Runs one baseline-versus-cognitive comparison trial.
+
+    The trial follows simulations/run_cognitive_sim.py: the baseline sends every
+    packet along the static Dijkstra path while the cognitive network routes hop by
+    hop, and the congested link is slowed down independently on each traversal.
+
+    Generated topologies are not guaranteed to connect the trial's endpoints; such
+    a trial is reported with `routable` False and NaN measurements.
+
+    Returns:
+        The trial parameters merged with its measurements.
+    """
+    topology = params.get('topology', DEFAULT_PARAMS['topology'])
+    params = {**DEFAULT_PARAMS, **TOPOLOGY_PARAMS.get(topology, {}), **params}
+    seed = params['seed']
+    build = TOPOLOGIES[topology]
+    source, destination = params['source'], params['destination']
+    chance, multiplier = params['congestion_chance'], params['congestion_multiplier']
+
+    # Both networks are built from the same topology stream so they are identical.
+    dumb_network = build(random.Random(derive_seed(seed, 'topology')), Node, Gateway)
+    static_path, _ = find_path_dijkstra(dumb_network, source, destination)
+    if static_path is None:
+        return {**params, 'routable': False, 'baseline_latency': math.nan, 'baseline_congested_trips': math.nan,
+                'cognitive_latency': math.nan, 'cognitive_success_rate': math.nan,
+                'cognitive_congested_trips': math.nan}
+    if params['congested_link'] is None:
+        middle = (len(static_path) - 1) // 2
+        params['congested_link'] = (static_path[middle], static_path[middle + 1])
+    hot_link = set(params['congested_link'])
+
+    policy_rng = random.Random(derive_seed(seed, 'policy'))
+    cognitive_network = build(
+        random.Random(derive_seed(seed, 'topology')),
+        lambda node_id: CognitiveNode(node_id, make_policy(params['policy'], policy_rng)),
+        lambda node_id: CognitiveGateway(node_id, make_policy(params['policy'], policy_rng)),
+    )
+
+    def traverse(rng, node, next_node_id):
+        base_latency = node.neighbors[next_node_id]['latency']
+        if {node.node_id, next_node_id} == hot_link and rng.random() < chance:
+            return base_latency * multiplier, True
+        return base_latency, False
+
+    # --- Baseline: static shortest path ---
+    rng = random.Random(derive_seed(seed, 'congestion', 'baseline'))
+    dumb_latencies = []
+    dumb_congested = 0
+    for _ in range(params['num_packets']):
+        packet_latency, is_congested_trip = 0.0, False
+        for j in range(len(static_path) - 1):
+            link_latency, congested = traverse(rng, dumb_network.get_node(static_path[j]), static_path[j + 1])
+            packet_latency += link_latency
+            is_congested_trip |= congested
+        dumb_latencies.append(packet_latency)
+        dumb_congested += is_congested_trip
+
+    # --- Cognitive: hop-by-hop bandit routing ---
+    rng = random.Random(derive_seed(seed, 'congestion', 'cognitive'))
+    link_latency = lambda node, next_node_id: traverse(rng, node, next_node_id)[0]
+    cognitive_latencies = []
+    cognitive_congested = 0
+    for _ in range(params['num_packets']):
+        delivered, packet_latency, is_congested_trip = route_packet(
+            cognitive_network, source, destination, link_latency, params['reward_factor'], params['max_hops'])
+        if delivered:
+            cognitive_latencies.append(packet_latency)
+            cognitive_congested += is_congested_trip
+
+    delivered = len(cognitive_latencies)
+    return {
+        **params,
+        'routable': True,
+        'baseline_latency': statistics.fmean(dumb_latencies) if dumb_latencies else math.nan,
+        'baseline_congested_trips': dumb_congested,
+        'cognitive_latency': statistics.fmean(cognitive_latencies) if delivered else math.nan,
+        'cognitive_success_rate': delivered / params['num_packets'],
+        'cognitive_congested_trips': cognitive_congested,
+    }
+
+def expand_grid(num_trials: int, base_seed: int = 42, **axes) -> list:
+    """
+    Builds the trial list for a parameter sweep.
+
+    Every combination of the values given in `axes` (e.g. policy=['ucb1', 'sw-ucb'])
+    is repeated `num_trials` times. Trial i of every combination uses the same seed,
+    so configurations are compared on common random numbers.
+    """
+    names = list(axes)
+    trials = []
+    for values in itertools.product(*(axes[name] for name in names)):
+        for i in range(num_trials):
+            trials.append({**dict(zip(names, values)), 'seed': derive_seed(base_seed, 'trial', i), 'trial': i})
+    return trials
+
+def run_experiments(trials: list, processes: int = None, trial_fn=run_trial) -> list:
+    """
+    Runs every trial, in parallel when `processes` is not 1, and returns their
+    results in the same order as `trials`.
+    """
+    if processes == 1:
+        return [trial_fn(trial) for trial in trials]
+    workers = processes or os.cpu_count() or 1
+    chunksize = max(1, len(trials) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(trial_fn, trials, chunksize=chunksize))
+
+# Metrics summarised by `summarize`.
+SUMMARY_METRICS = ('baseline_latency', 'cognitive_latency', 'cognitive_success_rate',
+                   'baseline_congested_trips', 'cognitive_congested_trips')
+
+def summarize(results: list, group_by: list, metrics=SUMMARY_METRICS, z: float = 1.96) -> list:
+    """
+    Aggregates trial results into one row per configuration.
+
+    Each metric is reported as its mean and the half-width of its normal-approximation
+    confidence interval (1.96 standard errors, i.e. 95%, by default).
+    """
+    groups = {}
+    for result in results:
+        key = tuple(_hashable(result[name]) for name in group_by)
+        groups.setdefault(key, []).append(result)
+
+    rows = []
+    for key, group in groups.items():
+        row = {**dict(zip(group_by, key)), 'trials': len(group)}
+        for metric in metrics:
+            values = [r[metric] for r in group if not math.isnan(r[metric])]
+            row[f'{metric}_mean'] = statistics.fmean(values) if values else math.nan
+            row[f'{metric}_ci'] = (z * statistics.stdev(values) / math.sqrt(len(values))
+                                   if len(values) > 1 else math.nan)
+        rows.append(row)
+    return rows
+
+def write_csv(rows: list, path: str):
+    """Writes result rows to a CSV file with one column per key."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def format_table(rows: list) -> str:
+    """Formats result rows as a fixed-width text table."""
+    columns = list(rows[0])
+    cells = [[_format_cell(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+def _format_cell(value) -> str:
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
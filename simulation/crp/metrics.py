@@ -0,0 +1,270 @@
+# This file implements the streaming metrics pipeline.
+# Completed packets are consumed one at a time and folded into fixed-size
+# aggregates (latency histograms, per-link and per-node counters), so memory stays
+# bounded by the topology size no matter how many packets a run processes.
+
+import csv
+import math
+import os
+from array import array
+
+from .engine import METRICS_SNAPSHOT
+
+
+class LatencyHistogram:
+    """
+    A log-bucketed latency histogram (in the style of HDR histograms).
+
+    Bucket boundaries grow geometrically by a factor of (1 + precision), so every
+    quantile is reported within `precision` relative error using a fixed number of
+    counters (about 2,300 for 1% precision over ten decades). Count, sum, minimum
+    and maximum are tracked exactly. Histograms with identical settings can be
+    merged, e.g. to combine per-worker results.
+    """
+    def __init__(self, lowest: float = 0.001, highest: float = 1e7, precision: float = 0.01):
+        self.lowest = lowest
+        self.highest = highest
+        self.precision = precision
+        self._log_growth = math.log1p(precision)
+        num_buckets = int(math.log(highest / lowest) / self._log_growth) + 2
+        self.counts = array('q', bytes(8 * num_buckets))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        """Adds one observation. Values outside [lowest, highest] land in the edge buckets."""
+        if value <= self.lowest:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.lowest) / self._log_growth) + 1, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Returns the value at quantile q (0..1), or nan if the histogram is empty."""
+        if self.count == 0:
+            return math.nan
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Adds the observations of another histogram with the same settings."""
+        if (other.lowest, other.highest, other.precision) != (self.lowest, self.highest, self.precision):
+            raise ValueError("Cannot merge histograms with different bucket settings")
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self.counts = array('q', bytes(8 * len(self.counts)))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket_value(self, index: int) -> float:
+        """The geometric midpoint of a bucket's range."""
+        if index == 0:
+            return self.lowest
+        return self.lowest * math.exp((index - 0.5) * self._log_growth)
+
+    def __repr__(self):
+        return f"LatencyHistogram(count={self.count}, p50={self.quantile(0.5):.2f})"
+
+
+class MetricsCollector:
+    """
+    Consumes packet completions as a stream and keeps bounded aggregates.
+
+    - Latency of delivered packets, over the whole run and over the current
+      snapshot window, as LatencyHistograms.
+    - Traversals of every directed link and forwarding decisions of every node,
+      over the current snapshot window (reset on each snapshot) and in total.
+    - Busy-time utilisation of every link of an attached simulator: the share of
+      time its transmitter spent serializing packets (`Link.busy_time`), over the
+      whole run and per snapshot window. It is only defined when the simulator
+      models link service time (a service time or the bandwidth model); without
+      one links never occupy a transmitter and no Link objects exist.
+
+    Attach it to a TrafficSimulator with `attach`, or call `observe` directly
+    from any simulation loop with finished Packet objects.
+    """
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, precision: float = 0.01):
+        self.latency = LatencyHistogram(precision=precision)
+        self.window_latency = LatencyHistogram(precision=precision)
+        self.delivered = 0
+        self.failed = 0
+        self.link_packets = {}
+        self.window_link_packets = {}
+        self.node_decisions = {}
+        self.window_node_decisions = {}
+        self.start = 0.0
+        self.window_start = 0.0
+        self.snapshots = 0
+        self._writer = None
+        # The attached simulator's links, and each link's busy time at the window start
+        self._links = None
+        self._window_busy = {}
+
+    def observe(self, packet, success: bool):
+        """Folds one finished packet into the aggregates."""
+        if success:
+            self.delivered += 1
+            self.latency.record(packet.total_latency)
+            self.window_latency.record(packet.total_latency)
+        else:
+            self.failed += 1
+
+        path = packet.path_taken
+        links, nodes = self.link_packets, self.node_decisions
+        window_links, window_nodes = self.window_link_packets, self.window_node_decisions
+        for i in range(len(path) - 1):
+            link = (path[i], path[i + 1])
+            links[link] = links.get(link, 0) + 1
+            window_links[link] = window_links.get(link, 0) + 1
+            nodes[path[i]] = nodes.get(path[i], 0) + 1
+            window_nodes[path[i]] = window_nodes.get(path[i], 0) + 1
+
+    def attach(self, simulator, interval: float = None, writer: 'SnapshotWriter' = None):
+        """
+        Subscribes to a TrafficSimulator's packet completions. With an `interval`,
+        a snapshot is taken (and written, if a writer is given) every `interval`
+        units of simulation time.
+        """
+        simulator.completion_callbacks.append(self.observe)
+        self._writer = writer
+        self._links = simulator.links
+        self.start = self.window_start = simulator.scheduler.now
+        if interval is not None:
+            scheduler = simulator.scheduler
+
+            def on_snapshot(_):
+                self.snapshot(scheduler.now)
+                # Stop ticking once nothing else is left to simulate.
+                if scheduler.pending():
+                    scheduler.schedule(interval, METRICS_SNAPSHOT)
+
+            scheduler.register(METRICS_SNAPSHOT, on_snapshot)
+            scheduler.schedule(interval, METRICS_SNAPSHOT)
+
+    def summary(self) -> dict:
+        """Returns the run-wide delivery counts and latency quantiles."""
+        row = {'delivered': self.delivered, 'failed': self.failed, 'mean_latency': self.latency.mean()}
+        for q in self.QUANTILES:
+            row[f'p{round(q * 100)}'] = self.latency.quantile(q)
+        return row
+
+    def link_utilisation(self, now: float) -> dict:
+        """
+        Returns the busy-time utilisation of every link the attached simulator has
+        transmitted on, from the start of the run until `now`, keyed by the
+        directed (from_id, to_id) pair. Empty when not attached or when the
+        simulator does not model link service time.
+        """
+        elapsed = now - self.start
+        return {key: link.utilisation(elapsed) for key, link in (self._links or {}).items()}
+
+    def snapshot(self, now: float) -> dict:
+        """
+        Closes the current window: returns a summary row covering both the window
+        and the whole run, and resets the window counters.
+        """
+        elapsed = now - self.window_start
+        row = {'time': now, **self.summary(), 'window_delivered': self.window_latency.count}
+        for q in self.QUANTILES:
+            row[f'window_p{round(q * 100)}'] = self.window_latency.quantile(q)
+
+        window_utilisation = {}
+        window_busy = self._window_busy
+        for key, link in (self._links or {}).items():
+            busy = link.busy_time - window_busy.get(key, 0.0)
+            window_busy[key] = link.busy_time
+            window_utilisation[key] = busy / elapsed if elapsed > 0 else 0.0
+        row['window_max_link_utilisation'] = max(window_utilisation.values(), default=math.nan)
+
+        if self._writer is not None:
+            self._writer.write(now, elapsed, row, self.window_link_packets, self.window_node_decisions,
+                               window_utilisation)
+
+        self.window_link_packets = {}
+        self.window_node_decisions = {}
+        self.window_latency.reset()
+        self.window_start = now
+        self.snapshots += 1
+        return row
+
+
+class SnapshotWriter:
+    """
+    Appends metrics snapshots to three CSV files in a directory, one row per
+    snapshot (summary) or per active link/node in the snapshot window:
+
+    - summary.csv: time, counts and latency quantiles
+    - links.csv:   time, from_id, to_id, packets, packets_per_ms, utilisation
+    - nodes.csv:   time, node_id, decisions
+
+    `utilisation` is the link's busy-time share of the window (NaN for links of
+    a simulator that does not model link service time).
+
+    Each file is a flat table with a fixed column set, so it can be loaded
+    column-wise by any dataframe or columnar tool.
+    """
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self._writers = {}
+        for name in ('summary', 'links', 'nodes'):
+            self._files[name] = open(os.path.join(directory, f'{name}.csv'), 'w', newline='')
+            self._writers[name] = csv.writer(self._files[name])
+        self._writers['links'].writerow(['time', 'from_id', 'to_id', 'packets', 'packets_per_ms', 'utilisation'])
+        self._writers['nodes'].writerow(['time', 'node_id', 'decisions'])
+        self._summary_header_written = False
+
+    def write(self, now: float, elapsed: float, summary: dict, link_packets: dict, node_decisions: dict,
+              link_utilisation: dict = None):
+        if not self._summary_header_written:
+            self._writers['summary'].writerow(list(summary))
+            self._summary_header_written = True
+        self._writers['summary'].writerow(list(summary.values()))
+
+        links = self._writers['links']
+        link_utilisation = link_utilisation or {}
+        # Links that only transmitted (their packets finish in a later window) are listed too.
+        for key in {**link_packets, **link_utilisation}:
+            packets = link_packets.get(key, 0)
+            links.writerow([now, key[0], key[1], packets, packets / elapsed if elapsed > 0 else math.nan,
+                            link_utilisation.get(key, math.nan)])
+        nodes = self._writers['nodes']
+        for node_id, decisions in node_decisions.items():
+            nodes.writerow([now, node_id, decisions])
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
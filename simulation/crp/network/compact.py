@@ -0,0 +1,139 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It defines a frozen, array-backed (CSR) representation of the network graph that
+# trades the flexibility of Node objects for a few bytes per edge.
+
+from array import array
+
+
+class CompactTopology:
+    """
+    An immutable compressed-sparse-row (CSR) view of a network graph.
+
+    Nodes are identified by dense integer indices. The neighbors of node `i` are
+    stored in `neighbors[offsets[i]:offsets[i + 1]]`, with the properties of each
+    directed edge slot held at the same positions in the parallel `latency` and
+    `bandwidth` arrays. Each undirected link therefore occupies two slots.
+
+    Attributes:
+        node_ids (list): The original string ID of every node, by index. Any
+            sequence of strings works, e.g. the lazily decoded table of a
+            memory-mapped topology file.
+        index (dict): Maps a string node ID back to its integer index. It is
+            built on first use.
+        is_gateway (array): 1 for gateway nodes, 0 otherwise, by index.
+        offsets (array): int64 row offsets, of length num_nodes + 1.
+        neighbors (array): int32 neighbor indices, one per directed edge slot.
+        latency (array): float64 link latency (ms), one per directed edge slot.
+        bandwidth (array): float64 link bandwidth (Mbps), one per directed edge slot.
+    """
+    def __init__(self, node_ids, is_gateway, offsets, neighbors, latency, bandwidth):
+        self.node_ids = node_ids
+        self._index = None
+        self.is_gateway = is_gateway
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        return self._index
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        """The number of directed edge slots (twice the number of undirected links)."""
+        return len(self.neighbors)
+
+    @classmethod
+    def from_network(cls, network) -> 'CompactTopology':
+        """Freezes a dict-based Network into its CSR representation."""
+        node_ids = list(network.nodes)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        is_gateway = array('b', (1 if node_id in network.gateways else 0 for node_id in node_ids))
+
+        offsets = array('q', [0])
+        neighbors = array('i')
+        latency = array('d')
+        bandwidth = array('d')
+        for node_id in node_ids:
+            for neighbor_id, properties in network.nodes[node_id].neighbors.items():
+                neighbors.append(index[neighbor_id])
+                latency.append(properties['latency'])
+                bandwidth.append(properties['bandwidth'])
+            offsets.append(len(neighbors))
+        return cls(node_ids, is_gateway, offsets, neighbors, latency, bandwidth)
+
+    @classmethod
+    def from_edges(cls, node_ids, sources, targets, latency, bandwidth, gateway_ids=()) -> 'CompactTopology':
+        """
+        Bulk-builds a topology from parallel arrays of undirected links.
+
+        Args:
+            node_ids: The string ID of every node, by index.
+            sources, targets: Integer endpoint indices, one pair per undirected link.
+            latency, bandwidth: Link properties, one value per undirected link.
+            gateway_ids: The IDs of nodes that act as gateways.
+
+        Duplicate links and self-loops are not filtered; callers are expected to
+        generate simple graphs.
+        """
+        num_nodes = len(node_ids)
+        num_links = len(sources)
+
+        # Counting sort of the directed edge slots by source node.
+        degree = array('q', bytes(8 * (num_nodes + 1)))
+        for i in range(num_links):
+            degree[sources[i] + 1] += 1
+            degree[targets[i] + 1] += 1
+        for i in range(num_nodes):
+            degree[i + 1] += degree[i]
+        offsets = array('q', degree)
+
+        cursor = array('q', degree)
+        slots = 2 * num_links
+        neighbors = array('i', bytes(4 * slots))
+        slot_latency = array('d', bytes(8 * slots))
+        slot_bandwidth = array('d', bytes(8 * slots))
+        for i in range(num_links):
+            a, b = sources[i], targets[i]
+            lat, bw = latency[i], bandwidth[i]
+            pos = cursor[a]
+            neighbors[pos], slot_latency[pos], slot_bandwidth[pos] = b, lat, bw
+            cursor[a] = pos + 1
+            pos = cursor[b]
+            neighbors[pos], slot_latency[pos], slot_bandwidth[pos] = a, lat, bw
+            cursor[b] = pos + 1
+
+        gateways = set(gateway_ids)
+        is_gateway = array('b', (1 if node_id in gateways else 0 for node_id in node_ids))
+        return cls(list(node_ids), is_gateway, offsets, neighbors, slot_latency, slot_bandwidth)
+
+    def get_index(self, node_id: str) -> int:
+        """Returns the integer index of a node ID, or None if it is unknown."""
+        return self.index.get(node_id)
+
+    def edge_slots(self, node_index: int) -> range:
+        """Returns the range of edge slots holding the neighbors of a node."""
+        return range(self.offsets[node_index], self.offsets[node_index + 1])
+
+    def find_slot(self, node_index: int, neighbor_index: int) -> int:
+        """Returns the edge slot of the directed link node -> neighbor, or -1 if there is none."""
+        neighbors = self.neighbors
+        for slot in range(self.offsets[node_index], self.offsets[node_index + 1]):
+            if neighbors[slot] == neighbor_index:
+                return slot
+        return -1
+
+    def nbytes(self) -> int:
+        """The memory held by the CSR arrays themselves, in bytes."""
+        return sum(a.itemsize * len(a) for a in
+                   (self.is_gateway, self.offsets, self.neighbors, self.latency, self.bandwidth))
+
+    def __repr__(self):
+        return f"CompactTopology(nodes={self.num_nodes}, edge_slots={self.num_edges})"
@@ -0,0 +1,67 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It models a directed network link as a finite-capacity FIFO queue in front of a
+# transmitter, which is how load turns into queueing delay and packet drops.
+
+from collections import deque
+
+class Link:
+    """
+    A directed link from one node to another.
+
+    A packet is transmitted only while the link is idle; it occupies the
+    transmitter for its serialization delay (size / bandwidth) and then still has
+    to propagate for the link's latency. Packets that arrive while the link is
+    busy wait in a FIFO buffer of at most `buffer_size` packets (unbounded if None)
+    and are dropped when it is full.
+
+    Attributes:
+        bandwidth (float): Transmission rate in Megabits per second (Mbps).
+        queue (deque): Waiting (packet, enqueue_time) pairs.
+        busy (bool): Whether a packet is currently being serialized.
+        busy_time (float): Total time spent transmitting, in ms.
+        queueing_time (float): Total time transmitted packets waited in the buffer, in ms.
+        packets_sent, bits_sent, drops (int): Running counters.
+
+    Raises:
+        ValueError: If `bandwidth` is not positive.
+    """
+    def __init__(self, from_id: str, to_id: str, bandwidth: float, buffer_size: int = None):
+        if not bandwidth > 0:
+            raise ValueError(f"Link '{from_id}' -> '{to_id}' needs a positive bandwidth, got {bandwidth}")
+        self.from_id = from_id
+        self.to_id = to_id
+        self.bandwidth = bandwidth
+        self.buffer_size = buffer_size
+        self.queue = deque()
+        self.busy = False
+        self.busy_time = 0.0
+        self.queueing_time = 0.0
+        self.packets_sent = 0
+        self.bits_sent = 0
+        self.drops = 0
+
+    def serialization_delay(self, size_bytes: int) -> float:
+        """Time in ms to push `size_bytes` onto the wire (1 Mbps = 1000 bits per ms)."""
+        return size_bytes * 8 / (self.bandwidth * 1000.0)
+
+    def enqueue(self, packet, now: float) -> bool:
+        """Buffers a packet behind the one in transmission. Returns False if it was dropped."""
+        if self.buffer_size is not None and len(self.queue) >= self.buffer_size:
+            self.drops += 1
+            return False
+        self.queue.append((packet, now))
+        return True
+
+    def record_transmission(self, size_bytes: int, service_time: float, waited: float = 0.0):
+        self.packets_sent += 1
+        self.bits_sent += size_bytes * 8
+        self.busy_time += service_time
+        self.queueing_time += waited
+
+    def utilisation(self, elapsed: float) -> float:
+        """The fraction of `elapsed` ms the transmitter was busy."""
+        return self.busy_time / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"Link('{self.from_id}' -> '{self.to_id}', {self.bandwidth}Mbps, "
+                f"queued={len(self.queue)}, drops={self.drops})")
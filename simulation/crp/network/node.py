@@ -18,13 +18,20 @@ class Node:
         This method ensures the graph is undirected by default.
         """
         if neighbor_node.node_id not in self.neighbors:
-            self.neighbors[neighbor_node.node_id] = {
-                'latency': latency,      # in milliseconds (ms)
-                'bandwidth': bandwidth   # in Megabits per second (Mbps)
-            }
+            self.add_link(neighbor_node.node_id, latency, bandwidth)
             # Ensure the connection is reciprocal for a symmetric graph
             neighbor_node.add_neighbor(self, latency, bandwidth)
 
+    def add_link(self, neighbor_id: str, latency: float, bandwidth: int):
+        """
+        Records the outgoing half of a connection only.
+        Bulk topology builders call this once per direction instead of add_neighbor.
+        """
+        self.neighbors[neighbor_id] = {
+            'latency': latency,      # in milliseconds (ms)
+            'bandwidth': bandwidth   # in Megabits per second (Mbps)
+        }
+
     def __repr__(self):
         """Provides a developer-friendly string representation of the Node."""
         return f"Node(ID='{self.node_id}')"
@@ -1,28 +1,53 @@
-import time
-
 class Packet:
     """
     Represents a single data packet traversing the network.
     This object is a stateful data carrier, designed to hold information
     about its journey for performance analysis.
 
+    The class uses `__slots__`, so a packet holds no per-instance dict; use a
+    PacketPool to reuse packets (and their path lists) instead of allocating one
+    per packet.
+
     Attributes:
         packet_id (int): A unique identifier for the packet.
         source_id (str): The ID of the originating node.
         destination_id (str): The ID of the final destination node.
-        creation_time (float): The timestamp when the packet was created.
+        creation_time (float): The simulation time at which the packet was created.
         current_location_id (str): The ID of the node where the packet currently resides.
         path_taken (list): A list of node IDs representing the path traversed so far.
         total_latency (float): The accumulated latency during its journey.
+        size (int): The packet size in bytes, used for serialization delay.
+        route (list): A precomputed route the packet follows hop by hop (a static
+            shortest path or a cached learned route), or None to decide at every hop.
+        visited (dict): IDs of the nodes that made a forwarding decision for the
+            packet, each mapped to the path index of its first decision; used to
+            keep per-destination routing loop-free and to step back from dead ends.
+            None until the simulator marks the first one.
+        next_hop_id (str): While the packet is on a link, the node it is heading to.
+        hop_latency (float): While the packet is on a link, the latency of that hop.
+        selection_probabilities (list): None, unless a node's bandit policy reported
+            the probability of its choice (EXP3). Then entry i is the probability
+            of the decision taken at path_taken[i] (None for hops without one).
     """
-    def __init__(self, packet_id: int, source_id: str, destination_id: str):
+    __slots__ = ('packet_id', 'source_id', 'destination_id', 'creation_time', 'current_location_id',
+                 'path_taken', 'total_latency', 'size', 'route', 'visited', 'next_hop_id', 'hop_latency',
+                 'selection_probabilities')
+
+    def __init__(self, packet_id: int, source_id: str, destination_id: str, size: int = 1500,
+                 creation_time: float = 0.0):
         self.packet_id = packet_id
         self.source_id = source_id
         self.destination_id = destination_id
-        self.creation_time = time.time()
+        self.creation_time = creation_time
         self.current_location_id = source_id
         self.path_taken = [source_id]
         self.total_latency = 0.0
+        self.size = size
+        self.route = None
+        self.visited = None
+        self.next_hop_id = None
+        self.hop_latency = 0.0
+        self.selection_probabilities = None
 
     def __repr__(self):
         """Provides a developer-friendly string representation of the Packet."""
@@ -34,4 +59,70 @@ class Packet:
         """Updates the packet's state after traversing one link."""
         self.current_location_id = next_node_id
         self.path_taken.append(next_node_id)
-        self.total_latency += latency_incurred
\ No newline at end of file
+        self.total_latency += latency_incurred
+
+    def reset(self, packet_id: int, source_id: str, destination_id: str, size: int = 1500,
+              creation_time: float = 0.0):
+        """Reinitializes the packet for reuse as a new one, keeping its path list and visited dict."""
+        self.packet_id = packet_id
+        self.source_id = source_id
+        self.destination_id = destination_id
+        self.creation_time = creation_time
+        self.current_location_id = source_id
+        path = self.path_taken
+        path.clear()
+        path.append(source_id)
+        self.total_latency = 0.0
+        self.size = size
+        self.route = None
+        if self.visited is not None:
+            self.visited.clear()
+        self.next_hop_id = None
+        self.hop_latency = 0.0
+        self.selection_probabilities = None
+
+
+class PacketPool:
+    """
+    A free list of finished packets, handed out again as new ones.
+
+    Reusing packets instead of allocating them keeps a long run from churning
+    through millions of short-lived objects, which is what drives the garbage
+    collector's full collections. A released packet must no longer be referenced
+    anywhere: TrafficSimulator releases a packet only after its completion
+    callbacks have returned, so callbacks must copy anything they want to keep.
+
+    Args:
+        max_size (int): The most idle packets kept; further releases are dropped.
+
+    Attributes:
+        created (int): Packets allocated because the pool was empty.
+        reused (int): Packets handed out from the pool.
+    """
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self.created = 0
+        self.reused = 0
+        self._free = []
+
+    def acquire(self, packet_id: int, source_id: str, destination_id: str, size: int = 1500,
+                creation_time: float = 0.0) -> Packet:
+        """Returns a fresh packet, reusing an idle one if there is any."""
+        if self._free:
+            packet = self._free.pop()
+            packet.reset(packet_id, source_id, destination_id, size, creation_time)
+            self.reused += 1
+            return packet
+        self.created += 1
+        return Packet(packet_id, source_id, destination_id, size, creation_time)
+
+    def release(self, packet: Packet):
+        """Returns a finished packet to the pool."""
+        if len(self._free) < self.max_size:
+            self._free.append(packet)
+
+    def __len__(self):
+        return len(self._free)
+
+    def __repr__(self):
+        return f"PacketPool(idle={len(self._free)}, created={self.created}, reused={self.reused})"
@@ -0,0 +1,120 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It defines a columnar (structure-of-arrays) store of finished packets that keeps
+# a few dozen bytes per packet instead of a Packet object, its path list and the
+# node ID references in it.
+
+from array import array
+
+
+class PacketStore:
+    """
+    Finished packets as parallel typed arrays, one record per packet.
+
+    Node IDs are interned into `node_ids`, so sources, destinations and paths are
+    stored as int32 node indices. Paths are packed back to back in `path_nodes`;
+    record k's path is path_nodes[path_offsets[k]:path_offsets[k + 1]].
+
+    Attach it to a TrafficSimulator (optionally with a PacketPool) to keep the
+    outcome of every packet of a long run at a fraction of the memory of the
+    Packet objects themselves.
+
+    Args:
+        keep_paths (bool): Whether to store each packet's path (4 bytes per node).
+
+    Attributes:
+        node_ids (list): Interned node IDs, by index.
+        packet_id (array): int64 packet IDs.
+        source, destination (array): int32 node indices.
+        creation_time, total_latency (array): float64 simulation times.
+        hops (array): int32 hop counts.
+        size (array): int32 packet sizes in bytes.
+        delivered (array): 1 if the packet was delivered, 0 if it failed.
+        path_offsets (array): int64 start of every record's path in `path_nodes`,
+            plus the end of the last one.
+        path_nodes (array): int32 node indices of all paths.
+    """
+    def __init__(self, keep_paths: bool = True):
+        self.keep_paths = keep_paths
+        self.node_ids = []
+        self._index = {}
+        self.packet_id = array('q')
+        self.source = array('i')
+        self.destination = array('i')
+        self.creation_time = array('d')
+        self.total_latency = array('d')
+        self.hops = array('i')
+        self.size = array('i')
+        self.delivered = array('b')
+        self.path_offsets = array('q', [0])
+        self.path_nodes = array('i')
+
+    def attach(self, simulator):
+        """Subscribes to a TrafficSimulator's packet completions."""
+        simulator.completion_callbacks.append(self.record)
+
+    def record(self, packet, success: bool):
+        """Appends a finished packet. Has the signature of a completion callback."""
+        intern = self.node_index
+        path = packet.path_taken
+        self.packet_id.append(packet.packet_id)
+        self.source.append(intern(packet.source_id))
+        self.destination.append(intern(packet.destination_id))
+        self.creation_time.append(packet.creation_time)
+        self.total_latency.append(packet.total_latency)
+        self.hops.append(len(path) - 1)
+        self.size.append(packet.size)
+        self.delivered.append(1 if success else 0)
+        if self.keep_paths:
+            self.path_nodes.extend([intern(node_id) for node_id in path])
+        self.path_offsets.append(len(self.path_nodes))
+
+    def node_index(self, node_id: str) -> int:
+        """Returns the index of a node ID, interning it on first use."""
+        index = self._index.get(node_id)
+        if index is None:
+            index = self._index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return index
+
+    def __len__(self):
+        return len(self.packet_id)
+
+    def path(self, record: int) -> list:
+        """Decodes the path of a record back into node IDs (empty without `keep_paths`)."""
+        node_ids = self.node_ids
+        return [node_ids[i] for i in self.path_nodes[self.path_offsets[record]:self.path_offsets[record + 1]]]
+
+    def row(self, record: int) -> dict:
+        """One record as a dict of plain values, with node IDs decoded."""
+        return {
+            'packet_id': self.packet_id[record],
+            'source_id': self.node_ids[self.source[record]],
+            'destination_id': self.node_ids[self.destination[record]],
+            'creation_time': self.creation_time[record],
+            'total_latency': self.total_latency[record],
+            'hops': self.hops[record],
+            'size': self.size[record],
+            'delivered': bool(self.delivered[record]),
+            'path': self.path(record),
+        }
+
+    def latencies(self) -> array:
+        """The latencies of the delivered packets."""
+        delivered = self.delivered
+        return array('d', (latency for i, latency in enumerate(self.total_latency) if delivered[i]))
+
+    def clear(self):
+        """Drops every record, keeping the interned node IDs."""
+        for column in (self.packet_id, self.source, self.destination, self.creation_time,
+                       self.total_latency, self.hops, self.size, self.delivered, self.path_nodes):
+            del column[:]
+        del self.path_offsets[1:]
+
+    def nbytes(self) -> int:
+        """The memory held by the columns themselves, in bytes."""
+        return sum(column.itemsize * len(column) for column in
+                   (self.packet_id, self.source, self.destination, self.creation_time, self.total_latency,
+                    self.hops, self.size, self.delivered, self.path_offsets, self.path_nodes))
+
+    def __repr__(self):
+        return f"PacketStore(packets={len(self)}, nodes={len(self.node_ids)}, bytes={self.nbytes()})"
@@ -0,0 +1,262 @@
+# This file implements the instrumentation layer used to see where simulation time goes.
+# Instrumentation works by wrapping callables in place (node methods, the link latency
+# function, event handlers, module-level functions) and restoring them afterwards, so
+# code that is not instrumented runs exactly as before: disabled profiling costs nothing.
+
+import time
+import tracemalloc
+
+from . import engine
+
+# Subsystem names used by the instrument_* helpers.
+CHOOSE_NEXT_HOP = 'choose_next_hop'
+UPDATE_REWARD = 'update_reward'
+FIND_PATH = 'find_path_dijkstra'
+LINK_LATENCY = 'link_latency'
+DISPATCH = 'dispatch'
+
+
+class SubsystemStats:
+    """
+    Counters for one instrumented subsystem.
+
+    Every call is counted, but only every `sample_every`-th call is timed, so
+    `ns` covers `sampled` calls and totals are extrapolated from the sample.
+
+    Attributes:
+        calls (int): Calls made through the instrumented callables.
+        sampled (int): Calls that were timed.
+        ns (int): Time spent in the timed calls, in nanoseconds.
+        alloc_bytes (int): Net growth of traced memory during the timed calls
+            (only with allocation tracking).
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.sampled = 0
+        self.ns = 0
+        self.alloc_bytes = 0
+
+    def ns_per_call(self) -> float:
+        return self.ns / self.sampled if self.sampled else 0.0
+
+    def total_ns(self) -> float:
+        """Estimated time over all calls, extrapolated from the timed sample."""
+        return self.ns_per_call() * self.calls
+
+    def __repr__(self):
+        return f"SubsystemStats('{self.name}', calls={self.calls}, ns/call={self.ns_per_call():.0f})"
+
+
+class Profiler:
+    """
+    Collects per-subsystem call counts, timings and allocations.
+
+    Typical use around a TrafficSimulator:
+
+        profiler = Profiler(sample_every=10)
+        with profiler:
+            profiler.instrument_simulator(simulator)
+            simulator.run()
+        print(profiler.format_report(hops=simulator.stats['hops']))
+
+    Leaving the `with` block (or calling `restore`) puts every wrapped callable
+    back. Timings of nested subsystems overlap: `dispatch` includes the time of
+    the handlers' calls into `choose_next_hop`, `update_reward` and so on, plus
+    the wrappers' own overhead.
+
+    Args:
+        sample_every (int): Time one in this many calls (1 = time every call).
+        track_allocations (bool): Run tracemalloc while profiling and record the
+            memory growth of each timed call. This slows the run down considerably.
+    """
+    def __init__(self, sample_every: int = 1, track_allocations: bool = False):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.sample_every = sample_every
+        self.track_allocations = track_allocations
+        self.subsystems = {}
+        self.elapsed_ns = 0
+        self._started_at = None
+        self._restorers = []
+        self._snapshot = None
+        self._allocations = []
+        self._owns_tracemalloc = False
+
+    # --- Session control ---
+
+    def start(self):
+        """Starts the wall clock (and tracemalloc, when tracking allocations)."""
+        if self.track_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+            self._snapshot = tracemalloc.take_snapshot()
+        self._started_at = time.perf_counter_ns()
+
+    def stop(self):
+        """Stops the wall clock and, when tracking allocations, records the allocation diff."""
+        if self._started_at is not None:
+            self.elapsed_ns += time.perf_counter_ns() - self._started_at
+            self._started_at = None
+        if self._snapshot is not None:
+            self._allocations = tracemalloc.take_snapshot().compare_to(self._snapshot, 'filename')
+            self._snapshot = None
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+    def restore(self):
+        """Removes all instrumentation, restoring the original callables."""
+        while self._restorers:
+            self._restorers.pop()()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        self.restore()
+
+    # --- Instrumentation ---
+
+    def wrap(self, fn, subsystem: str):
+        """Returns a callable that behaves like `fn` and records its calls under `subsystem`."""
+        stats = self.subsystems.get(subsystem)
+        if stats is None:
+            stats = self.subsystems[subsystem] = SubsystemStats(subsystem)
+        every = self.sample_every
+        clock = time.perf_counter_ns
+
+        if self.track_allocations:
+            traced = tracemalloc.get_traced_memory
+
+            def timed(*args, **kwargs):
+                stats.calls += 1
+                if stats.calls % every:
+                    return fn(*args, **kwargs)
+                memory = traced()[0]
+                started = clock()
+                result = fn(*args, **kwargs)
+                stats.ns += clock() - started
+                stats.alloc_bytes += traced()[0] - memory
+                stats.sampled += 1
+                return result
+        else:
+            def timed(*args, **kwargs):
+                stats.calls += 1
+                if stats.calls % every:
+                    return fn(*args, **kwargs)
+                started = clock()
+                result = fn(*args, **kwargs)
+                stats.ns += clock() - started
+                stats.sampled += 1
+                return result
+        return timed
+
+    def instrument(self, owner, attribute: str, subsystem: str):
+        """
+        Replaces `owner.attribute` (an instance method, a plain attribute holding a
+        callable, or a module-level function) with a wrapped version until `restore`.
+        """
+        original = getattr(owner, attribute)
+        had_own_attribute = attribute in getattr(owner, '__dict__', {})
+        setattr(owner, attribute, self.wrap(original, subsystem))
+
+        def restorer():
+            if had_own_attribute:
+                setattr(owner, attribute, original)
+            else:
+                delattr(owner, attribute)
+        self._restorers.append(restorer)
+
+    def instrument_network(self, network):
+        """Instruments `choose_next_hop` and `update_reward` of every node that has them."""
+        for node in network.nodes.values():
+            if hasattr(node, 'choose_next_hop'):
+                self.instrument(node, 'choose_next_hop', CHOOSE_NEXT_HOP)
+            if hasattr(node, 'update_reward'):
+                self.instrument(node, 'update_reward', UPDATE_REWARD)
+
+    def instrument_scheduler(self, scheduler):
+        """Instruments every registered event handler as the `dispatch` subsystem."""
+        for kind, handler in enumerate(scheduler._handlers):
+            if handler is not None:
+                scheduler.register(kind, self.wrap(handler, DISPATCH))
+                self._restorers.append(lambda kind=kind, handler=handler: scheduler.register(kind, handler))
+
+    def instrument_simulator(self, simulator):
+        """
+        Instruments a TrafficSimulator: its nodes, its link latency function, its
+        scheduler's handlers and the static-path Dijkstra it calls on injection.
+        Handlers registered after this call (e.g. by MetricsCollector.attach) are not
+        instrumented, so attach collectors first.
+        """
+        self.instrument_network(simulator.network)
+        self.instrument(simulator, 'latency_fn', LINK_LATENCY)
+        self.instrument_scheduler(simulator.scheduler)
+        self.instrument(engine, 'find_path_dijkstra', FIND_PATH)
+
+    # --- Reporting ---
+
+    def report(self, hops: int = None) -> dict:
+        """
+        Summarises the session as a dict with per-subsystem rows under 'subsystems'
+        (calls, ns per call, estimated total ms, calls per second of subsystem time,
+        allocated bytes per timed call) and these derived figures:
+
+        - decisions_per_sec: choose_next_hop calls per second of wall time
+        - ns_per_hop: estimated dispatch time per hop, if `hops` is given
+        """
+        elapsed_ns = self.elapsed_ns
+        if self._started_at is not None:
+            elapsed_ns += time.perf_counter_ns() - self._started_at
+
+        rows = []
+        for stats in self.subsystems.values():
+            ns_per_call = stats.ns_per_call()
+            rows.append({
+                'subsystem': stats.name,
+                'calls': stats.calls,
+                'sampled': stats.sampled,
+                'ns_per_call': ns_per_call,
+                'total_ms': stats.total_ns() / 1e6,
+                'calls_per_sec': 1e9 / ns_per_call if ns_per_call else 0.0,
+                'alloc_bytes_per_call': stats.alloc_bytes / stats.sampled if stats.sampled else 0.0,
+            })
+
+        decisions = self.subsystems.get(CHOOSE_NEXT_HOP)
+        dispatch = self.subsystems.get(DISPATCH)
+        return {
+            'elapsed_ms': elapsed_ns / 1e6,
+            'decisions_per_sec': decisions.calls / (elapsed_ns / 1e9) if decisions and elapsed_ns else 0.0,
+            'ns_per_hop': dispatch.total_ns() / hops if dispatch and hops else 0.0,
+            'subsystems': rows,
+        }
+
+    def allocations(self, limit: int = 10) -> list:
+        """
+        Returns (filename, block_count_diff, size_diff_bytes) for the source files
+        whose live allocations grew most during the session. Requires `track_allocations`.
+        """
+        rows = []
+        for stat in self._allocations[:limit]:
+            frame = stat.traceback[0]
+            rows.append((frame.filename, stat.count_diff, stat.size_diff))
+        return rows
+
+    def format_report(self, hops: int = None) -> str:
+        """Renders `report` (and the allocation diff, if tracked) as a text table."""
+        summary = self.report(hops)
+        lines = [f"{'subsystem':<20} {'calls':>10} {'ns/call':>10} {'total ms':>10} {'calls/sec':>12} {'B/call':>8}"]
+        for row in summary['subsystems']:
+            lines.append(f"{row['subsystem']:<20} {row['calls']:>10} {row['ns_per_call']:>10.0f} "
+                         f"{row['total_ms']:>10.1f} {row['calls_per_sec']:>12,.0f} "
+                         f"{row['alloc_bytes_per_call']:>8.1f}")
+        lines.append(f"wall time: {summary['elapsed_ms']:.1f}ms, "
+                     f"decisions/sec: {summary['decisions_per_sec']:,.0f}, "
+                     f"ns/hop: {summary['ns_per_hop']:.0f}")
+        for filename, count_diff, size_diff in self.allocations():
+            lines.append(f"  {count_diff:+8d} blocks {size_diff:+10d} B  {filename}")
+        return '\n'.join(lines)
@@ -1,75 +1,324 @@
 import math
-import random
+from array import array
 
 from ..network.node import Node
+from ..network.compact import CompactTopology
+from .policies import BanditPolicy, UCB1Policy
 
 class CognitiveNode(Node):
     """
     An intelligent version of a Node that uses a Multi-Armed Bandit (MAB) algorithm
     to make routing decisions. It learns over time which neighbors lead to the
     best outcomes (rewards).
+
+    The bandit algorithm itself is a pluggable BanditPolicy (UCB1 by default), so
+    non-stationary policies can be swapped in without changing the routing code.
+
+    With `per_destination`, the node keeps a separate policy for every destination
+    (created on first use by `policy_factory`), so it can learn that different
+    neighbors are best towards different destinations. The simulator then passes
+    the destination and the set of nodes the packet visited to `choose_next_hop`, and
+    credits every hop of a packet with its end-to-end result on completion.
+
+    After each `choose_next_hop`, `selection_probability` holds the policy's
+    probability of that choice (None unless the policy samples, like EXP3); pass
+    it back with the decision's reward to `update_reward`.
     """
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, policy: BanditPolicy = None, per_destination: bool = False,
+                 policy_factory=UCB1Policy):
         super().__init__(node_id)
-        self.mab_data = {}
-        self.total_pulls = 0
+        self.policy = policy if policy is not None else policy_factory()
+        self.routes_per_destination = per_destination
+        self.policy_factory = policy_factory
+        self.destination_policies = {}
+        self.selection_probability = None
+
+    @property
+    def mab_data(self) -> dict:
+        """
+        A read-only view of the shared policy's learning per neighbor, in the form
+        {neighbor_id: {'counts': pulls, 'values': mean reward}}. Neighbors whose
+        policy keeps no per-arm mean (EXP3) are reported with None for both.
+        """
+        data = {}
+        for neighbor_id in self.policy.arms:
+            estimate = self.policy.estimate(neighbor_id)
+            counts, values = (None, None) if estimate is None else (estimate[1], estimate[0])
+            data[neighbor_id] = {'counts': counts, 'values': values}
+        return data
+
+    @property
+    def total_pulls(self):
+        """The number of decisions the shared policy has taken, if it counts them (UCB1)."""
+        return getattr(self.policy, 'total_pulls', None)
 
-    def add_neighbor(self, neighbor_node: 'Node', latency: float, bandwidth: int):
-        """Overrides the parent method to also initialize MAB data for the new neighbor."""
-        super().add_neighbor(neighbor_node, latency, bandwidth)
-        if neighbor_node.node_id not in self.mab_data:
-            self.mab_data[neighbor_node.node_id] = {'counts': 0, 'values': 0.0}
+    def add_link(self, neighbor_id: str, latency: float, bandwidth: int):
+        """Overrides the parent method to also register the new neighbor as a bandit arm."""
+        super().add_link(neighbor_id, latency, bandwidth)
+        self.policy.add_arm(neighbor_id)
+        for policy in self.destination_policies.values():
+            policy.add_arm(neighbor_id)
 
-    def choose_next_hop(self, prev_node_id: str = None) -> str:
+    def policy_for(self, destination_id: str = None) -> BanditPolicy:
+        """The policy that routes towards a destination (the shared one unless per-destination)."""
+        if not self.routes_per_destination or destination_id is None:
+            return self.policy
+        policy = self.destination_policies.get(destination_id)
+        if policy is None:
+            policy = self.destination_policies[destination_id] = self.policy_factory()
+            for neighbor_id in self.neighbors:
+                policy.add_arm(neighbor_id)
+        return policy
+
+    def choose_next_hop(self, prev_node_id: str = None, destination_id: str = None,
+                        visited: set = None) -> str:
         """
-        Selects the next hop using the UCB1 algorithm, avoiding the previous node.
+        Selects the next hop using the node's bandit policy, avoiding the previous node
+        and, when a visited set is given (see QRoutingNode), every visited node.
         """
         # --- FIX: Filter out the previous node to prevent immediate reversal ---
-        available_neighbors = [nid for nid in self.neighbors if nid != prev_node_id]
+        if not visited:
+            available_neighbors = [nid for nid in self.neighbors if nid != prev_node_id]
+        else:
+            available_neighbors = [nid for nid in self.neighbors
+                                   if nid != prev_node_id and nid not in visited]
 
         if not available_neighbors:
+            self.selection_probability = None
             return None # This is a dead end, packet will fail
 
-        self.total_pulls += 1
-
-        # First, check for any available neighbors that have never been tried
-        for neighbor_id in available_neighbors:
-            if self.mab_data[neighbor_id]['counts'] == 0:
-                return neighbor_id
-
-        # If all have been tried at least once, calculate UCB1 scores
-        best_neighbor = None
-        max_score = -1
-
-        for neighbor_id in available_neighbors:
-            arm_data = self.mab_data[neighbor_id]
-            
-            average_reward = arm_data['values']
-            exploration_term = math.sqrt((2 * math.log(self.total_pulls)) / arm_data['counts'])
-            ucb_score = average_reward + exploration_term
+        policy = self.policy_for(destination_id)
+        next_node_id = policy.select(available_neighbors)
+        self.selection_probability = policy.selection_probability
+        return next_node_id
 
-            if ucb_score > max_score:
-                max_score = ucb_score
-                best_neighbor = neighbor_id
-        
-        return best_neighbor
+    def update_reward(self, chosen_neighbor_id: str, reward: float, destination_id: str = None,
+                      probability: float = None):
+        """
+        Updates the bandit policy for a chosen neighbor after receiving a reward.
+        `probability` is the `selection_probability` of the rewarded decision.
+        """
+        self.policy_for(destination_id).update(chosen_neighbor_id, reward, probability)
 
-    def update_reward(self, chosen_neighbor_id: str, reward: float):
+    def get_learned_state(self) -> list:
         """
-        Updates the MAB data for a chosen neighbor after receiving a reward.
+        Returns the node's learned state as (destination_id, policy name, policy state)
+        tables: one for the shared policy (destination None) and one per destination.
         """
-        if chosen_neighbor_id not in self.mab_data:
-            return
+        tables = [(None, type(self.policy).__name__, self.policy.get_state())]
+        for destination_id, policy in self.destination_policies.items():
+            tables.append((destination_id, type(policy).__name__, policy.get_state()))
+        return tables
 
-        arm_data = self.mab_data[chosen_neighbor_id]
-        arm_data['counts'] += 1
-        n = arm_data['counts']
-        
-        old_value = arm_data['values']
-        new_value = old_value + (reward - old_value) / n
-        arm_data['values'] = new_value
+    def set_learned_state(self, tables) -> int:
+        """
+        Loads tables from `get_learned_state`, matching arms by neighbor ID. Tables
+        for another policy type, and per-destination tables when this node is not
+        per-destination, are skipped. Returns the number of arms restored.
+        """
+        restored = 0
+        for destination_id, policy_name, state in tables:
+            if destination_id is not None and not self.routes_per_destination:
+                continue
+            policy = self.policy_for(destination_id)
+            if type(policy).__name__ == policy_name:
+                restored += policy.set_state(state)
+        return restored
 
 class CognitiveGateway(CognitiveNode):
     """A gateway that uses the CognitiveNode's AI for routing decisions."""
     def __repr__(self):
-        return f"CognitiveGateway(ID='{self.node_id}')"
\ No newline at end of file
+        return f"CognitiveGateway(ID='{self.node_id}')"
+
+def route_packet(network, source_id: str, destination_id: str, link_latency, reward_factor: float,
+                 max_hops: int):
+    """
+    Walks one packet hop by hop from `source_id` to `destination_id` through a
+    network of CognitiveNodes, one trip at a time as in run_cognitive_sim.py.
+
+    Every hop is chosen with `choose_next_hop` (never reversing onto the previous
+    node), costs `link_latency(node, next_node_id)`, and is rewarded at once with
+    `reward_factor / latency`.
+
+    Returns:
+        A tuple (delivered, total latency, whether any hop's latency differed
+        from its link's base latency, i.e. the trip hit congestion).
+    """
+    packet_latency = 0.0
+    is_congested_trip = False
+    current_node = network.get_node(source_id)
+    previous_node_id = None
+    hop_count = 0
+    while current_node.node_id != destination_id:
+        if hop_count > max_hops:
+            return False, packet_latency, is_congested_trip
+        next_node_id = current_node.choose_next_hop(previous_node_id)
+        if next_node_id is None:
+            return False, packet_latency, is_congested_trip
+
+        latency = link_latency(current_node, next_node_id)
+        if latency != current_node.neighbors[next_node_id]['latency']:
+            is_congested_trip = True
+        packet_latency += latency
+        current_node.update_reward(next_node_id, reward_factor / latency)
+
+        previous_node_id = current_node.node_id
+        current_node = network.get_node(next_node_id)
+        hop_count += 1
+    return True, packet_latency, is_congested_trip
+
+class CompactCognitiveRouter:
+    """
+    The CognitiveNode UCB1 logic for every node of a CompactTopology at once.
+
+    Each directed edge slot of the CSR arrays is one bandit arm, so the MAB state
+    is a pair of flat arrays aligned with `topology.neighbors` plus one pull
+    counter per node, instead of a dict of dicts on every Node object.
+    """
+    def __init__(self, topology: CompactTopology):
+        self.topology = topology
+        self.counts = array('q', bytes(8 * topology.num_edges))
+        self.values = array('d', bytes(8 * topology.num_edges))
+        self.total_pulls = array('q', bytes(8 * topology.num_nodes))
+
+    def choose_next_hop(self, node_index: int, prev_index: int = -1) -> int:
+        """
+        Selects the edge slot of the next hop from a node using UCB1, avoiding the
+        previous node. Returns -1 at a dead end.
+
+        The neighbor index itself is `topology.neighbors[slot]`.
+        """
+        offsets = self.topology.offsets
+        start, end = offsets[node_index], offsets[node_index + 1]
+        if end - start == 0 or (end - start == 1 and self.topology.neighbors[start] == prev_index):
+            return -1
+        self.total_pulls[node_index] += 1
+        return self._select(start, end, prev_index, self.total_pulls[node_index])
+
+    def choose_next_hops(self, node_indices, prev_indices=None):
+        """
+        Selects next hops for a whole batch of packets in one call.
+
+        The result is exactly what the same sequence of `choose_next_hop` calls
+        would pick: every decision advances its node's pull count and is scored
+        at that count. Rewards only arrive between batches, so within a batch a
+        (node, previous node) group's arm scores values + x / sqrt(counts) are
+        straight lines in x = sqrt(2 ln pulls), and the group's choice only
+        changes where an arm with fewer pulls overtakes the current one. A group
+        is scored on its first decision; from its second on, its choice is
+        reused up to the pull count `_winning_until` guarantees it for, and
+        scored again there. Batches that revisit the same groups thus score
+        each group a few times instead of once per packet; when nearly every
+        decision is a group of its own, the bookkeeping makes the batch slower
+        than sequential calls (see simulations/run_batch_select_sim.py).
+
+        Args:
+            node_indices: The current node of each packet.
+            prev_indices: The previous node of each packet (-1 for none).
+
+        Returns:
+            An int64 array with the chosen edge slot per packet (-1 at dead ends).
+        """
+        offsets, neighbors = self.topology.offsets, self.topology.neighbors
+        counts, total_pulls = self.counts, self.total_pulls
+        select, winning_until = self._select, self._winning_until
+        if prev_indices is None:
+            prev_indices = [-1] * len(node_indices)
+
+        slots = array('q')
+        # (node, previous node) -> [its last choice (-1 at a dead end), pull count it provably
+        # holds below, or None until the group decides again]
+        shared = {}
+        for node_index, prev_index in zip(node_indices, prev_indices):
+            key = (node_index, prev_index)
+            entry = shared.get(key)
+            if entry is None:
+                start, end = offsets[node_index], offsets[node_index + 1]
+                if end - start == 0 or (end - start == 1 and neighbors[start] == prev_index):
+                    shared[key] = [-1, math.inf]
+                    slots.append(-1)
+                    continue
+                total_pulls[node_index] += 1
+                slot = select(start, end, prev_index, total_pulls[node_index])
+                shared[key] = [slot, None]
+                slots.append(slot)
+                continue
+            slot = entry[0]
+            if slot < 0:
+                slots.append(-1)
+                continue
+            total_pulls[node_index] += 1
+            pulls = total_pulls[node_index]
+            bound = entry[1]
+            if bound is None:
+                # An untried arm is chosen whatever the pull count.
+                bound = entry[1] = math.inf if counts[slot] == 0 else winning_until(
+                    offsets[node_index], offsets[node_index + 1], prev_index, slot, pulls)
+            if pulls >= bound:
+                slot = entry[0] = select(offsets[node_index], offsets[node_index + 1], prev_index, pulls)
+                entry[1] = None
+            slots.append(slot)
+        return slots
+
+    def update_reward(self, slot: int, reward: float):
+        """Updates the running mean reward of the arm held in an edge slot."""
+        self.counts[slot] += 1
+        self.values[slot] += (reward - self.values[slot]) / self.counts[slot]
+
+    def update_rewards(self, slots, rewards):
+        """Applies a batch of reward updates, in order. Slots of -1 are skipped."""
+        counts, values = self.counts, self.values
+        for slot, reward in zip(slots, rewards):
+            if slot < 0:
+                continue
+            n = counts[slot] + 1
+            counts[slot] = n
+            values[slot] += (reward - values[slot]) / n
+
+    def _winning_until(self, start: int, end: int, prev_index: int, winner: int, pulls: int) -> float:
+        """
+        A pull count below which `winner` (every arm tried) is the UCB1 choice,
+        from `pulls` on; 0 if it is not clearly the choice at `pulls` itself. Each arm scores values + a * x, with a = 1 / sqrt(counts)
+        and x = sqrt(2 ln pulls), so only an arm with a steeper slope `a` can
+        overtake the winner as x grows. The bound keeps the winner's lead above a
+        tolerance, far wider than floating-point error, so `_select` agrees with
+        it.
+        """
+        neighbors, counts, values = self.topology.neighbors, self.counts, self.values
+        x = math.sqrt(2 * math.log(pulls))
+        winner_slope = 1.0 / math.sqrt(counts[winner])
+        tolerance = 1e-9 * (1.0 + abs(values[winner]) + winner_slope * x)
+        x_bound = math.inf
+        for slot in range(start, end):
+            if slot == winner or neighbors[slot] == prev_index:
+                continue
+            slope = 1.0 / math.sqrt(counts[slot])
+            lead = values[winner] - values[slot] - tolerance
+            if lead + (winner_slope - slope) * x <= 0:
+                return 0
+            if slope > winner_slope:
+                x_bound = min(x_bound, lead / (slope - winner_slope))
+        exponent = x_bound * x_bound / 2
+        return math.exp(exponent) if exponent < 700 else math.inf
+
+    def _select(self, start: int, end: int, prev_index: int, total_pulls: int) -> int:
+        """The UCB1 choice among the edge slots [start, end), skipping prev_index."""
+        neighbors, counts, values = self.topology.neighbors, self.counts, self.values
+
+        # First, check for any available neighbors that have never been tried
+        for slot in range(start, end):
+            if counts[slot] == 0 and neighbors[slot] != prev_index:
+                return slot
+
+        # If all have been tried at least once, calculate UCB1 scores
+        log_term = 2 * math.log(total_pulls)
+        best_slot = -1
+        max_score = -1
+        for slot in range(start, end):
+            if neighbors[slot] == prev_index:
+                continue
+            ucb_score = values[slot] + math.sqrt(log_term / counts[slot])
+            if ucb_score > max_score:
+                max_score = ucb_score
+                best_slot = slot
+        return best_slot
@@ -1,4 +1,7 @@
 import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+from ..network.compact import CompactTopology
 
 def find_path_dijkstra(network, start_node_id: str, end_node_id: str):
     """
@@ -7,7 +10,8 @@ def find_path_dijkstra(network, start_node_id: str, end_node_id: str):
     The "cost" of traversing an edge is defined purely by its latency.
 
     Args:
-        network: The Network object containing the full graph.
+        network: The Network object containing the full graph, or a
+            CompactTopology produced by `Network.freeze()`.
         start_node_id: The ID of the starting node.
         end_node_id: The ID of the target node.
 
@@ -17,38 +21,204 @@ def find_path_dijkstra(network, start_node_id: str, end_node_id: str):
         - The total accumulated latency of that path.
         Returns (None, float('inf')) if no path is found.
     """
-    # Priority queue stores tuples of (total_latency, current_node_id, path_list)
-    pq = [(0, start_node_id, [])]
-    visited = set()
-    
-    # Using a dictionary to store the shortest path found so far to each node
-    # Format: {node_id: (total_latency, path_list)}
-    shortest_paths = {start_node_id: (0, [])}
+    if isinstance(network, CompactTopology):
+        start = network.get_index(start_node_id)
+        end = network.get_index(end_node_id)
+        if start is None or end is None:
+            return None, float('inf')
+        distances, parents = _dijkstra_compact(network, start, end)
+        if end not in distances:
+            return None, float('inf') # No path found
+        path = [network.node_ids[i] for i in _walk_parents(parents, end)]
+        return path, distances[end]
+
+    distances, parents = _dijkstra(network, start_node_id, end_node_id)
+    if end_node_id not in distances:
+        return None, float('inf') # No path found
+    return _walk_parents(parents, end_node_id), distances[end_node_id]
+
+def shortest_path_tree(network, source_id: str):
+    """
+    Computes the full shortest-path tree rooted at one node.
+
+    Returns:
+        A tuple (distances, parents) of dicts keyed by node ID: the shortest latency
+        to every reachable node, and each node's predecessor on that path (None for
+        the source itself). A source missing from the graph reaches only itself.
+    """
+    if isinstance(network, CompactTopology):
+        start = network.get_index(source_id)
+        if start is None:
+            return {source_id: 0.0}, {source_id: None}
+        distances, parents = _dijkstra_compact(network, start)
+        ids = network.node_ids
+        return ({ids[i]: d for i, d in distances.items()},
+                {ids[i]: (ids[p] if p is not None else None) for i, p in parents.items()})
+    return _dijkstra(network, source_id)
+
+def _dijkstra(network, start_node_id, end_node_id=None):
+    """
+    Dijkstra over the dict-based graph using parent pointers instead of path copies.
+
+    Returns the settled distances and the parent of every settled node. When
+    `end_node_id` is given the search stops as soon as it is settled.
+    """
+    # Priority queue stores tuples of (total_latency, current_node_id)
+    pq = [(0, start_node_id)]
+    distances = {}
+    # Tentative best latency and predecessor for every node reached so far
+    best = {start_node_id: 0}
+    parents = {start_node_id: None}
 
     while pq:
-        (latency, current_node_id, path) = heapq.heappop(pq)
+        (latency, current_node_id) = heapq.heappop(pq)
 
-        if current_node_id in visited:
+        if current_node_id in distances:
             continue
-        
-        # Add the current node to the path history
-        path = path + [current_node_id]
-        visited.add(current_node_id)
+        distances[current_node_id] = latency
 
         if current_node_id == end_node_id:
-            return path, latency
+            break
 
         current_node = network.get_node(current_node_id)
         if not current_node:
             continue
 
         for neighbor_id, properties in current_node.neighbors.items():
-            if neighbor_id not in visited:
+            if neighbor_id not in distances:
                 new_latency = latency + properties['latency']
-                
+
                 # If we found a shorter path to this neighbor, update it
-                if new_latency < shortest_paths.get(neighbor_id, (float('inf'), None))[0]:
-                    shortest_paths[neighbor_id] = (new_latency, path)
-                    heapq.heappush(pq, (new_latency, neighbor_id, path))
+                if new_latency < best.get(neighbor_id, float('inf')):
+                    best[neighbor_id] = new_latency
+                    parents[neighbor_id] = current_node_id
+                    heapq.heappush(pq, (new_latency, neighbor_id))
+
+    return distances, {node_id: parents[node_id] for node_id in distances}
+
+def _dijkstra_compact(topology: CompactTopology, start: int, end: int = None):
+    """The same search as `_dijkstra`, over the CSR arrays and integer indices."""
+    offsets, neighbors, latency = topology.offsets, topology.neighbors, topology.latency
+    pq = [(0.0, start)]
+    distances = {}
+    best = {start: 0.0}
+    parents = {start: None}
+
+    while pq:
+        (dist, current) = heapq.heappop(pq)
+        if current in distances:
+            continue
+        distances[current] = dist
+
+        if current == end:
+            break
+
+        for slot in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[slot]
+            if neighbor not in distances:
+                new_dist = dist + latency[slot]
+                if new_dist < best.get(neighbor, float('inf')):
+                    best[neighbor] = new_dist
+                    parents[neighbor] = current
+                    heapq.heappush(pq, (new_dist, neighbor))
+
+    return distances, {node: parents[node] for node in distances}
+
+def _walk_parents(parents, node):
+    """Reconstructs the path ending at `node` by following parent pointers to the root."""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
+
+class RoutingTable:
+    """
+    A set of shortest-path trees, one per source node.
+
+    Only distances and parent pointers are stored; full paths are reconstructed
+    lazily when `path()` is called, so memory grows with the number of sources
+    times the number of nodes rather than with the total length of all routes.
+    """
+    def __init__(self):
+        # Format: {source_id: (distances, parents)}
+        self.trees = {}
+
+    def add_tree(self, source_id: str, distances: dict, parents: dict):
+        self.trees[source_id] = (distances, parents)
+
+    def sources(self):
+        return list(self.trees)
+
+    def latency(self, source_id: str, destination_id: str) -> float:
+        """Returns the shortest latency between two nodes, or inf if unreachable."""
+        return self.trees[source_id][0].get(destination_id, float('inf'))
+
+    def path(self, source_id: str, destination_id: str):
+        """Returns the shortest path between two nodes as a list of IDs, or None."""
+        parents = self.trees[source_id][1]
+        if destination_id not in parents:
+            return None
+        return _walk_parents(parents, destination_id)
+
+    def __contains__(self, source_id):
+        return source_id in self.trees
+
+    def __repr__(self):
+        return f"RoutingTable(sources={len(self.trees)})"
+
+def compute_routing_table(network, sources=None, processes: int = 1, chunk_size: int = None) -> RoutingTable:
+    """
+    Computes shortest-path trees from many sources in one pass.
+
+    Args:
+        network: A Network or CompactTopology.
+        sources: The IDs of the source nodes. Defaults to every node (all-pairs).
+        processes: The number of worker processes. With more than one, sources are
+            sharded across a process pool and each worker receives the graph once.
+        chunk_size: The number of sources per task in parallel mode.
+
+    Returns:
+        A RoutingTable holding one tree per source.
+    """
+    if sources is None:
+        sources = list(network.node_ids if isinstance(network, CompactTopology) else network.nodes)
+    else:
+        sources = list(sources)
+
+    table = RoutingTable()
+    if processes <= 1 or len(sources) < 2:
+        for source_id in sources:
+            table.add_tree(source_id, *shortest_path_tree(network, source_id))
+        return table
+
+    if chunk_size is None:
+        chunk_size = max(1, len(sources) // (processes * 4))
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(network,)) as pool:
+        for results in pool.map(_trees_for_sources, chunks):
+            for source_id, distances, parents in results:
+                table.add_tree(source_id, distances, parents)
+    return table
+
+def compute_gateway_routing_table(network, processes: int = 1) -> RoutingTable:
+    """Computes shortest-path trees rooted at every gateway of the network."""
+    if isinstance(network, CompactTopology):
+        gateways = [network.node_ids[i] for i, flag in enumerate(network.is_gateway) if flag]
+    else:
+        gateways = list(network.gateways)
+    return compute_routing_table(network, gateways, processes)
+
+# --- Process pool workers ---
+# The graph is shipped to each worker once through the pool initializer and kept
+# in a module global, so tasks only carry the list of sources to expand.
+_worker_network = None
+
+def _init_worker(network):
+    global _worker_network
+    _worker_network = network
 
-    return None, float('inf') # No path found
\ No newline at end of file
+def _trees_for_sources(source_ids):
+    return [(source_id, *shortest_path_tree(_worker_network, source_id)) for source_id in source_ids]
@@ -0,0 +1,137 @@
+import heapq
+
+from .dumb_router import _walk_parents
+
+class DynamicShortestPathTree:
+    """
+    A single-source shortest-path tree that is repaired incrementally as link
+    latencies change, instead of being recomputed from scratch.
+
+    The cost model is the same as `find_path_dijkstra`: the cost of an edge is its
+    latency. Link latencies are copied from the Network when the tree is built and
+    afterwards only change through `update_link`, so the Network itself is never
+    modified.
+
+    - A latency decrease can only shorten paths, so Dijkstra is restarted from the
+      link's endpoints and stops as soon as no further distance improves.
+    - A latency increase only matters for a tree edge. The subtree hanging below
+      that edge is invalidated, each of its nodes is re-seeded from its best
+      neighbor outside the subtree, and Dijkstra runs over the subtree alone.
+
+    Attributes:
+        source_id (str): The root of the tree.
+        distances (dict): Shortest latency from the source to each reachable node.
+        parents (dict): Each reachable node's predecessor (None for the source).
+        nodes_updated (int): How many node labels repairs have touched so far,
+            a measure of the work saved over full recomputation.
+    """
+    def __init__(self, network, source_id: str):
+        self.source_id = source_id
+        # Format: {node_id: {neighbor_id: latency}}
+        self.adjacency = {
+            node_id: {neighbor_id: properties['latency'] for neighbor_id, properties in node.neighbors.items()}
+            for node_id, node in network.nodes.items()
+        }
+        self.distances = {}
+        self.parents = {}
+        self.children = {node_id: set() for node_id in self.adjacency}
+        self.nodes_updated = 0
+        self.recompute()
+
+    def recompute(self):
+        """Rebuilds the whole tree from scratch."""
+        self.distances = {self.source_id: 0}
+        self.parents = {self.source_id: None}
+        for children in self.children.values():
+            children.clear()
+        self._propagate([(0, self.source_id)])
+
+    def latency(self, destination_id: str) -> float:
+        """Returns the current shortest latency to a node, or inf if it is unreachable."""
+        return self.distances.get(destination_id, float('inf'))
+
+    def path(self, destination_id: str):
+        """Returns the current shortest path to a node as a list of IDs, or None."""
+        if destination_id not in self.parents:
+            return None
+        return _walk_parents(self.parents, destination_id)
+
+    def update_link(self, node_a_id: str, node_b_id: str, latency: float):
+        """Sets the latency of the (undirected) link between two nodes and repairs the tree."""
+        old_latency = self.adjacency[node_a_id][node_b_id]
+        self.adjacency[node_a_id][node_b_id] = latency
+        self.adjacency[node_b_id][node_a_id] = latency
+
+        if latency < old_latency:
+            self._on_decrease(node_a_id, node_b_id)
+        elif latency > old_latency:
+            self._on_increase(node_a_id, node_b_id)
+
+    # --- Internals ---
+
+    def _set_parent(self, node_id, parent_id):
+        old_parent = self.parents.get(node_id)
+        if old_parent is not None:
+            self.children[old_parent].discard(node_id)
+        self.parents[node_id] = parent_id
+        if parent_id is not None:
+            self.children[parent_id].add(node_id)
+
+    def _on_decrease(self, node_a_id, node_b_id):
+        pq = []
+        for u, v in ((node_a_id, node_b_id), (node_b_id, node_a_id)):
+            if u in self.distances:
+                new_latency = self.distances[u] + self.adjacency[u][v]
+                if new_latency < self.distances.get(v, float('inf')):
+                    self.distances[v] = new_latency
+                    self._set_parent(v, u)
+                    heapq.heappush(pq, (new_latency, v))
+        self._propagate(pq)
+
+    def _on_increase(self, node_a_id, node_b_id):
+        if self.parents.get(node_b_id) == node_a_id:
+            root = node_b_id
+        elif self.parents.get(node_a_id) == node_b_id:
+            root = node_a_id
+        else:
+            return # Not a tree edge, so no shortest path used it
+
+        # Collect and invalidate the subtree that hung below the edge
+        subtree = [root]
+        for node_id in subtree:
+            subtree.extend(self.children[node_id])
+        affected = set(subtree)
+        for node_id in subtree:
+            del self.distances[node_id]
+            self._set_parent(node_id, None)
+            del self.parents[node_id]
+
+        # Re-seed every invalidated node from its best neighbor outside the subtree
+        pq = []
+        for node_id in subtree:
+            best_latency, best_parent = float('inf'), None
+            for neighbor_id, latency in self.adjacency[node_id].items():
+                if neighbor_id not in affected and neighbor_id in self.distances:
+                    candidate = self.distances[neighbor_id] + latency
+                    if candidate < best_latency:
+                        best_latency, best_parent = candidate, neighbor_id
+            if best_parent is not None:
+                self.distances[node_id] = best_latency
+                self._set_parent(node_id, best_parent)
+                heapq.heappush(pq, (best_latency, node_id))
+        self._propagate(pq)
+
+    def _propagate(self, pq):
+        """Runs Dijkstra from the seeded queue, relaxing only labels that improve."""
+        distances, adjacency = self.distances, self.adjacency
+        while pq:
+            (latency, node_id) = heapq.heappop(pq)
+            if latency > distances.get(node_id, float('inf')):
+                continue # Stale queue entry
+            self.nodes_updated += 1
+            for neighbor_id, link_latency in adjacency[node_id].items():
+                new_latency = latency + link_latency
+                if new_latency < distances.get(neighbor_id, float('inf')):
+                    distances[neighbor_id] = new_latency
+                    self._set_parent(neighbor_id, node_id)
+                    heapq.heappush(pq, (new_latency, neighbor_id))
@@ -0,0 +1,503 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It defines the multi-armed bandit policies a CognitiveNode can delegate its
+# routing decisions to. Every arm is one neighbor of the node.
+
+import math
+import random
+from array import array
+
+
+def _rng_state(rng) -> tuple:
+    """A random.Random's state as checkpointable (scalars, sequences) entries."""
+    version, words, gauss = rng.getstate()
+    return ({'rng_version': float(version), 'rng_has_gauss': float(gauss is not None),
+             'rng_gauss': 0.0 if gauss is None else gauss},
+            {'rng_state': array('I', words)})
+
+def _set_rng_state(rng, state: dict):
+    """Restores an RNG from `_rng_state` entries of a state dict, if it has them."""
+    words = state['sequences'].get('rng_state')
+    if words is None:
+        return
+    scalars = state['scalars']
+    gauss = scalars['rng_gauss'] if scalars['rng_has_gauss'] else None
+    rng.setstate((int(scalars['rng_version']), tuple(words), gauss))
+
+
+class BanditPolicy:
+    """
+    Base class for next-hop selection policies.
+
+    A policy owns all learned state for one node. Arms are neighbor IDs,
+    registered with `add_arm` as links are created. `select` picks one of the
+    currently available arms and `update` feeds back the reward observed after
+    choosing an arm. Every implementation keeps bounded memory per arm and does
+    O(1) work per update (amortised where noted).
+
+    Policies that draw arms at random from a distribution they need again at
+    update time (EXP3) set `selection_probability` to the probability of the arm
+    `select` just returned. Callers whose rewards arrive out of order, or long
+    after the decision, keep it with the decision and pass it back to `update`.
+
+    Learned state can be exported with `get_state` and loaded into another
+    policy of the same type with `set_state`, which matches arms by neighbor ID.
+    Subclasses list their per-arm arrays in `_ARM_STATE` and their scalar
+    attributes in `_SCALAR_STATE`. Policies that sample keep their generator in
+    `rng`; its state is part of the exported state, so a restored policy draws
+    the same numbers the original would have.
+    """
+    _ARM_STATE = ()
+    _SCALAR_STATE = ()
+    selection_probability = None
+
+    def __init__(self):
+        self.arms = []
+        self._arm_index = {}
+
+    def add_arm(self, arm_id: str):
+        """Registers a new arm. Registering an existing arm is a no-op."""
+        if arm_id not in self._arm_index:
+            self._arm_index[arm_id] = len(self.arms)
+            self.arms.append(arm_id)
+            self._on_add_arm()
+
+    def select(self, available_arms: list) -> str:
+        """Chooses one arm among `available_arms` (a non-empty list of registered arms)."""
+        raise NotImplementedError
+
+    def update(self, arm_id: str, reward: float, probability: float = None):
+        """
+        Records the reward observed after choosing an arm. Unknown arms are ignored.
+        `probability` is the `selection_probability` of the rewarded decision, if
+        the policy reported one.
+        """
+        index = self._arm_index.get(arm_id)
+        if index is not None:
+            self._update(index, reward)
+
+    def estimate(self, arm_id: str):
+        """
+        Returns (mean reward, effective number of pulls) for an arm, or None for
+        unknown arms and for policies that keep no per-arm mean (e.g. EXP3).
+        Used to judge how confident the node is in its preferred arm.
+        """
+        index = self._arm_index.get(arm_id)
+        return self._estimate(index) if index is not None else None
+
+    def get_state(self) -> dict:
+        """
+        Returns the learned state as a dict of plain values: 'arms' (neighbor IDs),
+        'columns' (per-arm arrays aligned with 'arms'), 'scalars' and 'sequences'
+        (any other arrays).
+        """
+        state = {
+            'arms': list(self.arms),
+            'columns': {name: array(getattr(self, name).typecode, getattr(self, name)) for name in self._ARM_STATE},
+            'scalars': {name: getattr(self, name) for name in self._SCALAR_STATE},
+            'sequences': {},
+        }
+        rng = getattr(self, 'rng', None)
+        if rng is not None:
+            scalars, sequences = _rng_state(rng)
+            state['scalars'].update(scalars)
+            state['sequences'].update(sequences)
+        return state
+
+    def set_state(self, state: dict) -> int:
+        """
+        Loads state exported by `get_state`. Arms are matched by ID: arms unknown to
+        this policy are ignored and arms missing from the state keep their current
+        values, so state can be carried across topology changes.
+
+        Returns:
+            The number of arms restored.
+        """
+        positions = [(self._arm_index.get(arm_id), i) for i, arm_id in enumerate(state['arms'])]
+        positions = [(index, i) for index, i in positions if index is not None]
+        for name in self._ARM_STATE:
+            target, source = getattr(self, name), state['columns'][name]
+            for index, i in positions:
+                target[index] = source[i]
+        for name in self._SCALAR_STATE:
+            setattr(self, name, type(getattr(self, name))(state['scalars'][name]))
+        rng = getattr(self, 'rng', None)
+        if rng is not None:
+            _set_rng_state(rng, state)
+        return len(positions)
+
+    def _on_add_arm(self):
+        """Grows per-arm state by one arm. Subclasses append to their arrays here."""
+
+    def _update(self, index: int, reward: float):
+        raise NotImplementedError
+
+    def _estimate(self, index: int):
+        return None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(arms={len(self.arms)})"
+
+
+class UCB1Policy(BanditPolicy):
+    """
+    The classic UCB1 policy with a cumulative mean reward per arm.
+
+    Untried arms are chosen first; afterwards the arm maximising
+    mean + sqrt(2 ln(total pulls) / pulls) wins.
+    """
+    _ARM_STATE = ('counts', 'values')
+    _SCALAR_STATE = ('total_pulls',)
+
+    def __init__(self):
+        super().__init__()
+        self.counts = array('q')
+        self.values = array('d')
+        self.total_pulls = 0
+
+    def _on_add_arm(self):
+        self.counts.append(0)
+        self.values.append(0.0)
+
+    def select(self, available_arms):
+        self.total_pulls += 1
+        index_of = self._arm_index
+        counts, values = self.counts, self.values
+
+        # First, check for any available neighbors that have never been tried
+        for arm_id in available_arms:
+            if counts[index_of[arm_id]] == 0:
+                return arm_id
+
+        # If all have been tried at least once, calculate UCB1 scores
+        log_term = 2 * math.log(self.total_pulls)
+        best_arm = None
+        max_score = -1
+        for arm_id in available_arms:
+            index = index_of[arm_id]
+            ucb_score = values[index] + math.sqrt(log_term / counts[index])
+            if ucb_score > max_score:
+                max_score = ucb_score
+                best_arm = arm_id
+        return best_arm
+
+    def _update(self, index, reward):
+        self.counts[index] += 1
+        self.values[index] += (reward - self.values[index]) / self.counts[index]
+
+    def _estimate(self, index):
+        return self.values[index], self.counts[index]
+
+
+class SlidingWindowUCBPolicy(BanditPolicy):
+    """
+    UCB computed only over the last `window` rewards observed by the node.
+
+    The window is a fixed-size ring buffer of (arm, reward) pairs. Each update
+    adds the new reward to its arm's sums and subtracts the reward it evicts,
+    so old congestion episodes are forgotten completely after `window` updates.
+    The ring buffer is checkpointed as well; restoring replays it oldest first.
+    """
+    def __init__(self, window: int = 100):
+        super().__init__()
+        self.window = window
+        self.ring_arms = array('i', [-1] * window)
+        self.ring_rewards = array('d', bytes(8 * window))
+        self.position = 0
+        self.filled = 0
+        self.counts = array('q')
+        self.sums = array('d')
+
+    def _on_add_arm(self):
+        self.counts.append(0)
+        self.sums.append(0.0)
+
+    def select(self, available_arms):
+        index_of = self._arm_index
+        counts, sums = self.counts, self.sums
+        for arm_id in available_arms:
+            if counts[index_of[arm_id]] == 0:
+                return arm_id
+
+        log_term = 2 * math.log(max(self.filled, 2))
+        best_arm, max_score = None, -math.inf
+        for arm_id in available_arms:
+            index = index_of[arm_id]
+            score = sums[index] / counts[index] + math.sqrt(log_term / counts[index])
+            if score > max_score:
+                max_score, best_arm = score, arm_id
+        return best_arm
+
+    def _update(self, index, reward):
+        position = self.position
+        evicted = self.ring_arms[position]
+        if evicted >= 0:
+            self.counts[evicted] -= 1
+            self.sums[evicted] -= self.ring_rewards[position]
+        else:
+            self.filled += 1
+        self.ring_arms[position] = index
+        self.ring_rewards[position] = reward
+        self.counts[index] += 1
+        self.sums[index] += reward
+        self.position = (position + 1) % self.window
+
+    def _estimate(self, index):
+        count = self.counts[index]
+        return (self.sums[index] / count if count else 0.0), count
+
+    def get_state(self):
+        state = super().get_state()
+        # Oldest entry first; empty slots are skipped.
+        order = [p for p in range(self.position, self.window)] + [p for p in range(self.position)]
+        order = [p for p in order if self.ring_arms[p] >= 0]
+        state['sequences'].update({'ring_arms': array('i', (self.ring_arms[p] for p in order)),
+                                   'ring_rewards': array('d', (self.ring_rewards[p] for p in order))})
+        return state
+
+    def set_state(self, state):
+        self.ring_arms = array('i', [-1] * self.window)
+        self.ring_rewards = array('d', bytes(8 * self.window))
+        self.position = self.filled = 0
+        self.counts = array('q', bytes(8 * len(self.arms)))
+        self.sums = array('d', bytes(8 * len(self.arms)))
+        arms = state['arms']
+        restored = set()
+        for position, reward in zip(state['sequences']['ring_arms'], state['sequences']['ring_rewards']):
+            index = self._arm_index.get(arms[position])
+            if index is not None:
+                self._update(index, reward)
+                restored.add(index)
+        return len(restored)
+
+
+class DiscountedUCBPolicy(BanditPolicy):
+    """
+    UCB over exponentially discounted counts and rewards (factor `gamma` per update).
+
+    Rather than multiplying every arm by gamma on each update, the policy stores
+    values scaled by gamma^-t and divides by that scale when reading them. The
+    stored values are renormalised whenever the scale grows too large, which
+    keeps updates amortised O(1).
+    """
+    _RENORMALISE_AT = 1e100
+    _ARM_STATE = ('counts', 'sums')
+    _SCALAR_STATE = ('scale', 'total')
+
+    def __init__(self, gamma: float = 0.98):
+        super().__init__()
+        self.gamma = gamma
+        self.scale = 1.0
+        self.counts = array('d')
+        self.sums = array('d')
+        self.total = 0.0
+
+    def _on_add_arm(self):
+        self.counts.append(0.0)
+        self.sums.append(0.0)
+
+    def select(self, available_arms):
+        index_of = self._arm_index
+        counts, sums = self.counts, self.sums
+        for arm_id in available_arms:
+            if counts[index_of[arm_id]] == 0.0:
+                return arm_id
+
+        # Both the ratio sums/counts and counts/total are scale-free; only the
+        # absolute count inside the exploration term needs unscaling.
+        scale = self.scale
+        log_term = 2 * math.log(max(self.total / scale, 2.0))
+        best_arm, max_score = None, -math.inf
+        for arm_id in available_arms:
+            index = index_of[arm_id]
+            score = sums[index] / counts[index] + math.sqrt(log_term * scale / counts[index])
+            if score > max_score:
+                max_score, best_arm = score, arm_id
+        return best_arm
+
+    def _update(self, index, reward):
+        self.scale /= self.gamma
+        self.counts[index] += self.scale
+        self.sums[index] += reward * self.scale
+        self.total += self.scale
+        if self.scale > self._RENORMALISE_AT:
+            for i in range(len(self.counts)):
+                self.counts[i] /= self.scale
+                self.sums[i] /= self.scale
+            self.total /= self.scale
+            self.scale = 1.0
+
+    def _estimate(self, index):
+        count = self.counts[index]
+        return (self.sums[index] / count if count else 0.0), count / self.scale
+
+
+class GaussianThompsonPolicy(BanditPolicy):
+    """
+    Thompson sampling with a Gaussian posterior on each arm's mean reward.
+
+    Each arm's sample is drawn from N(mean, sigma / sqrt(pulls + 1)). An optional
+    `discount` in (0, 1] caps the effective pull count at 1 / (1 - discount) so
+    the posterior never collapses and the policy keeps tracking drifting rewards.
+    """
+    _ARM_STATE = ('counts', 'means')
+
+    def __init__(self, sigma: float = 5.0, discount: float = 1.0, rng: random.Random = None):
+        super().__init__()
+        self.sigma = sigma
+        self.max_pulls = math.inf if discount >= 1.0 else 1.0 / (1.0 - discount)
+        self.rng = rng or random.Random()
+        self.counts = array('d')
+        self.means = array('d')
+
+    def _on_add_arm(self):
+        self.counts.append(0.0)
+        self.means.append(0.0)
+
+    def select(self, available_arms):
+        index_of, gauss, sigma = self._arm_index, self.rng.gauss, self.sigma
+        counts, means = self.counts, self.means
+        for arm_id in available_arms:
+            if counts[index_of[arm_id]] == 0.0:
+                return arm_id
+
+        best_arm, max_sample = None, -math.inf
+        for arm_id in available_arms:
+            index = index_of[arm_id]
+            sample = gauss(means[index], sigma / math.sqrt(counts[index] + 1.0))
+            if sample > max_sample:
+                max_sample, best_arm = sample, arm_id
+        return best_arm
+
+    def _update(self, index, reward):
+        n = min(self.counts[index] + 1.0, self.max_pulls)
+        self.counts[index] = n
+        self.means[index] += (reward - self.means[index]) / n
+
+    def _estimate(self, index):
+        return self.means[index], self.counts[index]
+
+
+class BetaThompsonPolicy(BanditPolicy):
+    """
+    Thompson sampling with a Beta posterior per arm.
+
+    Rewards are mapped into [0, 1] by dividing by `max_reward` (and clipping), then
+    applied as fractional successes and failures. `discount` decays old evidence
+    towards the uniform prior in the same way as GaussianThompsonPolicy.
+    """
+    _ARM_STATE = ('alpha', 'beta')
+
+    def __init__(self, max_reward: float = 20.0, discount: float = 1.0, rng: random.Random = None):
+        super().__init__()
+        self.max_reward = max_reward
+        self.discount = discount
+        self.rng = rng or random.Random()
+        self.alpha = array('d')
+        self.beta = array('d')
+
+    def _on_add_arm(self):
+        self.alpha.append(1.0)
+        self.beta.append(1.0)
+
+    def select(self, available_arms):
+        index_of, betavariate = self._arm_index, self.rng.betavariate
+        alpha, beta = self.alpha, self.beta
+        best_arm, max_sample = None, -math.inf
+        for arm_id in available_arms:
+            index = index_of[arm_id]
+            sample = betavariate(alpha[index], beta[index])
+            if sample > max_sample:
+                max_sample, best_arm = sample, arm_id
+        return best_arm
+
+    def _update(self, index, reward):
+        success = min(max(reward / self.max_reward, 0.0), 1.0)
+        discount = self.discount
+        # Decaying only the updated arm keeps this O(1); the prior is (1, 1).
+        self.alpha[index] = 1.0 + (self.alpha[index] - 1.0) * discount + success
+        self.beta[index] = 1.0 + (self.beta[index] - 1.0) * discount + (1.0 - success)
+
+    def _estimate(self, index):
+        alpha, beta = self.alpha[index], self.beta[index]
+        return self.max_reward * alpha / (alpha + beta), alpha + beta - 2.0
+
+
+class EXP3Policy(BanditPolicy):
+    """
+    The adversarial EXP3 policy with exploration rate `gamma`.
+
+    Rewards are mapped into [0, 1] by dividing by `max_reward`. Every available arm
+    gets an exploration share of gamma / K, where K counts all registered arms,
+    and the rest of the probability is split by the arms' exponential weights;
+    the chosen arm's weight is raised by its importance-weighted reward divided
+    by the same K. With every arm available this is textbook EXP3. Weights are
+    rescaled whenever one grows too large, which keeps updates amortised O(1)
+    without overflow.
+
+    The importance weight must use the probability of the very decision being
+    rewarded, which `select` reports as `selection_probability`. Without one,
+    `update` falls back to `last_probability`, the arm's probability at its most
+    recent selection; that is exact only when every update directly follows its
+    own select, as in a sequential hop loop.
+    """
+    _RESCALE_AT = 1e100
+    _ARM_STATE = ('weights', 'last_probability')
+
+    def __init__(self, gamma: float = 0.1, max_reward: float = 20.0, rng: random.Random = None):
+        super().__init__()
+        self.gamma = gamma
+        self.max_reward = max_reward
+        self.rng = rng or random.Random()
+        self.weights = array('d')
+        self.last_probability = array('d')
+
+    def _on_add_arm(self):
+        self.weights.append(1.0)
+        self.last_probability.append(1.0)
+
+    def select(self, available_arms):
+        index_of, weights = self._arm_index, self.weights
+        explore = self.gamma / len(self.arms)
+        total = 0.0
+        for arm_id in available_arms:
+            total += weights[index_of[arm_id]]
+        exploit = (1.0 - explore * len(available_arms)) / total
+
+        threshold = self.rng.random()
+        cumulative = 0.0
+        chosen = available_arms[-1]
+        for arm_id in available_arms:
+            cumulative += exploit * weights[index_of[arm_id]] + explore
+            if threshold < cumulative:
+                chosen = arm_id
+                break
+        index = index_of[chosen]
+        self.selection_probability = exploit * weights[index] + explore
+        self.last_probability[index] = self.selection_probability
+        return chosen
+
+    def update(self, arm_id, reward, probability=None):
+        index = self._arm_index.get(arm_id)
+        if index is not None:
+            self._update(index, reward, probability)
+
+    def _update(self, index, reward, probability=None):
+        scaled = min(max(reward / self.max_reward, 0.0), 1.0)
+        if probability is None:
+            probability = self.last_probability[index]
+        estimate = scaled / probability
+        self.weights[index] *= math.exp(self.gamma * estimate / len(self.arms))
+        if self.weights[index] > self._RESCALE_AT:
+            for i in range(len(self.weights)):
+                self.weights[i] = max(self.weights[i] / self._RESCALE_AT, 1e-300)
+
+
+# Policies by name, for command-line and experiment configuration.
+POLICIES = {
+    'ucb1': UCB1Policy,
+    'sw-ucb': SlidingWindowUCBPolicy,
+    'd-ucb': DiscountedUCBPolicy,
+    'gaussian-ts': GaussianThompsonPolicy,
+    'beta-ts': BetaThompsonPolicy,
+    'exp3': EXP3Policy,
+}
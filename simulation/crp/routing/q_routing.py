@@ -0,0 +1,172 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It implements Q-routing: every node learns, per destination, how long a packet
+# still needs from here via each neighbor, using the estimate the neighbor reports
+# back after each hop. Credit for the whole remaining journey thus flows back one
+# hop at a time instead of each node only ever seeing its own link latency.
+
+import random
+from array import array
+
+from ..network.node import Node
+from .policies import _rng_state, _set_rng_state
+
+class QRoutingNode(Node):
+    """
+    A Node that routes with per-destination Q-routing (Boyan & Littman, 1994).
+
+    For every destination it has seen, the node keeps a table Q[destination] with
+    one estimate per neighbor: the expected latency from this node to the
+    destination when forwarding via that neighbor. After a hop to neighbor y
+    took `hop_latency` (including any queueing), y reports its own best estimate
+    t = min Q_y[destination], and the node moves its estimate towards the sample:
+
+        Q[destination][y] += learning_rate * (hop_latency + t - Q[destination][y])
+
+    Next hops are chosen greedily (lowest estimate), with probability `epsilon` at
+    random so that estimates of paths that recovered from congestion get refreshed.
+    Neighbors the packet has already visited are never chosen, so packets cannot
+    loop; a packet whose every remaining neighbor was visited is at a dead end,
+    and TrafficSimulator steps it back to search on from an earlier node.
+
+    New tables start at each link's latency, i.e. optimistically assuming the
+    neighbor is the destination, which makes greedy selection try every neighbor.
+    A neighbor that turns out to be a dead end for a destination (every onward
+    neighbor already visited) is reported back with `dead_end_penalty` as its
+    remaining latency (in place of its own estimate, as the one sample of that
+    hop), so packets learn to stay out of cul-de-sacs.
+    """
+    # Tells the simulator to pass the destination and visited set to choose_next_hop.
+    routes_per_destination = True
+
+    def __init__(self, node_id: str, learning_rate: float = 0.5, epsilon: float = 0.02,
+                 rng: random.Random = None, dead_end_penalty: float = 1000.0):
+        super().__init__(node_id)
+        self.learning_rate = learning_rate
+        self.dead_end_penalty = dead_end_penalty
+        self.epsilon = epsilon
+        self.rng = rng or random.Random()
+        self.arms = []
+        self._arm_index = {}
+        # destination_id -> array of estimates aligned with self.arms
+        self.q_values = {}
+        # destination_id -> array of the number of samples folded into each estimate
+        self.q_counts = {}
+
+    def add_link(self, neighbor_id: str, latency: float, bandwidth: int):
+        """Overrides the parent method to add a column for the neighbor to every table."""
+        super().add_link(neighbor_id, latency, bandwidth)
+        if neighbor_id not in self._arm_index:
+            self._arm_index[neighbor_id] = len(self.arms)
+            self.arms.append(neighbor_id)
+            for table in self.q_values.values():
+                table.append(latency)
+            for counts in self.q_counts.values():
+                counts.append(0)
+
+    def choose_next_hop(self, prev_node_id: str = None, destination_id: str = None,
+                        visited: set = None) -> str:
+        """
+        Selects the neighbor with the lowest estimated latency to `destination_id`.
+
+        Args:
+            prev_node_id: The node the packet came from; never chosen.
+            destination_id: The packet's destination.
+            visited: IDs of the nodes the packet has visited (Packet.visited), or None.
+
+        Returns:
+            The next hop's ID, or None at a dead end.
+        """
+        table = self._table(destination_id)
+        arms = self.arms
+        candidates = []
+        for index, arm_id in enumerate(arms):
+            if arm_id == prev_node_id or (visited and arm_id in visited):
+                continue
+            candidates.append(index)
+        if not candidates:
+            return None
+        if self.epsilon and self.rng.random() < self.epsilon:
+            return arms[candidates[int(self.rng.random() * len(candidates))]]
+        return arms[min(candidates, key=table.__getitem__)]
+
+    def remaining_latency(self, destination_id: str) -> float:
+        """This node's best estimate of the latency still needed to reach a destination."""
+        if destination_id == self.node_id:
+            return 0.0
+        table = self._table(destination_id)
+        return min(table) if table else float('inf')
+
+    def update_estimate(self, neighbor_id: str, destination_id: str, hop_latency: float, remaining: float):
+        """
+        Folds the feedback of one hop into the estimate for (destination, neighbor):
+        the hop took `hop_latency` and the neighbor estimates `remaining` from there.
+        """
+        index = self._arm_index.get(neighbor_id)
+        if index is None:
+            return
+        table = self._table(destination_id)
+        table[index] += self.learning_rate * (hop_latency + remaining - table[index])
+        self.q_counts[destination_id][index] += 1
+
+    def estimate(self, neighbor_id: str, destination_id: str):
+        """
+        Returns (estimated latency to `destination_id` via `neighbor_id`, number of
+        samples behind it), or None for unknown neighbors. Lower is better, unlike
+        a bandit policy's estimate.
+        """
+        index = self._arm_index.get(neighbor_id)
+        if index is None:
+            return None
+        return self._table(destination_id)[index], self.q_counts[destination_id][index]
+
+    def report_dead_end(self, neighbor_id: str, destination_id: str, hop_latency: float):
+        """Feedback for a hop after which the packet could not be forwarded any further."""
+        self.update_estimate(neighbor_id, destination_id, hop_latency, self.dead_end_penalty)
+
+    def get_learned_state(self) -> list:
+        """
+        Returns one (destination_id, 'QRoutingNode', state) table per destination,
+        like CognitiveNode, plus a table for destination None that holds only the
+        state of the node's `rng` (its epsilon draws).
+        """
+        scalars, sequences = _rng_state(self.rng)
+        tables = [(None, 'QRoutingNode', {'arms': [], 'columns': {}, 'scalars': scalars, 'sequences': sequences})]
+        tables.extend((destination_id, 'QRoutingNode', {'arms': list(self.arms),
+                                                        'columns': {'q': array('d', table),
+                                                                    'n': array('q', self.q_counts[destination_id])},
+                                                        'scalars': {}, 'sequences': {}})
+                      for destination_id, table in self.q_values.items())
+        return tables
+
+    def set_learned_state(self, tables) -> int:
+        """Loads tables from `get_learned_state`, matching neighbors by ID. Returns the arms restored."""
+        restored = 0
+        for destination_id, policy_name, state in tables:
+            if policy_name != 'QRoutingNode':
+                continue
+            if destination_id is None:
+                _set_rng_state(self.rng, state)
+                continue
+            table, source = self._table(destination_id), state['columns']['q']
+            counts, source_counts = self.q_counts[destination_id], state['columns'].get('n')
+            for i, arm_id in enumerate(state['arms']):
+                index = self._arm_index.get(arm_id)
+                if index is not None:
+                    table[index] = source[i]
+                    if source_counts is not None:
+                        counts[index] = source_counts[i]
+                    restored += 1
+        return restored
+
+    def _table(self, destination_id: str):
+        table = self.q_values.get(destination_id)
+        if table is None:
+            neighbors = self.neighbors
+            table = self.q_values[destination_id] = array('d', (neighbors[arm_id]['latency'] for arm_id in self.arms))
+            self.q_counts[destination_id] = array('q', bytes(8 * len(self.arms)))
+        return table
+
+class QRoutingGateway(QRoutingNode):
+    """A gateway that routes with per-destination Q-routing."""
+    def __repr__(self):
+        return f"QRoutingGateway(ID='{self.node_id}')"
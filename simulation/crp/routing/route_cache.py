@@ -0,0 +1,190 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It implements the flow-level route cache: once a (source, destination) flow has a
+# route that can be trusted, later packets of the flow follow it directly instead of
+# running a routing decision at every hop.
+
+import sys
+from collections import OrderedDict
+
+# Approximate bytes held per entry besides the path list itself: the key tuple,
+# the entry record and the OrderedDict and link-index bookkeeping.
+_ENTRY_OVERHEAD_BYTES = 240
+
+
+class RouteCache:
+    """
+    An LRU cache of routes keyed by (source_id, destination_id).
+
+    Entries are evicted least-recently-used first whenever the cache exceeds
+    `max_entries` or its estimated size exceeds `max_bytes` (either limit may be
+    None). An entry is dropped early when:
+
+    - any link on its route changes (`invalidate_link`), or
+    - it has been used `revalidate_every` times since it was stored. The next
+      packet of the flow then routes hop by hop again and, if the nodes are still
+      confident in that route (`trusts`), stores it afresh.
+
+    Static shortest paths can be cached the same way; they are only dropped by
+    link changes and eviction.
+
+    Args:
+        max_bytes (int): Memory budget for all entries, in bytes.
+        max_entries (int): Maximum number of entries.
+        revalidate_every (int): Uses of a learned route before it must be re-earned.
+        min_pulls (int): Minimum pulls of every hop's chosen arm for a route to be trusted.
+        min_margin (float): How much higher, relatively, the chosen arm's mean reward
+            must be than every alternative's at each hop.
+    """
+    def __init__(self, max_bytes: int = None, max_entries: int = None, revalidate_every: int = 100,
+                 min_pulls: int = 5, min_margin: float = 0.1):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.revalidate_every = revalidate_every
+        self.min_pulls = min_pulls
+        self.min_margin = min_margin
+        self.nbytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+                      'invalidations': 0, 'revalidations': 0}
+        # (source_id, destination_id) -> [path, uses left or None, size in bytes]
+        self._entries = OrderedDict()
+        # Undirected link (a, b) with a <= b -> keys of the routes crossing it
+        self._by_link = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, source_id: str, destination_id: str) -> list:
+        """Returns the cached route of a flow (a list of node IDs), or None."""
+        key = (source_id, destination_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        if entry[1] is not None:
+            if entry[1] <= 0:
+                self.stats['revalidations'] += 1
+                self._remove(key)
+                self.stats['misses'] += 1
+                return None
+            entry[1] -= 1
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[0]
+
+    def put(self, source_id: str, destination_id: str, path: list, learned: bool = False):
+        """
+        Stores a route. Learned (bandit) routes are subject to revalidation after
+        `revalidate_every` uses; static routes are not.
+        """
+        key = (source_id, destination_id)
+        if key in self._entries:
+            self._remove(key)
+        size = _ENTRY_OVERHEAD_BYTES + sys.getsizeof(path)
+        self._entries[key] = [path, self.revalidate_every if learned else None, size]
+        self.nbytes += size
+        for link in zip(path, path[1:]):
+            self._by_link.setdefault(_undirected(*link), set()).add(key)
+        self.stats['stores'] += 1
+        self._enforce_budget()
+
+    def invalidate(self, source_id: str, destination_id: str):
+        """Drops the route of one flow, if cached."""
+        if (source_id, destination_id) in self._entries:
+            self._remove((source_id, destination_id))
+            self.stats['invalidations'] += 1
+
+    def invalidate_link(self, node_a_id: str, node_b_id: str, learned_only: bool = False):
+        """
+        Drops every cached route that crosses the link between two nodes (either
+        direction), or with `learned_only` only the learned routes among them.
+        """
+        for key in list(self._by_link.get(_undirected(node_a_id, node_b_id), ())):
+            if learned_only and self._entries[key][1] is None:
+                continue
+            self._remove(key)
+            self.stats['invalidations'] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_link.clear()
+        self.nbytes = 0
+
+    def trusts(self, network, path: list) -> bool:
+        """
+        Whether the bandit state of the nodes along `path` is confident enough to
+        cache it as a learned route.
+
+        The route must be loop-free, and at every hop the chosen neighbor must have
+        been pulled at least `min_pulls` times and have a mean reward at least
+        `min_margin` (relatively) above every other neighbor the node could have
+        chosen there. For a QRoutingNode the chosen neighbor's latency estimate
+        must rest on `min_pulls` samples and be `min_margin` below every other
+        neighbor's. The neighbors a node could have chosen exclude the one the
+        packet came from and, for per-destination nodes, every node earlier on
+        the route (the packet has visited them). Nodes that keep no estimates
+        never trust a route.
+        """
+        if len(set(path)) != len(path):
+            return False
+        margin = 1.0 + self.min_margin
+        destination_id = path[-1]
+        for i in range(len(path) - 1):
+            node = network.get_node(path[i])
+            if getattr(node, 'routes_per_destination', False):
+                excluded = path[:i]
+            else:
+                excluded = path[i - 1:i]
+            if hasattr(node, 'q_values'):
+                if not self._confident_q(node, path[i + 1], excluded, destination_id, margin):
+                    return False
+                continue
+            policy = node.policy_for(destination_id) if hasattr(node, 'policy_for') else getattr(node, 'policy', None)
+            if policy is None:
+                return False
+            chosen = policy.estimate(path[i + 1])
+            if chosen is None or chosen[1] < self.min_pulls:
+                return False
+            for arm_id in policy.arms:
+                if arm_id == path[i + 1] or arm_id in excluded:
+                    continue
+                other = policy.estimate(arm_id)
+                if other is not None and other[0] * margin > chosen[0]:
+                    return False
+        return True
+
+    def _confident_q(self, node, next_node_id: str, excluded: list, destination_id: str, margin: float) -> bool:
+        """Whether a Q-routing node's estimates single out `next_node_id` (lowest latency) for the destination."""
+        chosen = node.estimate(next_node_id, destination_id)
+        if chosen is None or chosen[1] < self.min_pulls:
+            return False
+        for arm_id in node.arms:
+            if arm_id == next_node_id or arm_id in excluded:
+                continue
+            if node.estimate(arm_id, destination_id)[0] < chosen[0] * margin:
+                return False
+        return True
+
+    def _remove(self, key):
+        path, _, size = self._entries.pop(key)
+        self.nbytes -= size
+        for link in zip(path, path[1:]):
+            keys = self._by_link.get(_undirected(*link))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_link[_undirected(*link)]
+
+    def _enforce_budget(self):
+        while self._entries and ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+                                 (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            self._remove(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def __repr__(self):
+        return f"RouteCache(entries={len(self)}, bytes={self.nbytes}, hits={self.stats['hits']})"
+
+def _undirected(node_a_id: str, node_b_id: str):
+    return (node_a_id, node_b_id) if node_a_id <= node_b_id else (node_b_id, node_a_id)
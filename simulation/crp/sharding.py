@@ -0,0 +1,583 @@
+# This file implements the partitioned (sharded) simulation mode for topologies too
+# large for one process. The graph is split into shards, every shard runs its own
+# event loop in its own process over only its own nodes, and packets that cross a
+# shard boundary travel as messages through shared-memory ring buffers. Shards stay
+# causally consistent with conservative, window-based time synchronization.
+
+import gc
+import heapq
+import itertools
+import marshal
+import math
+import multiprocessing
+import queue
+import struct
+import time
+import traceback
+from array import array
+from multiprocessing import shared_memory
+
+from .engine import TrafficSimulator, HOP_ARRIVAL, SHARD_MESSAGE, _decision_reward, _path_indices, _probability_at
+from .network.node import Node, Gateway
+from .network.packet import Packet
+from .simulation import Network
+
+# --- Message kinds ---
+# Messages are tuples (kind, delivery time, ...) serialized with marshal, which is
+# safe here because both ends always run the same interpreter.
+_HOP = 0        # a packet arriving over a cross-shard link
+_FEEDBACK = 1   # the hop feedback (reward, or Q estimate with None at a dead end) for the node that sent it
+_CREDIT = 2     # per-destination credit travelling back along a finished packet's path
+
+# Ring buffer header: bytes written and bytes read, both ever-increasing.
+_RING_HEADER = struct.Struct('<QQ')
+_U64 = struct.Struct('<Q')
+_U32 = struct.Struct('<I')
+
+DEFAULT_RING_BYTES = 4 * 1024 * 1024
+
+
+# --- Partitioning ---
+
+def partition_by_gateway(topology, num_shards: int) -> array:
+    """
+    Splits a CompactTopology into `num_shards` shards along gateway regions.
+
+    Every node joins the region of the gateway nearest to it by link latency
+    (a multi-source Dijkstra); nodes no gateway can reach form one region per
+    connected component. Whole regions are then packed onto shards, largest
+    first onto the least loaded shard, so the links inside a region never cross
+    shards and the cross-shard links are mostly those between regions (e.g. the
+    gateway backbone of `hierarchical_depin`).
+
+    Returns:
+        An array with the shard of every node, by node index.
+    """
+    num_nodes = topology.num_nodes
+    offsets, neighbors, latency = topology.offsets, topology.neighbors, topology.latency
+    region = array('i', [-1]) * num_nodes
+    distance = array('d', [math.inf]) * num_nodes
+    sizes = []
+
+    heap = []
+    for i in range(num_nodes):
+        if topology.is_gateway[i]:
+            distance[i] = 0.0
+            heap.append((0.0, i, len(sizes)))
+            sizes.append(0)
+
+    unclaimed = 0
+    while True:
+        heapq.heapify(heap)
+        while heap:
+            d, i, r = heapq.heappop(heap)
+            if region[i] >= 0:
+                continue
+            region[i] = r
+            sizes[r] += 1
+            for slot in range(offsets[i], offsets[i + 1]):
+                j = neighbors[slot]
+                candidate = d + latency[slot]
+                if region[j] < 0 and candidate < distance[j]:
+                    distance[j] = candidate
+                    heapq.heappush(heap, (candidate, j, r))
+        # Nodes no gateway reaches seed a region of their own.
+        while unclaimed < num_nodes and region[unclaimed] >= 0:
+            unclaimed += 1
+        if unclaimed == num_nodes:
+            break
+        heap = [(0.0, unclaimed, len(sizes))]
+        sizes.append(0)
+
+    loads = [0] * num_shards
+    shard_of_region = [0] * len(sizes)
+    for r in sorted(range(len(sizes)), key=lambda r: (-sizes[r], r)):
+        target = min(range(num_shards), key=loads.__getitem__)
+        shard_of_region[r] = target
+        loads[target] += sizes[r]
+    return array('i', (shard_of_region[r] for r in region))
+
+def cross_shard_links(topology, partition) -> dict:
+    """Returns the lowest link latency between every ordered pair of shards that share a link."""
+    offsets, neighbors, latency = topology.offsets, topology.neighbors, topology.latency
+    links = {}
+    for i in range(topology.num_nodes):
+        a = partition[i]
+        for slot in range(offsets[i], offsets[i + 1]):
+            b = partition[neighbors[slot]]
+            if a != b and latency[slot] < links.get((a, b), math.inf):
+                links[(a, b)] = latency[slot]
+    return links
+
+def build_shard(topology, partition, shard: int, node_factory=Node, gateway_factory=Gateway):
+    """
+    Builds the Network of one shard: its own nodes, with all of their links
+    (including those to nodes of other shards, which are not instantiated).
+
+    Returns:
+        (network, owner): the shard's Network and the shard of every node it
+        holds or links to.
+    """
+    network = Network()
+    owner = {}
+    node_ids, is_gateway = topology.node_ids, topology.is_gateway
+    offsets, neighbors, latency, bandwidth = (topology.offsets, topology.neighbors,
+                                              topology.latency, topology.bandwidth)
+    for i in range(topology.num_nodes):
+        if partition[i] != shard:
+            continue
+        node_id = node_ids[i]
+        if is_gateway[i]:
+            node = network.gateways[node_id] = gateway_factory(node_id)
+        else:
+            node = node_factory(node_id)
+        network.nodes[node_id] = node
+        owner[node_id] = shard
+        for slot in range(offsets[i], offsets[i + 1]):
+            j = neighbors[slot]
+            neighbor_id = node_ids[j]
+            node.add_link(neighbor_id, latency[slot], bandwidth[slot])
+            if partition[j] != shard:
+                owner[neighbor_id] = partition[j]
+    return network, owner
+
+
+# --- Shared-memory transport ---
+
+class ShardRing:
+    """
+    A single-producer, single-consumer ring buffer of byte records in shared memory.
+
+    A 16-byte header holds two ever-increasing counters, bytes written and bytes
+    read; each record is a u32 length followed by its bytes, wrapping around the
+    end of the data area. Only the producer advances the write counter and only
+    the consumer the read counter, so no lock is needed as long as the two sides
+    never run at the same time (in a ShardedSimulation they are separated by the
+    round barrier). The ring must be created before the shard processes fork.
+    """
+    def __init__(self, capacity: int = DEFAULT_RING_BYTES):
+        self.capacity = capacity
+        self._memory = shared_memory.SharedMemory(create=True, size=_RING_HEADER.size + capacity)
+        self._buffer = self._memory.buf
+        _RING_HEADER.pack_into(self._buffer, 0, 0, 0)
+
+    def put(self, record: bytes) -> bool:
+        """Appends one record. Returns False, writing nothing, if the ring lacks the space."""
+        buffer = self._buffer
+        written, read = _RING_HEADER.unpack_from(buffer, 0)
+        size = _U32.size + len(record)
+        if size > self.capacity - (written - read):
+            if size > self.capacity:
+                raise ValueError(f"A {len(record)}-byte record can never fit a {self.capacity}-byte ring")
+            return False
+        self._copy_in(written % self.capacity, _U32.pack(len(record)) + record)
+        _U64.pack_into(buffer, 0, written + size)
+        return True
+
+    def take(self) -> list:
+        """Removes and returns every record written since the last call."""
+        buffer = self._buffer
+        written, read = _RING_HEADER.unpack_from(buffer, 0)
+        if written == read:
+            return []
+        data = self._copy_out(read % self.capacity, written - read)
+        _U64.pack_into(buffer, _U64.size, written)
+        records = []
+        position = 0
+        while position < len(data):
+            size = _U32.unpack_from(data, position)[0]
+            position += _U32.size
+            records.append(data[position:position + size])
+            position += size
+        return records
+
+    def close(self, unlink: bool = False):
+        """Releases the mapping; the creating process also unlinks the segment."""
+        self._buffer.release()
+        self._memory.close()
+        if unlink:
+            self._memory.unlink()
+
+    def _copy_in(self, position: int, data: bytes):
+        base = _RING_HEADER.size
+        first = min(len(data), self.capacity - position)
+        self._buffer[base + position:base + position + first] = data[:first]
+        if first < len(data):
+            self._buffer[base:base + len(data) - first] = data[first:]
+
+    def _copy_out(self, position: int, size: int) -> bytes:
+        base = _RING_HEADER.size
+        first = min(size, self.capacity - position)
+        data = bytes(self._buffer[base + position:base + position + first])
+        if first < size:
+            data += bytes(self._buffer[base:base + size - first])
+        return data
+
+
+# --- Shard simulator ---
+
+class ShardSimulator(TrafficSimulator):
+    """
+    A TrafficSimulator for one shard of a partitioned network.
+
+    Hops onto nodes of other shards, and feedback for nodes of other shards, are
+    queued as messages in per-shard outboxes instead of local events; `flush` and
+    `receive` move them through ShardRings between synchronization windows.
+
+    - A packet crossing a boundary arrives at the neighbor shard exactly when it
+      would have arrived in a single simulator.
+    - Hop feedback, dead-end reports and per-destination credit for a node of
+      another shard reach it one lookahead later than in a single simulator.
+
+    Every node must route hop by hop (CognitiveNode, QRoutingNode): static
+    shortest paths and the route cache need the whole graph. Congestion may only
+    slow links down (multipliers of at least 1): a faster cross-shard link would
+    deliver inside the window the lookahead was derived from.
+
+    Args:
+        network: The shard's Network, from `build_shard`.
+        shard: This shard's index.
+        owner: The shard of every node the shard holds or links to.
+        lookahead: The minimum latency of any cross-shard link.
+        num_shards: The number of shards, so packet IDs stay unique across shards.
+        **options: Passed on to TrafficSimulator.
+    """
+    def __init__(self, network, shard: int, owner: dict, lookahead: float, num_shards: int = 1, **options):
+        if options.get('route_cache') is not None:
+            raise ValueError("The route cache is not supported in a sharded simulation")
+        super().__init__(network, **options)
+        self.shard = shard
+        self.owner = owner
+        self.lookahead = lookahead
+        self.outboxes = {}
+        self.exchange_stats = {'sent': 0, 'received': 0, 'rounds': 0, 'blocked_flushes': 0}
+        self._packet_ids = itertools.count(shard, num_shards)
+        self.scheduler.register(SHARD_MESSAGE, self._on_shard_message)
+
+        for node in network.nodes.values():
+            if not hasattr(node, 'choose_next_hop'):
+                raise ValueError(f"{node!r} does not route hop by hop; static routes need the whole graph")
+
+    def run_synchronized(self, outgoing: dict, incoming: list, barrier, clocks, backlog, until: float = None) -> int:
+        """
+        Runs this shard in lockstep with the others until no shard has events left
+        (or the next event of every shard lies beyond `until`).
+
+        Each round first exchanges messages until every outbox is empty, with every
+        shard publishing the time of its next event. All shards then run their
+        events before the same horizon: the earliest next event of any shard plus
+        the lookahead, exclusive. A message sent within the window arrives at the
+        horizon or later, so no shard ever receives an event at or before a time
+        it has already processed. A final window clipped by `until` (which lies
+        before the horizon) includes `until` itself.
+
+        Args:
+            outgoing: Ring to each neighbor shard, by shard index.
+            incoming: Rings from the neighbor shards, in shard order.
+            barrier: A Barrier shared by all shards.
+            clocks, backlog: Shared arrays with one slot per shard.
+
+        Returns:
+            The number of windows run.
+        """
+        shard, scheduler = self.shard, self.scheduler
+        while True:
+            while True:
+                backlog[shard] = self.flush(outgoing)
+                barrier.wait()
+                self.receive(incoming)
+                blocked = any(backlog)
+                clocks[shard] = scheduler.next_time()
+                barrier.wait()
+                if not blocked:
+                    break
+                self.exchange_stats['blocked_flushes'] += 1
+
+            start = min(clocks)
+            if start == math.inf or (until is not None and start > until):
+                return self.exchange_stats['rounds']
+            horizon = start + self.lookahead
+            if until is not None and until < horizon:
+                scheduler.run(until)
+            elif horizon == math.inf:
+                scheduler.run()
+            else:
+                # The largest float below the horizon turns run()'s inclusive bound into an exclusive one.
+                scheduler.run(math.nextafter(horizon, -math.inf))
+            self.exchange_stats['rounds'] += 1
+
+    def flush(self, rings: dict) -> int:
+        """Writes queued messages into the rings. Returns the number that did not fit."""
+        dumps = marshal.dumps
+        remaining = 0
+        for shard, outbox in self.outboxes.items():
+            put = rings[shard].put
+            count = 0
+            for message in outbox:
+                if not put(dumps(message)):
+                    break
+                count += 1
+            del outbox[:count]
+            remaining += len(outbox)
+        return remaining
+
+    def receive(self, rings: list):
+        """Schedules every message waiting in the rings."""
+        loads, schedule_at = marshal.loads, self.scheduler.schedule_at
+        for ring in rings:
+            records = ring.take()
+            self.exchange_stats['received'] += len(records)
+            for record in records:
+                message = loads(record)
+                if message[0] == _HOP:
+                    schedule_at(message[1], HOP_ARRIVAL, self._unpack_hop(message))
+                else:
+                    schedule_at(message[1], SHARD_MESSAGE, message)
+
+    def set_congestion(self, node_a_id: str, node_b_id: str, multiplier: float, at: float = None):
+        """See TrafficSimulator.set_congestion; `multiplier` must be at least 1."""
+        _check_multiplier(multiplier)
+        super().set_congestion(node_a_id, node_b_id, multiplier, at)
+
+    # --- Overridden hooks ---
+
+    def _on_congestion_change(self, payload):
+        # Link changes replayed from a trace are scheduled directly, bypassing set_congestion.
+        _check_multiplier(payload[2])
+        super()._on_congestion_change(payload)
+
+    def _schedule_hop(self, delay: float, packet: Packet, from_id: str, to_id: str, latency: float):
+        shard = self.owner[to_id]
+        if shard == self.shard:
+            super()._schedule_hop(delay, packet, from_id, to_id, latency)
+            return
+        self._send(shard, (_HOP, self.scheduler.now + delay, from_id, to_id, latency,
+                           packet.packet_id, packet.source_id, packet.destination_id, packet.creation_time,
+                           packet.path_taken, packet.total_latency, packet.size, packet.visited,
+                           packet.selection_probabilities))
+
+    def _remote_hop_feedback(self, packet: Packet, from_id: str, to_node, latency: float):
+        destination_id = packet.destination_id
+        probability = _probability_at(packet.selection_probabilities, len(packet.path_taken) - 2)
+        self._send(self.owner[from_id], (_FEEDBACK, self.scheduler.now + self.lookahead, from_id, to_node.node_id,
+                                         destination_id, latency, self._hop_remaining(packet, to_node),
+                                         probability))
+
+    def _credit_path(self, packet: Packet, success: bool):
+        reward = self.reward_factor / packet.total_latency if success and packet.total_latency > 0 else 0.0
+        self._credit(packet.path_taken, len(packet.path_taken) - 2, reward, packet.destination_id,
+                     packet.selection_probabilities)
+
+    # --- Internals ---
+
+    def _send(self, shard: int, message: tuple):
+        outbox = self.outboxes.get(shard)
+        if outbox is None:
+            outbox = self.outboxes[shard] = []
+        outbox.append(message)
+        self.exchange_stats['sent'] += 1
+
+    def _unpack_hop(self, message: tuple):
+        (_, _, from_id, to_id, latency, packet_id, source_id, destination_id, creation_time,
+         path_taken, total_latency, size, visited, probabilities) = message
+        if self.packet_pool is None:
+            packet = Packet(packet_id, source_id, destination_id, size, creation_time)
+        else:
+            packet = self.packet_pool.acquire(packet_id, source_id, destination_id, size, creation_time)
+        packet.current_location_id = path_taken[-1]
+        packet.path_taken = path_taken
+        packet.total_latency = total_latency
+        packet.next_hop_id = to_id
+        packet.hop_latency = latency
+        packet.selection_probabilities = probabilities
+        packet.visited = visited
+        return packet
+
+    def _on_shard_message(self, message: tuple):
+        kind = message[0]
+        if kind == _FEEDBACK:
+            _, _, from_id, to_id, destination_id, latency, remaining, probability = message
+            node = self.network.get_node(from_id)
+            if hasattr(node, 'update_estimate'):
+                if remaining is None:
+                    node.report_dead_end(to_id, destination_id, latency)
+                else:
+                    node.update_estimate(to_id, destination_id, latency, remaining)
+            elif hasattr(node, 'update_reward') and not getattr(node, 'routes_per_destination', False) \
+                    and latency > 0:
+                node.update_reward(to_id, self.reward_factor / latency, probability=probability)
+        elif kind == _CREDIT:
+            _, _, path, index, reward, destination_id, probabilities = message
+            self._credit(path, index, reward, destination_id, probabilities)
+
+    def _credit(self, path: list, index: int, reward: float, destination_id: str, probabilities: list = None):
+        """
+        Credits the per-destination decisions along `path` from `index` backwards,
+        handing the rest to the next shard at the first node held elsewhere.
+        """
+        nodes = self.network.nodes
+        first, last = _path_indices(path)
+        while index >= 0:
+            node = nodes.get(path[index])
+            if node is None:
+                # path[index + 1] is held here, so its neighbor's owner is known.
+                # A copy, as a pooled packet's path list is reused once it finishes.
+                self._send(self.owner[path[index]], (_CREDIT, self.scheduler.now + self.lookahead,
+                                                     list(path), index, reward, destination_id, probabilities))
+                return
+            if getattr(node, 'routes_per_destination', False) and hasattr(node, 'update_reward'):
+                credit = _decision_reward(path, index, reward, first, last)
+                if credit is not None:
+                    node.update_reward(path[index + 1], credit, destination_id, _probability_at(probabilities, index))
+            index -= 1
+
+
+def _check_multiplier(multiplier: float):
+    if not multiplier >= 1.0:
+        raise ValueError(f"A sharded simulation cannot speed links up (congestion multiplier {multiplier} < 1)")
+
+
+# --- Driver ---
+
+class ShardedSimulation:
+    """
+    Runs a partitioned CompactTopology with one process per shard on one host.
+
+    Shard processes are forked, so they inherit the compact topology, the
+    partition and the callables without pickling; each builds the Node objects
+    of its own shard only. Every ordered pair of neighboring shards gets a
+    ShardRing. The lookahead of the conservative synchronization is the lowest
+    latency of any cross-shard link, so partitions whose boundary consists of
+    slow links (e.g. a gateway backbone) need the fewest rounds.
+
+    Args:
+        topology: The CompactTopology to simulate.
+        partition: The shard of every node by index, e.g. from `partition_by_gateway`.
+        node_factory, gateway_factory: Build the shard's nodes, as in `to_network`.
+        setup: Called as setup(simulator) in every shard process before it runs,
+            e.g. to inject packets or start a Workload for the shard's own sources.
+        report: Called as report(simulator) in every shard process after it ran;
+            its (picklable) result is returned with the shard's statistics.
+        ring_bytes: Capacity of each ring buffer.
+        **simulator_options: Passed on to every ShardSimulator.
+    """
+    def __init__(self, topology, partition, node_factory=Node, gateway_factory=Gateway, setup=None, report=None,
+                 ring_bytes: int = DEFAULT_RING_BYTES, **simulator_options):
+        if len(partition) != topology.num_nodes:
+            raise ValueError(f"The partition covers {len(partition)} nodes, the topology has {topology.num_nodes}")
+        if simulator_options.get('route_cache') is not None:
+            raise ValueError("The route cache is not supported in a sharded simulation")
+        self.topology = topology
+        self.partition = partition
+        self.node_factory = node_factory
+        self.gateway_factory = gateway_factory
+        self.setup = setup
+        self.report = report
+        self.ring_bytes = ring_bytes
+        self.simulator_options = simulator_options
+        self.num_shards = max(partition) + 1 if len(partition) else 0
+        self.links = cross_shard_links(topology, partition)
+        self.lookahead = min(self.links.values(), default=math.inf)
+        if self.lookahead <= 0:
+            raise ValueError("Cross-shard links need a positive latency to give the shards any lookahead")
+        self._exchange = None
+
+    def run(self, until: float = None) -> dict:
+        """
+        Runs every shard to completion (or to `until`) and gathers the results.
+
+        Returns:
+            - stats: the TrafficSimulator statistics summed over all shards
+            - shards: per shard, its node count, statistics, events, rounds,
+              messages sent and received, build and run times, and `report`
+            - lookahead, rounds and wall_s (total time, including process start)
+        """
+        context = multiprocessing.get_context('fork')
+        rings = {pair: ShardRing(self.ring_bytes) for pair in sorted(self.links)}
+        barrier = context.Barrier(self.num_shards)
+        clocks = context.RawArray('d', self.num_shards)
+        backlog = context.RawArray('q', self.num_shards)
+        results = context.Queue()
+        self._exchange = (rings, barrier, clocks, backlog, results, until)
+        processes = [context.Process(target=self._run_shard, args=(shard,), name=f"crp-shard-{shard}")
+                     for shard in range(self.num_shards)]
+
+        started = time.perf_counter()
+        try:
+            for process in processes:
+                process.start()
+            shards = [None] * self.num_shards
+            errors = []
+            for _ in range(self.num_shards):
+                shard, result, error = self._next_result(results, processes, barrier)
+                shards[shard] = result
+                if error is not None:
+                    errors.append(error)
+            for process in processes:
+                process.join()
+        finally:
+            self._exchange = None
+            for ring in rings.values():
+                ring.close(unlink=True)
+        if errors:
+            # The first shard to fail aborts the barrier; the others only report that.
+            errors.sort(key=lambda error: 'BrokenBarrierError' in error)
+            raise RuntimeError(f"A shard failed:\n{errors[0]}")
+
+        stats = {}
+        for result in shards:
+            for key, value in result['stats'].items():
+                stats[key] = stats.get(key, 0) + value
+        return {
+            'stats': stats,
+            'shards': shards,
+            'lookahead': self.lookahead,
+            'rounds': max((result['rounds'] for result in shards), default=0),
+            'wall_s': time.perf_counter() - started,
+        }
+
+    def _next_result(self, results, processes, barrier):
+        while True:
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.name for p in processes if p.exitcode not in (None, 0)]
+                if dead:
+                    barrier.abort()
+                    raise RuntimeError(f"Shard processes exited without a result: {', '.join(dead)}")
+
+    def _run_shard(self, shard: int):
+        """The body of a shard process."""
+        rings, barrier, clocks, backlog, results, until = self._exchange
+        # Keep the garbage collector off the objects inherited from the parent, so
+        # collections neither scan them nor copy their pages.
+        gc.freeze()
+        try:
+            started = time.perf_counter()
+            network, owner = build_shard(self.topology, self.partition, shard,
+                                         self.node_factory, self.gateway_factory)
+            simulator = ShardSimulator(network, shard, owner, self.lookahead, self.num_shards,
+                                       **self.simulator_options)
+            if self.setup is not None:
+                self.setup(simulator)
+            build_s = time.perf_counter() - started
+
+            outgoing = {b: ring for (a, b), ring in rings.items() if a == shard}
+            incoming = [ring for (a, b), ring in rings.items() if b == shard]
+            started = time.perf_counter()
+            rounds = simulator.run_synchronized(outgoing, incoming, barrier, clocks, backlog, until)
+            results.put((shard, {
+                'shard': shard,
+                'nodes': len(network.nodes),
+                'stats': dict(simulator.stats),
+                'events': simulator.scheduler.events_processed,
+                'rounds': rounds,
+                'messages_sent': simulator.exchange_stats['sent'],
+                'messages_received': simulator.exchange_stats['received'],
+                'build_s': build_s,
+                'run_s': time.perf_counter() - started,
+                'report': self.report(simulator) if self.report is not None else None,
+            }, None))
+        except BaseException:
+            barrier.abort()
+            results.put((shard, None, traceback.format_exc()))
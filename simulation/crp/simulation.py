@@ -2,6 +2,7 @@
 # It uses the Node and Gateway classes to construct and manage the network graph.
 
 from .network.node import Node, Gateway
+from .network.compact import CompactTopology
 
 class Network:
     """
@@ -44,6 +45,13 @@ class Network:
             # Using a print for now, will upgrade to proper logging later.
             print(f"[ERROR] Could not connect nodes. One or both IDs not found: {node1_id}, {node2_id}")
 
+    def freeze(self) -> CompactTopology:
+        """
+        Returns a compact, array-backed (CSR) snapshot of the current topology.
+        Later changes to the Network are not reflected in the snapshot.
+        """
+        return CompactTopology.from_network(self)
+
     def display_topology(self):
         """Prints a human-readable representation of the network graph and its properties."""
         print("="*40)
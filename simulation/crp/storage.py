@@ -0,0 +1,271 @@
+# This file defines the versioned binary formats used to persist topologies and
+# traffic/latency traces. Both are flat little-endian column files, 8-byte aligned,
+# so they can be memory-mapped and read in place without parsing or copying.
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .network.compact import CompactTopology
+from .engine import CONGESTION_CHANGE, TRACE_REPLAY
+
+# --- Topology file (.crpt) ---
+# Header, then these sections in order, each padded to 8 bytes:
+#   offsets      int64[num_nodes + 1]
+#   neighbors    int32[num_edges]
+#   latency      float64[num_edges]
+#   bandwidth    float64[num_edges]
+#   is_gateway   int8[num_nodes]
+#   id_offsets   int64[num_nodes + 1]   (byte offsets into the ID blob)
+#   id_blob      utf-8 node IDs, concatenated
+TOPOLOGY_MAGIC = b'CRPT'
+TOPOLOGY_VERSION = 1
+_TOPOLOGY_HEADER = struct.Struct('<4sHHQQQ')  # magic, version, reserved, nodes, edges, blob bytes
+
+# --- Trace file (.crpx) ---
+# Header, then five columns of num_records entries each, padded to 8 bytes:
+#   time float64, kind int32, a int32, b int32, value float64
+# Records are sorted by time.
+TRACE_MAGIC = b'CRPX'
+TRACE_VERSION = 1
+_TRACE_HEADER = struct.Struct('<4sHHQ')  # magic, version, reserved, records
+
+# Trace record kinds
+TRACE_INJECT = 0        # a = source index, b = destination index
+TRACE_LINK_CHANGE = 1   # a, b = link endpoints, value = latency multiplier
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+class StorageFormatError(ValueError):
+    """Raised when a file is not a valid topology or trace file of a supported version."""
+
+
+class NodeIdTable:
+    """
+    A read-only sequence of node IDs decoded on demand from a UTF-8 blob.
+
+    This lets a memory-mapped topology expose `node_ids` without decoding every
+    ID up front.
+    """
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode()
+
+    def __iter__(self):
+        blob, offsets = self._blob, self._offsets
+        for i in range(len(offsets) - 1):
+            yield bytes(blob[offsets[i]:offsets[i + 1]]).decode()
+
+
+def save_topology(topology: CompactTopology, path: str):
+    """Writes a CompactTopology to a binary topology file."""
+    encoded = [str(node_id).encode() for node_id in topology.node_ids]
+    id_offsets = array('q', [0])
+    for raw in encoded:
+        id_offsets.append(id_offsets[-1] + len(raw))
+    blob = b''.join(encoded)
+
+    with open(path, 'wb') as f:
+        _write_padded(f, _TOPOLOGY_HEADER.pack(TOPOLOGY_MAGIC, TOPOLOGY_VERSION, 0,
+                                               topology.num_nodes, topology.num_edges, len(blob)))
+        for typecode, column in (('q', topology.offsets), ('i', topology.neighbors),
+                                 ('d', topology.latency), ('d', topology.bandwidth),
+                                 ('b', topology.is_gateway), ('q', id_offsets)):
+            _write_padded(f, _to_little_endian(typecode, column))
+        _write_padded(f, blob)
+
+def load_topology(path: str, use_mmap: bool = True) -> CompactTopology:
+    """
+    Loads a binary topology file.
+
+    With `use_mmap` the file is mapped read-only and every array of the returned
+    topology is a memoryview into the mapping, so loading costs O(1) regardless of
+    size and pages are read lazily by the OS. Otherwise the file is read into memory.
+
+    Raises:
+        StorageFormatError: If the file is not a topology file of a supported
+            version, or is shorter than its header says.
+    """
+    buffer = _open_buffer(path, use_mmap)
+    magic, version, _, num_nodes, num_edges, blob_size = _read_header(_TOPOLOGY_HEADER, buffer, path)
+    _check_header(magic, version, TOPOLOGY_MAGIC, TOPOLOGY_VERSION, path)
+
+    reader = _ColumnReader(buffer, _padded(_TOPOLOGY_HEADER.size), path)
+    offsets = reader.column('q', num_nodes + 1)
+    neighbors = reader.column('i', num_edges)
+    latency = reader.column('d', num_edges)
+    bandwidth = reader.column('d', num_edges)
+    is_gateway = reader.column('b', num_nodes)
+    id_offsets = reader.column('q', num_nodes + 1)
+    blob = reader.column('B', blob_size)
+
+    topology = CompactTopology(NodeIdTable(blob, id_offsets), is_gateway, offsets, neighbors, latency, bandwidth)
+    # Keep the mapping alive for as long as the topology references it.
+    topology.buffer = buffer
+    return topology
+
+
+class Trace:
+    """
+    A time-ordered columnar log of packet injections and link latency changes.
+
+    Columns are arrays while a trace is being built and memoryviews once loaded
+    from a file. Node references are integer indices into a topology.
+    """
+    def __init__(self, times=None, kinds=None, a=None, b=None, values=None):
+        self.times = times if times is not None else array('d')
+        self.kinds = kinds if kinds is not None else array('i')
+        self.a = a if a is not None else array('i')
+        self.b = b if b is not None else array('i')
+        self.values = values if values is not None else array('d')
+
+    def __len__(self):
+        return len(self.times)
+
+    def add_injection(self, time: float, source_index: int, destination_index: int):
+        self._append(time, TRACE_INJECT, source_index, destination_index, 0.0)
+
+    def add_link_change(self, time: float, node_a_index: int, node_b_index: int, multiplier: float):
+        self._append(time, TRACE_LINK_CHANGE, node_a_index, node_b_index, multiplier)
+
+    def _append(self, time, kind, a, b, value):
+        self.times.append(time)
+        self.kinds.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+        self.values.append(value)
+
+    def __repr__(self):
+        return f"Trace(records={len(self)})"
+
+def save_trace(trace: Trace, path: str):
+    """Writes a trace to a binary trace file, sorting its records by time (stably) first."""
+    order = sorted(range(len(trace)), key=trace.times.__getitem__)
+    with open(path, 'wb') as f:
+        _write_padded(f, _TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, 0, len(trace)))
+        for typecode, column in (('d', trace.times), ('i', trace.kinds), ('i', trace.a),
+                                 ('i', trace.b), ('d', trace.values)):
+            _write_padded(f, _to_little_endian(typecode, array(typecode, (column[i] for i in order))))
+
+def load_trace(path: str, use_mmap: bool = True) -> Trace:
+    """
+    Loads a binary trace file, memory-mapped by default (see load_topology).
+
+    Raises:
+        StorageFormatError: If the file is not a trace file of a supported
+            version, or is shorter than its header says.
+    """
+    buffer = _open_buffer(path, use_mmap)
+    magic, version, _, num_records = _read_header(_TRACE_HEADER, buffer, path)
+    _check_header(magic, version, TRACE_MAGIC, TRACE_VERSION, path)
+
+    reader = _ColumnReader(buffer, _padded(_TRACE_HEADER.size), path)
+    trace = Trace(reader.column('d', num_records), reader.column('i', num_records),
+                  reader.column('i', num_records), reader.column('i', num_records),
+                  reader.column('d', num_records))
+    trace.buffer = buffer
+    return trace
+
+
+class TraceReplayer:
+    """
+    Feeds a trace into a TrafficSimulator as the simulation clock advances.
+
+    Only the next unread record sits in the event queue at any time, so replaying
+    a trace of any length costs O(1) memory in the scheduler. Injections become
+    `TrafficSimulator.inject` calls and link changes become congestion-change
+    events, which makes a run exactly reproducible from the trace alone.
+    """
+    def __init__(self, simulator, trace: Trace, node_ids):
+        self.simulator = simulator
+        self.trace = trace
+        self.node_ids = node_ids
+        self.position = 0
+        simulator.scheduler.register(TRACE_REPLAY, self._on_record)
+
+    def start(self):
+        """Schedules the first record. Call before running the simulator."""
+        if len(self.trace):
+            self.simulator.scheduler.schedule_at(self.trace.times[0], TRACE_REPLAY, None)
+
+    def _on_record(self, _):
+        trace, i, node_ids = self.trace, self.position, self.node_ids
+        kind = trace.kinds[i]
+        if kind == TRACE_INJECT:
+            self.simulator.inject(node_ids[trace.a[i]], node_ids[trace.b[i]])
+        elif kind == TRACE_LINK_CHANGE:
+            self.simulator.scheduler.schedule(0.0, CONGESTION_CHANGE,
+                                              (node_ids[trace.a[i]], node_ids[trace.b[i]], trace.values[i]))
+        self.position = i + 1
+        if self.position < len(trace):
+            self.simulator.scheduler.schedule_at(trace.times[self.position], TRACE_REPLAY, None)
+
+
+# --- Internals ---
+
+class _ColumnReader:
+    """Slices consecutive 8-byte-aligned typed columns out of a byte buffer."""
+    def __init__(self, buffer, position: int, path: str):
+        self.view = memoryview(buffer)
+        self.position = position
+        self.path = path
+
+    def column(self, typecode: str, count: int):
+        size = array(typecode).itemsize * count
+        end = self.position + size
+        if end > len(self.view):
+            raise StorageFormatError(f"{self.path} is truncated")
+        raw = self.view[self.position:end]
+        self.position = _padded(end)
+        if _NATIVE_LITTLE_ENDIAN or typecode in 'bB':
+            return raw.cast(typecode)
+        column = array(typecode, bytes(raw))
+        column.byteswap()
+        return column
+
+def _open_buffer(path: str, use_mmap: bool):
+    with open(path, 'rb') as f:
+        # An empty file cannot be mapped; it fails the header check instead.
+        if use_mmap and os.fstat(f.fileno()).st_size:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+def _read_header(layout: struct.Struct, buffer, path: str) -> tuple:
+    if len(buffer) < layout.size:
+        raise StorageFormatError(f"{path} is truncated")
+    return layout.unpack_from(buffer)
+
+def _check_header(magic, version, expected_magic, expected_version, path):
+    if magic != expected_magic:
+        raise StorageFormatError(f"{path} is not a {expected_magic.decode()} file")
+    if version > expected_version:
+        raise StorageFormatError(f"{path} uses format version {version}; "
+                                 f"this reader supports up to {expected_version}")
+
+def _to_little_endian(typecode: str, column) -> bytes:
+    if isinstance(column, array) and column.typecode == typecode:
+        data = column
+    else:
+        data = array(typecode, column)
+    if not _NATIVE_LITTLE_ENDIAN and data.itemsize > 1:
+        data = array(typecode, data)
+        data.byteswap()
+    return data.tobytes()
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+def _write_padded(f, data: bytes):
+    f.write(data)
+    f.write(b'\0' * (_padded(len(data)) - len(data)))
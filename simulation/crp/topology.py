@@ -0,0 +1,329 @@
+# This file provides seeded synthetic topology generators.
+# Generators build their link lists in bulk and return a CompactTopology, which
+# scales to millions of nodes; `to_network` turns one into a dict-based Network
+# when the object model (e.g. CognitiveNode) is needed.
+
+import math
+import random
+from array import array
+
+from .simulation import Network
+from .network.node import Node, Gateway
+from .network.compact import CompactTopology
+
+# --- Default link property ranges ---
+LATENCY_RANGE = (5.0, 50.0)          # in milliseconds (ms)
+BANDWIDTH_RANGE = (50, 1000)         # in Megabits per second (Mbps)
+BACKBONE_LATENCY_RANGE = (20.0, 80.0)
+BACKBONE_BANDWIDTH_RANGE = (1000, 10000)
+
+# The hand-wired 7-node reference mesh: (node_a, node_b, latency range, bandwidth range).
+REFERENCE_LINKS = [
+    ("GATEWAY_WEST", "NODE_1", (5, 10), (500, 1000)),
+    ("GATEWAY_WEST", "NODE_2", (10, 15), (200, 500)),
+    ("GATEWAY_EAST", "NODE_5", (5, 10), (500, 1000)),
+    ("GATEWAY_EAST", "NODE_4", (10, 15), (200, 500)),
+    ("NODE_1", "NODE_2", (20, 30), (100, 200)),
+    ("NODE_1", "NODE_3", (15, 25), (300, 600)),
+    ("NODE_2", "NODE_3", (5, 10), (800, 1000)),
+    ("NODE_3", "NODE_4", (15, 25), (300, 600)),
+    ("NODE_4", "NODE_5", (20, 30), (100, 200)),
+    ("NODE_2", "NODE_5", (40, 50), (50, 100)),
+]
+
+def reference_mesh(rng, node_factory=Node, gateway_factory=Gateway) -> Network:
+    """
+    Builds the 7-node reference mesh used by the simulation scripts.
+
+    Link properties are drawn from `rng` in link order (latency, then bandwidth),
+    so passing the `random` module after `random.seed(42)` reproduces the original
+    hand-wired scripts exactly.
+    """
+    network = Network()
+    for gateway_id in ("GATEWAY_WEST", "GATEWAY_EAST"):
+        network.nodes[gateway_id] = network.gateways[gateway_id] = gateway_factory(gateway_id)
+    for i in range(1, 6):
+        network.nodes[f"NODE_{i}"] = node_factory(f"NODE_{i}")
+    for node_a, node_b, latency_range, bandwidth_range in REFERENCE_LINKS:
+        network.connect_nodes(node_a, node_b, latency=rng.uniform(*latency_range),
+                              bandwidth=rng.randint(*bandwidth_range))
+    return network
+
+
+class _LinkBuilder:
+    """Accumulates undirected links in flat arrays before the CSR conversion."""
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.sources = array('i')
+        self.targets = array('i')
+        self.latency = array('d')
+        self.bandwidth = array('d')
+
+    def add(self, a: int, b: int, latency: float = None, latency_range=LATENCY_RANGE,
+            bandwidth_range=BANDWIDTH_RANGE, bandwidth: float = None):
+        """Adds a link; latency and bandwidth are drawn from their ranges unless given."""
+        draw = self.rng.random
+        self.sources.append(a)
+        self.targets.append(b)
+        if latency is None:
+            latency = latency_range[0] + (latency_range[1] - latency_range[0]) * draw()
+        self.latency.append(latency)
+        if bandwidth is None:
+            # Same distribution as randint(lo, hi), at a fraction of its cost.
+            bandwidth = bandwidth_range[0] + int(draw() * (bandwidth_range[1] - bandwidth_range[0] + 1))
+        self.bandwidth.append(bandwidth)
+
+    def build(self, node_ids, gateway_ids=()) -> CompactTopology:
+        return CompactTopology.from_edges(node_ids, self.sources, self.targets,
+                                          self.latency, self.bandwidth, gateway_ids)
+
+def _check_gateways(num_nodes: int, num_gateways: int):
+    if not 0 <= num_gateways <= num_nodes:
+        raise ValueError(f"Cannot place {num_gateways} gateways among {num_nodes} nodes")
+
+def _components(topology: CompactTopology) -> list:
+    """The connected components of a topology as lists of node indices, by lowest index."""
+    offsets, neighbors = topology.offsets, topology.neighbors
+    seen = bytearray(topology.num_nodes)
+    components = []
+    for root in range(topology.num_nodes):
+        if seen[root]:
+            continue
+        seen[root] = 1
+        members = [root]
+        for i in members:
+            for slot in range(offsets[i], offsets[i + 1]):
+                j = neighbors[slot]
+                if not seen[j]:
+                    seen[j] = 1
+                    members.append(j)
+        components.append(members)
+    return components
+
+def _node_ids(num_nodes: int, num_gateways: int):
+    """Gateways take the first indices; everything else is a plain node."""
+    gateway_ids = [f"GATEWAY_{i}" for i in range(num_gateways)]
+    return gateway_ids + [f"NODE_{i}" for i in range(num_gateways, num_nodes)], gateway_ids
+
+def random_geometric(num_nodes: int, mean_degree: float = 8.0, num_gateways: int = 2,
+                     seed: int = 42, latency_range=LATENCY_RANGE) -> CompactTopology:
+    """
+    A random geometric (wireless mesh) graph on the unit square.
+
+    Nodes are connected when closer than the radius that gives `mean_degree`
+    neighbors on average, and link latency grows linearly with distance across
+    `latency_range`. Candidate pairs are found through a grid of radius-sized
+    cells, so generation is linear in the number of links. The graph is not
+    guaranteed to be connected; use a mean degree of ~8 or more for large meshes.
+
+    Raises:
+        ValueError: If `num_nodes` or `mean_degree` is not positive, or there are
+            more gateways than nodes.
+    """
+    if num_nodes < 1:
+        raise ValueError(f"A random geometric graph needs at least one node (got {num_nodes})")
+    if mean_degree <= 0:
+        raise ValueError(f"The mean degree must be positive (got {mean_degree})")
+    _check_gateways(num_nodes, num_gateways)
+    rng = random.Random(seed)
+    radius = math.sqrt(mean_degree / (math.pi * num_nodes))
+    xs = array('d', (rng.random() for _ in range(num_nodes)))
+    ys = array('d', (rng.random() for _ in range(num_nodes)))
+
+    cells = {}
+    for i in range(num_nodes):
+        cells.setdefault((int(xs[i] / radius), int(ys[i] / radius)), []).append(i)
+
+    links = _LinkBuilder(rng)
+    add, sqrt = links.add, math.sqrt
+    min_latency = latency_range[0]
+    latency_per_unit = (latency_range[1] - latency_range[0]) / radius
+    radius_sq = radius * radius
+    for (cx, cy), members in cells.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            others = cells.get((cx + dx, cy + dy))
+            if not others:
+                continue
+            same_cell = dx == 0 and dy == 0
+            for k, i in enumerate(members):
+                xi, yi = xs[i], ys[i]
+                for j in (members[k + 1:] if same_cell else others):
+                    d_sq = (xi - xs[j]) ** 2 + (yi - ys[j]) ** 2
+                    if d_sq < radius_sq:
+                        add(i, j, min_latency + latency_per_unit * sqrt(d_sq))
+
+    node_ids, gateway_ids = _node_ids(num_nodes, num_gateways)
+    return links.build(node_ids, gateway_ids)
+
+def barabasi_albert(num_nodes: int, m: int = 3, num_gateways: int = 2, seed: int = 42) -> CompactTopology:
+    """
+    A scale-free Barabási–Albert graph: every new node attaches to `m` distinct
+    existing nodes chosen with probability proportional to their degree.
+
+    The highest-degree hubs are the earliest nodes, which are also the gateways.
+
+    Raises:
+        ValueError: If `m` is not positive, `num_nodes` does not exceed `m` (the
+            seed clique alone has m + 1 nodes), or there are more gateways than nodes.
+    """
+    if m < 1:
+        raise ValueError(f"Every new node must attach to at least one node (got m={m})")
+    if num_nodes <= m:
+        raise ValueError(f"A Barabási–Albert graph with m={m} needs more than {m} nodes (got {num_nodes})")
+    _check_gateways(num_nodes, num_gateways)
+    rng = random.Random(seed)
+    links = _LinkBuilder(rng)
+    # Every endpoint of every link, so a uniform draw from it is degree-proportional.
+    endpoints = array('i')
+
+    # Seed with a small clique of m + 1 nodes.
+    for i in range(m + 1):
+        for j in range(i):
+            links.add(i, j)
+            endpoints.extend((i, j))
+
+    for new in range(m + 1, num_nodes):
+        targets = set()
+        while len(targets) < m:
+            targets.add(endpoints[rng.randrange(len(endpoints))])
+        for target in targets:
+            links.add(new, target)
+            endpoints.extend((new, target))
+
+    node_ids, gateway_ids = _node_ids(num_nodes, num_gateways)
+    return links.build(node_ids, gateway_ids)
+
+def grid(rows: int, cols: int, torus: bool = False, seed: int = 42) -> CompactTopology:
+    """
+    A rows x cols lattice, optionally wrapped into a torus.
+
+    The two gateways sit at opposite corners (GATEWAY_WEST at the top left,
+    GATEWAY_EAST at the bottom right).
+
+    Raises:
+        ValueError: If the lattice has fewer than the two nodes the gateways need.
+    """
+    if rows < 1 or cols < 1 or rows * cols < 2:
+        raise ValueError(f"A grid needs at least two nodes for its gateways (got {rows}x{cols})")
+    rng = random.Random(seed)
+    links = _LinkBuilder(rng)
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            if c + 1 < cols:
+                links.add(i, i + 1)
+            elif torus and cols > 2:
+                links.add(i, r * cols)
+            if r + 1 < rows:
+                links.add(i, i + cols)
+            elif torus and rows > 2:
+                links.add(i, c)
+
+    node_ids = [f"NODE_{i}" for i in range(rows * cols)]
+    node_ids[0] = "GATEWAY_WEST"
+    node_ids[-1] = "GATEWAY_EAST"
+    return links.build(node_ids, ("GATEWAY_WEST", "GATEWAY_EAST"))
+
+def hierarchical_depin(num_regions: int, nodes_per_region: int, gateways_per_region: int = 1,
+                       mean_degree: float = 6.0, seed: int = 42) -> CompactTopology:
+    """
+    A multi-gateway DePIN layout.
+
+    Each region is a random geometric mesh of `nodes_per_region` nodes whose first
+    `gateways_per_region` members are gateways. A sparse mesh can fall apart, so
+    each further component of a region is bridged to the part holding its first
+    gateway by one link, which keeps every region connected. Every gateway
+    also links to a few random nodes of its region, and the gateways of all
+    regions form a high-bandwidth backbone ring, so inter-region traffic must
+    cross gateways.
+
+    Gateway IDs are GATEWAY_<region>_<k>; node IDs are NODE_<region>_<k>.
+
+    Raises:
+        ValueError: If there are no regions, a region has no gateway or more
+            gateways than nodes, or `mean_degree` is not positive.
+    """
+    if num_regions < 1:
+        raise ValueError(f"A DePIN layout needs at least one region (got {num_regions})")
+    if gateways_per_region < 1:
+        raise ValueError(f"Every region needs at least one gateway (got {gateways_per_region})")
+    if mean_degree <= 0:
+        raise ValueError(f"The mean degree must be positive (got {mean_degree})")
+    _check_gateways(nodes_per_region, gateways_per_region)
+    rng = random.Random(seed)
+    links = _LinkBuilder(rng)
+    node_ids = []
+    gateway_ids = []
+    backbone = []
+
+    for region in range(num_regions):
+        region_seed = rng.getrandbits(64)
+        local = random_geometric(nodes_per_region, mean_degree, gateways_per_region, region_seed)
+        base = len(node_ids)
+        for k, local_id in enumerate(local.node_ids):
+            if k < gateways_per_region:
+                node_ids.append(f"GATEWAY_{region}_{k}")
+                gateway_ids.append(node_ids[-1])
+                backbone.append(base + k)
+            else:
+                node_ids.append(f"NODE_{region}_{k}")
+
+        # Copy each undirected link of the regional mesh once.
+        for a in range(local.num_nodes):
+            for slot in local.edge_slots(a):
+                b = local.neighbors[slot]
+                if a < b:
+                    links.add(base + a, base + b, local.latency[slot], bandwidth=local.bandwidth[slot])
+
+        # Bridge the mesh's components into one, starting from the first gateway's.
+        components = _components(local)
+        connected = components[0]
+        for component in components[1:]:
+            links.add(base + rng.choice(component), base + rng.choice(connected))
+            connected.extend(component)
+
+        # Give every gateway a handful of extra access links into its region.
+        for k in range(gateways_per_region):
+            for target in rng.sample(range(gateways_per_region, nodes_per_region),
+                                     min(4, nodes_per_region - gateways_per_region)):
+                if local.find_slot(k, target) < 0:
+                    links.add(base + k, base + target)
+
+    # Backbone ring between regions (every gateway of region r to the next region).
+    if num_regions > 1:
+        for region in range(num_regions):
+            following = (region + 1) % num_regions
+            if num_regions == 2 and following < region:
+                break
+            for k in range(gateways_per_region):
+                links.add(backbone[region * gateways_per_region + k],
+                          backbone[following * gateways_per_region + k],
+                          latency_range=BACKBONE_LATENCY_RANGE,
+                          bandwidth_range=BACKBONE_BANDWIDTH_RANGE)
+
+    return links.build(node_ids, gateway_ids)
+
+def to_network(topology: CompactTopology, node_factory=Node, gateway_factory=Gateway) -> Network:
+    """
+    Expands a CompactTopology into a dict-based Network of Node objects.
+
+    Links are written one direction at a time through `Node.add_link`, which
+    avoids the recursive reciprocal bookkeeping of `Network.connect_nodes`.
+    """
+    network = Network()
+    node_ids = topology.node_ids
+    nodes = []
+    for i, node_id in enumerate(node_ids):
+        if topology.is_gateway[i]:
+            node = network.gateways[node_id] = gateway_factory(node_id)
+        else:
+            node = node_factory(node_id)
+        network.nodes[node_id] = node
+        nodes.append(node)
+
+    neighbors, latency, bandwidth, offsets = (topology.neighbors, topology.latency,
+                                              topology.bandwidth, topology.offsets)
+    for i, node in enumerate(nodes):
+        for slot in range(offsets[i], offsets[i + 1]):
+            node.add_link(node_ids[neighbors[slot]], latency[slot], bandwidth[slot])
+    return network
@@ -0,0 +1,210 @@
+# This file implements traffic-matrix workloads: offered load between many
+# source/destination pairs, with Poisson, on-off or heavy-tailed arrivals per flow.
+# Packets are generated lazily as the simulation clock advances, so a workload of
+# any length never exists in memory as a whole.
+
+import random
+from array import array
+
+from .engine import WORKLOAD_ARRIVAL
+from .network.compact import CompactTopology
+from .topology import _components
+
+
+class TrafficMatrix:
+    """
+    The offered load of a network as a list of flows.
+
+    Each flow is a (source_id, destination_id, rate) triple, with the rate in
+    packets per unit of simulation time (packets/ms in the bundled scripts).
+    """
+    def __init__(self, flows=()):
+        self.sources = []
+        self.destinations = []
+        self.rates = array('d')
+        for source_id, destination_id, rate in flows:
+            self.add(source_id, destination_id, rate)
+
+    def add(self, source_id: str, destination_id: str, rate: float):
+        self.sources.append(source_id)
+        self.destinations.append(destination_id)
+        self.rates.append(rate)
+
+    def __len__(self):
+        return len(self.rates)
+
+    def __iter__(self):
+        return zip(self.sources, self.destinations, self.rates)
+
+    def total_rate(self) -> float:
+        return sum(self.rates)
+
+    def split_routable(self, network):
+        """
+        Splits the flows by whether any path joins their endpoints in `network` (a
+        Network or CompactTopology). Flows between disconnected parts of the graph,
+        or with an endpoint missing from it, can never be delivered, so they would
+        only count as failures against whichever router is measured.
+
+        Returns:
+            A tuple (routable, unroutable) of TrafficMatrix objects.
+        """
+        topology = network if isinstance(network, CompactTopology) else network.freeze()
+        component = {}
+        for label, members in enumerate(_components(topology)):
+            for i in members:
+                component[topology.node_ids[i]] = label
+        routable, unroutable = TrafficMatrix(), TrafficMatrix()
+        for source_id, destination_id, rate in self:
+            label = component.get(source_id)
+            target = routable if label is not None and label == component.get(destination_id) else unroutable
+            target.add(source_id, destination_id, rate)
+        return routable, unroutable
+
+    @classmethod
+    def uniform(cls, endpoints, total_rate: float, destinations=None) -> 'TrafficMatrix':
+        """
+        Equal load between every ordered pair of distinct nodes, from `endpoints` to
+        `destinations` (default: the endpoints themselves).
+        """
+        sources = list(endpoints)
+        targets = sources if destinations is None else list(destinations)
+        pairs = [(s, d) for s in sources for d in targets if s != d]
+        rate = total_rate / len(pairs) if pairs else 0.0
+        return cls((s, d, rate) for s, d in pairs)
+
+    @classmethod
+    def gravity(cls, weights: dict, total_rate: float) -> 'TrafficMatrix':
+        """
+        The gravity model: the load from s to d is proportional to weight[s] * weight[d],
+        so heavy nodes (e.g. gateways) both send and attract most of the traffic.
+        """
+        items = list(weights.items())
+        products = [(s, d, ws * wd) for s, ws in items for d, wd in items if s != d]
+        norm = sum(p for _, _, p in products)
+        return cls((s, d, total_rate * p / norm) for s, d, p in products if p > 0)
+
+    def __repr__(self):
+        return f"TrafficMatrix(flows={len(self)}, total_rate={self.total_rate():.3f})"
+
+
+# --- Arrival processes ---
+# Each process turns a flow's mean rate into an endless stream of inter-arrival
+# gaps via `gaps(rate, rng)`. All of them preserve the mean rate.
+
+class PoissonArrivals:
+    """Exponential inter-arrival times: smooth, memoryless traffic."""
+    def gaps(self, rate: float, rng: random.Random):
+        expovariate = rng.expovariate
+        while True:
+            yield expovariate(rate)
+
+    def __repr__(self):
+        return "PoissonArrivals()"
+
+class OnOffArrivals:
+    """
+    Bursty traffic: exponentially distributed ON and OFF periods (means `mean_on`
+    and `mean_off`). Packets arrive as a Poisson stream during ON periods at the
+    peak rate that keeps the long-run mean equal to the flow's rate.
+    """
+    def __init__(self, mean_on: float = 10.0, mean_off: float = 40.0):
+        self.mean_on = mean_on
+        self.mean_off = mean_off
+
+    def gaps(self, rate: float, rng: random.Random):
+        peak_rate = rate * (self.mean_on + self.mean_off) / self.mean_on
+        expovariate = rng.expovariate
+        pending = 0.0  # silence carried over from OFF periods into the next gap
+        while True:
+            on_left = expovariate(1.0 / self.mean_on)
+            gap = expovariate(peak_rate)
+            while gap <= on_left:
+                yield pending + gap
+                pending = 0.0
+                on_left -= gap
+                gap = expovariate(peak_rate)
+            pending += on_left + expovariate(1.0 / self.mean_off)
+
+    def __repr__(self):
+        return f"OnOffArrivals(mean_on={self.mean_on}, mean_off={self.mean_off})"
+
+class ParetoArrivals:
+    """
+    Heavy-tailed Pareto inter-arrival times with tail index `shape` (> 1 for a
+    finite mean; below 2 the variance is infinite, giving long silences and
+    dense bursts at every time scale).
+    """
+    def __init__(self, shape: float = 1.5):
+        if shape <= 1.0:
+            raise ValueError("Pareto shape must be greater than 1 for a finite mean rate")
+        self.shape = shape
+
+    def gaps(self, rate: float, rng: random.Random):
+        shape = self.shape
+        scale = (shape - 1.0) / (shape * rate)
+        paretovariate = rng.paretovariate
+        while True:
+            yield scale * paretovariate(shape)
+
+    def __repr__(self):
+        return f"ParetoArrivals(shape={self.shape})"
+
+# Arrival processes by name, for command-line and experiment configuration.
+ARRIVALS = {
+    'poisson': PoissonArrivals,
+    'on-off': OnOffArrivals,
+    'pareto': ParetoArrivals,
+}
+
+
+class Workload:
+    """
+    Streams a TrafficMatrix into a TrafficSimulator.
+
+    Every flow with a positive rate has exactly one pending arrival event at a
+    time; handling it injects a packet and schedules the flow's next arrival, so
+    memory is O(flows) however many packets the workload produces. Arrivals stop
+    after `until` (simulation time) or once `max_packets` have been injected.
+
+    Attributes:
+        injected (int): Packets injected so far.
+        flow_packets (array): Packets injected per flow, aligned with the matrix.
+    """
+    def __init__(self, simulator, matrix: TrafficMatrix, arrivals=None, rng: random.Random = None,
+                 until: float = None, max_packets: int = None, packet_size: int = None):
+        self.simulator = simulator
+        self.matrix = matrix
+        self.arrivals = arrivals or PoissonArrivals()
+        self.rng = rng or random.Random()
+        self.until = until
+        self.max_packets = max_packets
+        self.packet_size = packet_size
+        self.injected = 0
+        self.flow_packets = array('q', bytes(8 * len(matrix)))
+        self._gaps = [None] * len(matrix)
+        simulator.scheduler.register(WORKLOAD_ARRIVAL, self._on_arrival)
+
+    def start(self):
+        """Schedules the first arrival of every flow. Call before running the simulator."""
+        for flow, rate in enumerate(self.matrix.rates):
+            if rate > 0:
+                self._gaps[flow] = self.arrivals.gaps(rate, self.rng)
+                self._schedule(flow)
+
+    def _schedule(self, flow: int):
+        scheduler = self.simulator.scheduler
+        at = scheduler.now + next(self._gaps[flow])
+        if self.until is None or at <= self.until:
+            scheduler.schedule_at(at, WORKLOAD_ARRIVAL, flow)
+        else:
+            self._gaps[flow] = None
+
+    def _on_arrival(self, flow: int):
+        if self.max_packets is not None and self.injected >= self.max_packets:
+            self._gaps[flow] = None
+            return
+        self.simulator.inject(self.matrix.sources[flow], self.matrix.destinations[flow], size=self.packet_size)
+        self.injected += 1
+        self.flow_packets[flow] += 1
+        self._schedule(flow)
@@ -0,0 +1,50 @@
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.benchmark import (benchmark_matrix, run_benchmark, write_results, load_results,
+                           compare_results, comparable_cases, CONGESTION_PROFILES)
+from crp.experiments import format_table
+
+# --- Benchmark Matrix ---
+TOPOLOGY_SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+PACKET_COUNTS = [1000]
+CONGESTION = list(CONGESTION_PROFILES)   # none, hotspot, uniform
+BASE_SEED = 42
+PROCESSES = 1               # one case at a time keeps timings comparable between runs
+RESULTS_JSON = 'benchmark_results.json'
+
+def main():
+    """
+    Usage: run_benchmarks.py [previous_results.json]
+
+    Runs the matrix and writes RESULTS_JSON. Given a previous results file (e.g.
+    from another commit), also prints every metric that changed by more than 5%.
+    """
+    start_time = time.perf_counter()
+    cases = benchmark_matrix(TOPOLOGY_SIZES, PACKET_COUNTS, CONGESTION, seed=BASE_SEED)
+    print(f"[INIT] Running {len(cases)} benchmark cases...")
+
+    results = run_benchmark(cases, processes=PROCESSES)
+    columns = ['router', 'nodes', 'packets', 'congestion', 'path_hops', 'mean_latency',
+               'success_rate', 'packets_per_sec', 'peak_rss_mb']
+    comparable, excluded = comparable_cases(results)
+    print(format_table([{c: row[c] for c in columns} for row in comparable]) if comparable else "  no comparable cases")
+    if excluded:
+        print("\n--- Not compared ---")
+        for row, reason in excluded:
+            print(f"  {row['router']}, {row['nodes']} nodes, {row['congestion']}: {reason}")
+    write_results(results, RESULTS_JSON)
+    print(f"\n[SUCCESS] Results written to {RESULTS_JSON} in {time.perf_counter() - start_time:.2f} seconds.")
+
+    if len(sys.argv) > 1:
+        changes = [row for row in compare_results(load_results(sys.argv[1]), load_results(RESULTS_JSON))
+                   if abs(row['change']) > 0.05]
+        print(f"\n--- Changes against {sys.argv[1]} (>5%) ---")
+        print(format_table(changes) if changes else "  none")
+
+if __name__ == "__main__":
+    main()
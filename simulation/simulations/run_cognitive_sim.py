@@ -6,10 +6,11 @@ import time
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from crp.simulation import Network
+from crp.topology import reference_mesh
 from crp.network.node import Node, Gateway
 from crp.routing.dumb_router import find_path_dijkstra
-from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway, route_packet
+from crp.routing.policies import UCB1Policy
 
 # --- Simulation Parameters ---
 NUM_PACKETS = 1000
@@ -21,37 +22,22 @@ CONGESTION_MULTIPLIER = 10
 REWARD_FACTOR = 100.0
 RANDOM_SEED = 42
 
-def build_network(use_cognitive_nodes=False):
-    """Builds the network, using either standard or cognitive nodes."""
-    depin_network = Network()
-
-    node_factory = CognitiveNode if use_cognitive_nodes else Node
-    gateway_factory = CognitiveGateway if use_cognitive_nodes else Gateway
-
-    # Create gateways
-    depin_network.nodes["GATEWAY_WEST"] = gateway_factory("GATEWAY_WEST")
-    depin_network.gateways["GATEWAY_WEST"] = depin_network.nodes["GATEWAY_WEST"]
-    depin_network.nodes["GATEWAY_EAST"] = gateway_factory("GATEWAY_EAST")
-    depin_network.gateways["GATEWAY_EAST"] = depin_network.nodes["GATEWAY_EAST"]
-    
-    # Create standard nodes
-    for i in range(1, 6):
-        depin_network.nodes[f"NODE_{i}"] = node_factory(f"NODE_{i}")
+def build_network(use_cognitive_nodes=False, policy_factory=None):
+    """
+    Builds the network, using either standard or cognitive nodes.
+    `policy_factory` optionally creates the bandit policy of each cognitive node.
+    """
+    if use_cognitive_nodes:
+        make_policy = policy_factory or UCB1Policy
+        node_factory = lambda node_id: CognitiveNode(node_id, make_policy())
+        gateway_factory = lambda node_id: CognitiveGateway(node_id, make_policy())
+    else:
+        node_factory, gateway_factory = Node, Gateway
 
+    # The global seed also drives the congestion draws in get_current_latency,
+    # so the topology is drawn from the module-level generator as well.
     random.seed(RANDOM_SEED)
-    # Connect all nodes
-    depin_network.connect_nodes("GATEWAY_WEST", "NODE_1", latency=random.uniform(5, 10), bandwidth=random.randint(500, 1000))
-    depin_network.connect_nodes("GATEWAY_WEST", "NODE_2", latency=random.uniform(10, 15), bandwidth=random.randint(200, 500))
-    depin_network.connect_nodes("GATEWAY_EAST", "NODE_5", latency=random.uniform(5, 10), bandwidth=random.randint(500, 1000))
-    depin_network.connect_nodes("GATEWAY_EAST", "NODE_4", latency=random.uniform(10, 15), bandwidth=random.randint(200, 500))
-    depin_network.connect_nodes("NODE_1", "NODE_2", latency=random.uniform(20, 30), bandwidth=random.randint(100, 200))
-    depin_network.connect_nodes("NODE_1", "NODE_3", latency=random.uniform(15, 25), bandwidth=random.randint(300, 600))
-    depin_network.connect_nodes("NODE_2", "NODE_3", latency=random.uniform(5, 10), bandwidth=random.randint(800, 1000))
-    depin_network.connect_nodes("NODE_3", "NODE_4", latency=random.uniform(15, 25), bandwidth=random.randint(300, 600))
-    depin_network.connect_nodes("NODE_4", "NODE_5", latency=random.uniform(20, 30), bandwidth=random.randint(100, 200))
-    depin_network.connect_nodes("NODE_2", "NODE_5", latency=random.uniform(40, 50), bandwidth=random.randint(50, 100))
-    
-    return depin_network
+    return reference_mesh(random, node_factory, gateway_factory)
 
 def get_current_latency(node_a, node_b_id):
     """Gets the latency of a link, factoring in random congestion."""
@@ -63,7 +49,7 @@ def get_current_latency(node_a, node_b_id):
     return base_latency
 
 def main():
-    start_time = time.time()
+    start_time = time.perf_counter()
     # --- Part 1: Simulate the Dumb Router ---
     print("\n" + "="*50)
     print("  PERFORMANCE ANALYSIS: DUMB ROUTER (DIJKSTRA)")
@@ -96,37 +82,9 @@ def main():
     cognitive_stats = {'total_latency': 0, 'congested_trips': 0, 'successful_packets': 0, 'failed_packets': 0}
 
     for i in range(NUM_PACKETS):
-        packet_latency = 0
-        is_congested_trip = False
-        
-        current_node = cognitive_network.get_node("GATEWAY_WEST")
-        previous_node_id = None
-        packet_successful = True
-        hop_count = 0
-        
-        while current_node.node_id != "GATEWAY_EAST":
-            if hop_count > MAX_HOPS:
-                packet_successful = False
-                break
-
-            next_node_id = current_node.choose_next_hop(previous_node_id)
-            
-            if next_node_id is None:
-                packet_successful = False
-                break
+        packet_successful, packet_latency, is_congested_trip = route_packet(
+            cognitive_network, "GATEWAY_WEST", "GATEWAY_EAST", get_current_latency, REWARD_FACTOR, MAX_HOPS)
 
-            link_latency = get_current_latency(current_node, next_node_id)
-            if link_latency != current_node.neighbors[next_node_id]['latency']:
-                is_congested_trip = True
-            
-            packet_latency += link_latency
-            reward = REWARD_FACTOR / link_latency
-            current_node.update_reward(next_node_id, reward)
-            
-            previous_node_id = current_node.node_id
-            current_node = cognitive_network.get_node(next_node_id)
-            hop_count += 1
-        
         if packet_successful:
             cognitive_stats['total_latency'] += packet_latency
             cognitive_stats['successful_packets'] += 1
@@ -161,7 +119,7 @@ def main():
         performance_gain = ((avg_dumb_latency - avg_cognitive_latency) / avg_dumb_latency) * 100
         print(f"Performance Improvement (Lower Latency): {performance_gain:.2f}%")
     print("-"*50)
-    print(f"\nTotal simulation time: {time.time() - start_time:.2f} seconds")
+    print(f"\nTotal simulation time: {time.perf_counter() - start_time:.2f} seconds")
     print("\n[SUCCESS] Phase 4: Comparative analysis complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import asyncio
+import multiprocessing
+import random
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.daemon import LoopbackCluster, ReportCollector, port_directory, serve_nodes
+from crp.topology import reference_mesh
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+
+# --- Live Daemon Parameters ---
+NUM_PACKETS = 2000
+INJECTION_INTERVAL = 0.0005   # seconds between injected packets
+EMULATE_LATENCY = True        # delay every send by the link's modelled latency
+WAIT_TIMEOUT = 30.0           # seconds to wait for stragglers after the last injection
+RANDOM_SEED = 42
+NUM_PROCESSES = 2             # processes the nodes are split over in the multi-process run
+BASE_PORT = 47100             # first port of the multi-process run's port directory
+STARTUP_TIMEOUT = 10.0        # seconds to wait for every process to bind its nodes
+
+def build_network():
+    """The reference mesh with cognitive nodes; every process builds the same one from the seed."""
+    return reference_mesh(random.Random(RANDOM_SEED), CognitiveNode, CognitiveGateway)
+
+def report(delivered, completed, latency_total, elapsed):
+    avg_latency = latency_total / delivered if delivered else 0
+    print(f"  Success Rate: {delivered / NUM_PACKETS * 100:.2f}% ({delivered}/{NUM_PACKETS})")
+    print(f"  Lost in Transit (UDP): {NUM_PACKETS - completed}")
+    print(f"  Average Measured Latency (successful packets): {avg_latency:.2f}ms")
+    print(f"  Wall Time: {elapsed:.2f}s")
+
+async def run():
+    network = build_network()
+    cluster = LoopbackCluster(network, emulate_latency=EMULATE_LATENCY)
+    await cluster.start()
+    print(f"[INIT] {len(cluster.daemons)} node daemons listening on loopback UDP.")
+
+    start_time = time.perf_counter()
+    try:
+        for _ in range(NUM_PACKETS):
+            cluster.inject("GATEWAY_WEST", "GATEWAY_EAST")
+            await asyncio.sleep(INJECTION_INTERVAL)
+        await cluster.wait_for(NUM_PACKETS, timeout=WAIT_TIMEOUT)
+    finally:
+        cluster.close()
+    elapsed = time.perf_counter() - start_time
+
+    decisions = cluster.decision_stats()
+    report(cluster.delivered, cluster.completed, cluster.latency_total, elapsed)
+    print(f"  Forwarding Decisions: {decisions['decisions']} ({decisions['decisions'] / elapsed:,.0f}/sec)")
+    print(f"  Mean Decision Latency: {decisions['ns_per_decision'] / 1000:.2f}us")
+
+async def run_multiprocess():
+    """
+    Splits the nodes over NUM_PROCESSES serve_nodes processes on fixed ports and
+    drives them from here: a ReportCollector injects every packet at the west
+    gateway's process and counts the completion reports the daemons send back.
+    """
+    node_ids = sorted(build_network().nodes)
+    directory = port_directory(node_ids, BASE_PORT)
+    collector = ReportCollector(directory)
+    await collector.start()
+
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for i in range(NUM_PROCESSES):
+        ready = context.Event()
+        process = context.Process(target=serve_nodes, args=(build_network, node_ids[i::NUM_PROCESSES], BASE_PORT,
+                                                            STARTUP_TIMEOUT + WAIT_TIMEOUT + 60.0),
+                                  kwargs=dict(report_addr=collector.address, ready=ready,
+                                              emulate_latency=EMULATE_LATENCY), daemon=True)
+        process.start()
+        processes.append((process, ready))
+    try:
+        loop = asyncio.get_running_loop()
+        for _, ready in processes:
+            if not await loop.run_in_executor(None, ready.wait, STARTUP_TIMEOUT):
+                raise RuntimeError("a node process did not bind its ports in time")
+        print(f"[INIT] {len(node_ids)} node daemons listening in {NUM_PROCESSES} processes.")
+
+        start_time = time.perf_counter()
+        for _ in range(NUM_PACKETS):
+            collector.inject("GATEWAY_WEST", "GATEWAY_EAST")
+            await asyncio.sleep(INJECTION_INTERVAL)
+        await collector.wait_for(NUM_PACKETS, timeout=WAIT_TIMEOUT)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        collector.close()
+        for process, _ in processes:
+            process.terminate()
+            process.join()
+    report(collector.delivered, collector.completed, collector.latency_total, elapsed)
+
+def main():
+    print("\n" + "="*50)
+    print("  LIVE ANALYSIS: COGNITIVE NODE DAEMONS (UDP)")
+    print("="*50)
+    print("\n--- ONE PROCESS ---")
+    asyncio.run(run())
+    print("\n--- MULTI-PROCESS (ReportCollector) ---")
+    asyncio.run(run_multiprocess())
+
+if __name__ == "__main__":
+    main()
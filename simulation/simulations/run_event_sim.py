@@ -0,0 +1,134 @@
+import random
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.metrics import MetricsCollector
+from crp.topology import reference_mesh
+from crp.routing.q_routing import QRoutingNode, QRoutingGateway
+from crp.routing.route_cache import RouteCache
+from run_cognitive_sim import (build_network, CONGESTION_NODE_A, CONGESTION_NODE_B, CONGESTION_CHANCE,
+                               CONGESTION_MULTIPLIER, REWARD_FACTOR, MAX_HOPS, RANDOM_SEED)
+
+# --- Event Simulation Parameters ---
+NUM_PACKETS = 20000
+INJECTION_RATE = 30.0       # packets per ms entering at the west gateway, above the ~27 packets
+                            # per ms the static path's GATEWAY_WEST -> NODE_2 link can carry
+PACKET_SIZE = 1500          # bytes; serialization takes 0.012ms at 1000Mbps, 0.24ms at 50Mbps
+LINK_BUFFER_SIZE = 50       # packets waiting per link before drops
+SCRIPTED_INJECTION_RATE = 5.0  # packets per ms for the scripted-congestion comparison, below capacity
+CONGESTION_PERIOD = 50.0    # ms between congestion state changes on the hot link in that comparison
+CACHE_INJECTION_RATE = 5.0  # packets per ms for the route cache comparison, below the mesh's capacity
+                            # so the learned route settles and can be trusted
+CACHE_MIN_MARGIN = 0.0      # the mesh's two best routes are within ~2% of each other, so a node's
+                            # lowest estimate is trusted without a margin over the runner-up
+
+def build_q_routing_network():
+    """Builds the same mesh as build_network, with per-destination Q-routing nodes."""
+    rng = random.Random(RANDOM_SEED)
+    random.seed(RANDOM_SEED)
+    return reference_mesh(random, lambda node_id: QRoutingNode(node_id, rng=rng),
+                          lambda node_id: QRoutingGateway(node_id, rng=rng))
+
+def run(network, injection_rate=INJECTION_RATE, route_cache=None, congestion_period=None,
+        adaptive_routing=False):
+    """
+    Runs one event-driven trial on a network and returns the simulator and its
+    metrics. With a `congestion_period`, the hot link of run_cognitive_sim is
+    also congested (or cleared) at random every period.
+    """
+    simulator = TrafficSimulator(network, reward_factor=REWARD_FACTOR, max_hops=MAX_HOPS,
+                                 bandwidth_model=True, buffer_size=LINK_BUFFER_SIZE,
+                                 packet_size=PACKET_SIZE, route_cache=route_cache,
+                                 adaptive_routing=adaptive_routing)
+    metrics = MetricsCollector()
+    metrics.attach(simulator)
+    rng = random.Random(RANDOM_SEED)
+
+    # Poisson arrivals: all packets are scheduled up front and overlap in flight.
+    # Congestion is not scripted; it comes from the offered load filling link buffers.
+    arrival = 0.0
+    for _ in range(NUM_PACKETS):
+        arrival += rng.expovariate(injection_rate)
+        simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=arrival)
+    if congestion_period is not None:
+        t = 0.0
+        while t < arrival:
+            multiplier = CONGESTION_MULTIPLIER if rng.random() < CONGESTION_CHANCE else 1.0
+            simulator.set_congestion(CONGESTION_NODE_A, CONGESTION_NODE_B, multiplier, at=t)
+            t += congestion_period
+
+    simulator.run()
+    return simulator, metrics
+
+def report(name, simulator, metrics, elapsed):
+    stats = simulator.stats
+    summary = metrics.summary()
+    delivered = stats['delivered']
+    avg_latency = stats['total_latency'] / delivered if delivered else 0
+    print(f"--- {name} ---")
+    print(f"  Success Rate: {delivered / stats['injected'] * 100:.2f}% ({delivered}/{stats['injected']})")
+    print(f"  Average Packet Latency (successful packets): {avg_latency:.2f}ms")
+    print(f"  Dropped at full link buffers: {stats['dropped']}")
+    links = simulator.links.values()
+    transmitted = sum(link.packets_sent for link in links)
+    queueing = sum(link.queueing_time for link in links)
+    print(f"  Mean queueing delay per hop: {queueing / transmitted if transmitted else 0:.2f}ms")
+    utilisation = metrics.link_utilisation(simulator.scheduler.now)
+    if utilisation:
+        busiest = max(utilisation, key=utilisation.get)
+        print(f"  Busiest link: {busiest[0]} -> {busiest[1]} at {utilisation[busiest] * 100:.1f}% utilisation")
+    print(f"  Latency p50/p95/p99: {summary['p50']:.2f} / {summary['p95']:.2f} / {summary['p99']:.2f}ms")
+    print(f"  Events: {simulator.scheduler.events_processed} in {elapsed:.2f}s "
+          f"({simulator.scheduler.events_processed / elapsed:,.0f} events/sec)")
+    cache = simulator.route_cache
+    if cache is not None:
+        print(f"  Route cache: {cache.stats['hits']} packets on cached routes, {cache.stats['misses']} routed hop by hop "
+              f"({cache.stats['stores']} routes stored, {cache.stats['revalidations']} revalidations)")
+
+def main():
+    print("\n" + "="*50)
+    print("  EVENT-DRIVEN ANALYSIS: CONCURRENT PACKETS")
+    print("="*50)
+    for name, build in (("DUMB ROUTER (BASELINE)", lambda: build_network(use_cognitive_nodes=False)),
+                        ("COGNITIVE ROUTER (CRP)", lambda: build_network(use_cognitive_nodes=True)),
+                        ("Q-ROUTING (CRP)", build_q_routing_network)):
+        start_time = time.perf_counter()
+        simulator, metrics = run(build())
+        report(name, simulator, metrics, time.perf_counter() - start_time)
+
+    # Scripted congestion on one link: the adaptive baseline re-routes around it
+    # as soon as it changes, the learners have to notice it from their rewards.
+    print("\n" + "="*50)
+    print(f"  SCRIPTED CONGESTION: {CONGESTION_NODE_A} <-> {CONGESTION_NODE_B} ({SCRIPTED_INJECTION_RATE:g} packets/ms)")
+    print("="*50)
+    for name, build, adaptive in (("DUMB ROUTER (BASELINE)", lambda: build_network(use_cognitive_nodes=False), False),
+                                  ("ADAPTIVE DIJKSTRA (BASELINE)", lambda: build_network(use_cognitive_nodes=False),
+                                   True),
+                                  ("COGNITIVE ROUTER (CRP)", lambda: build_network(use_cognitive_nodes=True), False),
+                                  ("Q-ROUTING (CRP)", build_q_routing_network, False)):
+        start_time = time.perf_counter()
+        simulator, metrics = run(build(), SCRIPTED_INJECTION_RATE, congestion_period=CONGESTION_PERIOD,
+                                 adaptive_routing=adaptive)
+        report(name, simulator, metrics, time.perf_counter() - start_time)
+
+    # Flow-level caching: once the nodes agree on the flow's route, later packets
+    # follow it without a routing decision per hop (the hops still feed back).
+    print("\n" + "="*50)
+    print(f"  FLOW-LEVEL ROUTE CACHE ({CACHE_INJECTION_RATE:g} packets/ms)")
+    print("="*50)
+    elapsed = {}
+    for name, route_cache in (("Q-ROUTING, NO CACHE", None),
+                              ("Q-ROUTING, ROUTE CACHE", RouteCache(min_margin=CACHE_MIN_MARGIN))):
+        start_time = time.perf_counter()
+        simulator, metrics = run(build_q_routing_network(), CACHE_INJECTION_RATE, route_cache)
+        elapsed[name] = time.perf_counter() - start_time
+        report(name, simulator, metrics, elapsed[name])
+    print(f"\n  Route cache speedup: {elapsed['Q-ROUTING, NO CACHE'] / elapsed['Q-ROUTING, ROUTE CACHE']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.experiments import expand_grid, run_experiments, summarize, format_table, write_csv
+
+# --- Sweep Parameters ---
+NUM_TRIALS = 20             # seeded repetitions of every configuration
+BASE_SEED = 42
+PROCESSES = None            # None uses every core
+POLICIES = ['ucb1', 'sw-ucb', 'd-ucb']
+CONGESTION_CHANCES = [0.2, 0.4]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+RESULTS_CSV = os.path.join(RESULTS_DIR, 'experiment_results.csv')
+
+def main():
+    start_time = time.time()
+    trials = expand_grid(NUM_TRIALS, BASE_SEED, policy=POLICIES, congestion_chance=CONGESTION_CHANCES)
+    print(f"[INIT] Running {len(trials)} trials...")
+
+    results = run_experiments(trials, processes=PROCESSES)
+    rows = summarize(results, group_by=['policy', 'congestion_chance'])
+
+    print(format_table(rows))
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    write_csv(rows, RESULTS_CSV)
+    print(f"\n[SUCCESS] Results written to {RESULTS_CSV} in {time.time() - start_time:.2f} seconds.")
+
+if __name__ == "__main__":
+    main()
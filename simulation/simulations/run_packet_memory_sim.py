@@ -0,0 +1,128 @@
+import gc
+import random
+import sys
+import os
+import time
+import tracemalloc
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.network.packet import PacketPool
+from crp.network.packet_store import PacketStore
+from crp.workload import TrafficMatrix, Workload
+from run_cognitive_sim import REWARD_FACTOR, MAX_HOPS, RANDOM_SEED
+from run_event_sim import build_q_routing_network
+
+# --- Memory Parameters ---
+IN_FLIGHT_PACKETS = 100000  # packets injected within 10ms, so all of them are in flight at once
+LONG_RUN_PACKETS = 200000   # packets streamed through the network to count garbage collections
+INJECTION_RATE = 20.0       # packets per ms in the long run
+RECORDED_PACKETS = 100000   # finished packets kept for analysis
+
+def in_flight_bytes(packet_pool=None) -> float:
+    """Bytes allocated per in-flight packet (packet, path and pending event) while they are all in flight."""
+    simulator = TrafficSimulator(build_q_routing_network(), reward_factor=REWARD_FACTOR,
+                                 max_hops=MAX_HOPS, packet_pool=packet_pool)
+    spacing = 10.0 / IN_FLIGHT_PACKETS
+    if packet_pool is not None:
+        # Warm the pool with one full wave, as in the steady state of a long run.
+        for k in range(IN_FLIGHT_PACKETS):
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * spacing)
+        simulator.run()
+    start = simulator.scheduler.now
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for k in range(IN_FLIGHT_PACKETS):
+        simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=start + k * spacing)
+    simulator.run(until=start + 10.0)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / simulator.scheduler.pending()
+
+def long_run(streamed: bool) -> dict:
+    """
+    Sends LONG_RUN_PACKETS packets through the network and times every garbage
+    collection, including those triggered while scheduling. Packets are either
+    all injected up front (as in run_event_sim.py), or streamed by a Workload
+    that draws them from a PacketPool.
+    """
+    simulator = TrafficSimulator(build_q_routing_network(), reward_factor=REWARD_FACTOR,
+                                 max_hops=MAX_HOPS, packet_pool=PacketPool() if streamed else None)
+    rng = random.Random(RANDOM_SEED)
+
+    pauses = []
+    started = {}
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            started['at'] = time.perf_counter()
+        else:
+            pauses.append((info['generation'], time.perf_counter() - started['at']))
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    start_time = time.perf_counter()
+    try:
+        if streamed:
+            matrix = TrafficMatrix([("GATEWAY_WEST", "GATEWAY_EAST", INJECTION_RATE)])
+            Workload(simulator, matrix, rng=rng, max_packets=LONG_RUN_PACKETS).start()
+        else:
+            arrival = 0.0
+            for _ in range(LONG_RUN_PACKETS):
+                arrival += rng.expovariate(INJECTION_RATE)
+                simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=arrival)
+        simulator.run()
+    finally:
+        gc.callbacks.remove(on_gc)
+    return {
+        'elapsed': time.perf_counter() - start_time,
+        'collections': [sum(1 for generation, _ in pauses if generation == g) for g in range(3)],
+        'pause_total': sum(pause for _, pause in pauses),
+        'pause_max': max((pause for _, pause in pauses), default=0.0),
+        'delivered': simulator.stats['delivered'],
+    }
+
+def recorded_bytes() -> tuple:
+    """Bytes per finished packet kept as Packet objects and as PacketStore records."""
+    simulator = TrafficSimulator(build_q_routing_network(), reward_factor=REWARD_FACTOR,
+                                 max_hops=MAX_HOPS)
+    kept = []
+    store = PacketStore()
+    store.attach(simulator)
+    simulator.completion_callbacks.append(lambda packet, success: kept.append(packet))
+    for k in range(RECORDED_PACKETS):
+        simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * 0.5)
+    simulator.run()
+
+    # The object, its path list and its own int and float fields; node ID strings are shared.
+    object_bytes = sum(sys.getsizeof(packet) + sys.getsizeof(packet.path_taken) +
+                       sys.getsizeof(packet.packet_id) + sys.getsizeof(packet.total_latency)
+                       for packet in kept)
+    return object_bytes / len(kept), store.nbytes() / len(store)
+
+def main():
+    print("\n" + "="*50)
+    print("  PACKET MEMORY ANALYSIS")
+    print("="*50)
+
+    print("\n--- IN-FLIGHT PACKETS ---")
+    print(f"  New Packet per packet: {in_flight_bytes():.0f} bytes per in-flight packet")
+    print(f"  Pooled packets:        {in_flight_bytes(PacketPool()):.0f} bytes per in-flight packet")
+
+    print("\n--- LONG RUN: GARBAGE COLLECTION ---")
+    for name, streamed in (("Injected up front", False), ("Streamed from a PacketPool", True)):
+        result = long_run(streamed)
+        print(f"  {name}: {result['delivered']} delivered in {result['elapsed']:.2f}s")
+        print(f"    Collections gen0/gen1/gen2: {result['collections'][0]}/{result['collections'][1]}/"
+              f"{result['collections'][2]}, total pause {result['pause_total'] * 1000:.1f}ms, "
+              f"longest {result['pause_max'] * 1000:.2f}ms")
+
+    print("\n--- FINISHED PACKETS KEPT FOR ANALYSIS ---")
+    objects, records = recorded_bytes()
+    print(f"  Packet objects: {objects:.0f} bytes per packet")
+    print(f"  PacketStore:    {records:.0f} bytes per packet")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import random
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.profiling import Profiler
+from run_cognitive_sim import (build_network, CONGESTION_NODE_A, CONGESTION_NODE_B,
+                               CONGESTION_CHANCE, CONGESTION_MULTIPLIER, REWARD_FACTOR,
+                               MAX_HOPS, RANDOM_SEED)
+
+# --- Profiling Parameters ---
+NUM_PACKETS = 20000
+INJECTION_RATE = 2.0        # packets per ms entering at the west gateway
+CONGESTION_PERIOD = 50.0    # ms between congestion state changes on the hot link
+SAMPLE_EVERY = 1            # time one in N calls; raise to cut overhead on large runs
+TRACK_ALLOCATIONS = False   # tracemalloc per call (slow); set True to find allocation hot spots
+
+def profile(use_cognitive_nodes):
+    """Runs one event-driven trial under the profiler and returns (simulator, profiler)."""
+    network = build_network(use_cognitive_nodes=use_cognitive_nodes)
+    simulator = TrafficSimulator(network, reward_factor=REWARD_FACTOR, max_hops=MAX_HOPS)
+    rng = random.Random(RANDOM_SEED)
+
+    arrival = 0.0
+    for _ in range(NUM_PACKETS):
+        arrival += rng.expovariate(INJECTION_RATE)
+        simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=arrival)
+    t = 0.0
+    while t < arrival:
+        multiplier = CONGESTION_MULTIPLIER if rng.random() < CONGESTION_CHANCE else 1.0
+        simulator.set_congestion(CONGESTION_NODE_A, CONGESTION_NODE_B, multiplier, at=t)
+        t += CONGESTION_PERIOD
+
+    profiler = Profiler(sample_every=SAMPLE_EVERY, track_allocations=TRACK_ALLOCATIONS)
+    with profiler:
+        profiler.instrument_simulator(simulator)
+        simulator.run()
+    return simulator, profiler
+
+def main():
+    print("\n" + "="*50)
+    print("  HOT-PATH PROFILE: EVENT-DRIVEN SIMULATION")
+    print("="*50)
+    for name, cognitive in (("DUMB ROUTER (BASELINE)", False), ("COGNITIVE ROUTER (CRP)", True)):
+        simulator, profiler = profile(cognitive)
+        print(f"--- {name} ---")
+        print(profiler.format_report(hops=simulator.stats['hops']))
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import random
+import sys
+import os
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.experiments import derive_seed
+from crp.metrics import MetricsCollector, LatencyHistogram
+from crp.routing.q_routing import QRoutingNode, QRoutingGateway
+from crp.sharding import ShardedSimulation, partition_by_gateway
+from crp.topology import hierarchical_depin, to_network
+from crp.workload import TrafficMatrix, Workload
+
+# --- Simulation Parameters ---
+NUM_REGIONS = 8
+NODES_PER_REGION = 100
+MEAN_DEGREE = 10.0
+FLOW_RATE = 0.005          # packets per ms from every node to its gateway of choice
+DURATION = 10000.0         # ms of simulated traffic; Q-routing needs a few thousand ms to converge
+MAX_HOPS = 60
+SHARD_COUNTS = (2, 4, 8)
+RANDOM_SEED = 42
+
+def node_factory(node_id):
+    return QRoutingNode(node_id, rng=random.Random(node_id))
+
+def gateway_factory(node_id):
+    return QRoutingGateway(node_id, rng=random.Random(node_id))
+
+def build_flows(topology):
+    """Every node uploads to a gateway picked at random, most often one of another region."""
+    rng = random.Random(RANDOM_SEED)
+    gateway_ids = [node_id for i, node_id in enumerate(topology.node_ids) if topology.is_gateway[i]]
+    return [(node_id, rng.choice([g for g in gateway_ids if g != node_id]), FLOW_RATE)
+            for node_id in topology.node_ids]
+
+def run_single(topology, flows) -> float:
+    """Simulates the whole network in a single simulator, for reference, and returns the time taken."""
+    start_time = time.perf_counter()
+    simulator = TrafficSimulator(to_network(topology, node_factory, gateway_factory), max_hops=MAX_HOPS)
+    metrics = MetricsCollector()
+    metrics.attach(simulator)
+    Workload(simulator, TrafficMatrix(flows), rng=random.Random(RANDOM_SEED), until=DURATION).start()
+    simulator.run()
+    single_s = time.perf_counter() - start_time
+    stats = simulator.stats
+    print("\n--- SINGLE PROCESS ---")
+    print(f"  Packets: {stats['injected']}, Success Rate: {stats['delivered'] / stats['injected'] * 100:.2f}%")
+    print(f"  Latency mean/p99: {metrics.latency.mean():.2f} / {metrics.latency.quantile(0.99):.2f}ms")
+    print(f"  Simulated in {single_s:.2f}s")
+    return single_s
+
+def main():
+    print("\n" + "="*50)
+    print("  SHARDED SIMULATION: ONE PROCESS PER REGION")
+    print("="*50)
+    topology = hierarchical_depin(NUM_REGIONS, NODES_PER_REGION, mean_degree=MEAN_DEGREE, seed=RANDOM_SEED)
+    flows = build_flows(topology)
+    print(f"[INIT] {topology.num_nodes} nodes in {NUM_REGIONS} regions, {len(flows)} flows, "
+          f"{DURATION:.0f}ms of traffic, {os.cpu_count()} CPU core(s).")
+
+    single_s = run_single(topology, flows)
+
+    def setup(simulator):
+        # Each shard generates the traffic of its own nodes.
+        local = simulator.network.nodes
+        matrix = TrafficMatrix(flow for flow in flows if flow[0] in local)
+        rng = random.Random(derive_seed(RANDOM_SEED, 'workload', simulator.shard))
+        Workload(simulator, matrix, rng=rng, until=DURATION).start()
+        metrics = MetricsCollector()
+        metrics.attach(simulator)
+        simulator.metrics = metrics
+
+    def report(simulator):
+        return simulator.metrics.latency
+
+    for num_shards in SHARD_COUNTS:
+        partition = partition_by_gateway(topology, num_shards)
+        simulation = ShardedSimulation(topology, partition, node_factory, gateway_factory,
+                                       setup=setup, report=report, max_hops=MAX_HOPS)
+        result = simulation.run()
+        stats = result['stats']
+        latency = LatencyHistogram()
+        for shard in result['shards']:
+            latency.merge(shard['report'])
+        messages = sum(shard['messages_sent'] for shard in result['shards'])
+        print(f"\n--- {num_shards} SHARD(S) ---")
+        print(f"  Nodes per shard: {[shard['nodes'] for shard in result['shards']]}")
+        print(f"  Lookahead: {result['lookahead']:.2f}ms, Rounds: {result['rounds']}, "
+              f"Cross-shard messages: {messages}")
+        print(f"  Packets: {stats['injected']}, Success Rate: {stats['delivered'] / stats['injected'] * 100:.2f}%")
+        print(f"  Latency mean/p99: {latency.mean():.2f} / {latency.quantile(0.99):.2f}ms")
+        print(f"  Simulated in {result['wall_s']:.2f}s (speedup vs single process: "
+              f"{single_s / result['wall_s']:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import random
+import sys
+import os
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.checkpoint import Checkpoint, save_checkpoint, load_checkpoint
+from crp.topology import reference_mesh
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from run_cognitive_sim import get_current_latency, REWARD_FACTOR, MAX_HOPS, RANDOM_SEED
+
+# --- Warm-Start Parameters ---
+TRAINING_PACKETS = 5000
+EVAL_PACKETS = 200          # the cold-start window we want to avoid paying for
+INJECTION_INTERVAL = 1.0    # ms between packets from the west gateway
+
+def build_network(extra_node=False):
+    """The reference mesh with per-destination cognitive nodes, optionally grown by one node."""
+    random.seed(RANDOM_SEED)
+    network = reference_mesh(random, lambda node_id: CognitiveNode(node_id, per_destination=True),
+                             lambda node_id: CognitiveGateway(node_id, per_destination=True))
+    if extra_node:
+        network.nodes["NODE_6"] = CognitiveNode("NODE_6", per_destination=True)
+        network.connect_nodes("NODE_6", "NODE_3", latency=8.0, bandwidth=500)
+        network.connect_nodes("NODE_6", "GATEWAY_EAST", latency=8.0, bandwidth=500)
+    return network
+
+def run(network, num_packets, scheduler_setup=None):
+    """Sends packets west to east; congestion draws come from the global `random` stream."""
+    simulator = TrafficSimulator(network, latency_fn=get_current_latency, reward_factor=REWARD_FACTOR,
+                                 max_hops=MAX_HOPS)
+    if scheduler_setup is not None:
+        scheduler_setup(simulator.scheduler)
+    start = simulator.scheduler.now
+    for i in range(num_packets):
+        simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=start + i * INJECTION_INTERVAL)
+    simulator.run()
+    return simulator
+
+def report(name, simulator):
+    stats = simulator.stats
+    avg_latency = stats['total_latency'] / stats['delivered'] if stats['delivered'] else 0
+    print(f"--- {name} ---")
+    print(f"  Success Rate: {stats['delivered'] / stats['injected'] * 100:.2f}% ({stats['delivered']}/{stats['injected']})")
+    print(f"  Average Packet Latency (successful packets): {avg_latency:.2f}ms")
+
+def main():
+    print("\n" + "="*50)
+    print("  WARM START: CHECKPOINTED COGNITIVE STATE")
+    print("="*50)
+    trained = build_network()
+    simulator = run(trained, TRAINING_PACKETS)
+    checkpoint = Checkpoint.capture(trained, simulator.scheduler.now, {'global': random})
+    path = os.path.join(tempfile.mkdtemp(), 'cognitive.crpk')
+    save_checkpoint(checkpoint, path)
+    print(f"[INIT] Trained on {TRAINING_PACKETS} packets; checkpoint of {len(checkpoint.tables)} tables "
+          f"is {os.path.getsize(path)} bytes.")
+    checkpoint = load_checkpoint(path)
+
+    report("COLD START", run(build_network(), EVAL_PACKETS))
+
+    warm = build_network()
+    restore = lambda scheduler: checkpoint.restore(warm, {'global': random}, scheduler)
+    report("WARM START (same topology)", run(warm, EVAL_PACKETS, restore))
+
+    grown = build_network(extra_node=True)
+    result = {}
+    restore = lambda scheduler: result.update(checkpoint.restore(grown, {'global': random}, scheduler))
+    simulator = run(grown, EVAL_PACKETS, restore)
+    report("WARM START (NODE_6 added)", simulator)
+    print(f"  Restore: {result}")
+
+if __name__ == "__main__":
+    main()
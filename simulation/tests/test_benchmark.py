@@ -0,0 +1,38 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that benchmark cases only compare routers that delivered packets.
+
+import math
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.benchmark import benchmark_matrix, comparable_cases, run_case
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_small_mesh_is_compared(self):
+        results = [run_case(case) for case in benchmark_matrix([100], [200], ['hotspot'])]
+        comparable, excluded = comparable_cases(results)
+        self.assertEqual(len(comparable), 2)
+        self.assertEqual(excluded, [])
+        for row in results:
+            self.assertTrue(row['routable'])
+            self.assertGreater(row['success_rate'], 0.9)
+            self.assertFalse(math.isnan(row['mean_latency']))
+
+    def test_cases_without_deliveries_are_excluded(self):
+        rows = [{'router': 'dijkstra', 'nodes': 5, 'packets': 10, 'congestion': 'none', 'routable': True,
+                 'delivered': 10, 'max_hops': 25, 'warmup_packets': 0, 'path_hops': 3},
+                {'router': 'cognitive', 'nodes': 5, 'packets': 10, 'congestion': 'none', 'routable': True,
+                 'delivered': 0, 'max_hops': 25, 'warmup_packets': 0, 'path_hops': 3}]
+        comparable, excluded = comparable_cases(rows)
+        self.assertEqual(comparable, [])
+        self.assertEqual([row['router'] for row, _ in excluded], ['dijkstra', 'cognitive'])
+
+
+if __name__ == "__main__":
+    unittest.main()
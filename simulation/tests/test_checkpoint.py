@@ -0,0 +1,103 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It round-trips learned routing state through checkpoint files and checks that
+# restored nodes resume the decisions of the nodes they were captured from.
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.checkpoint import Checkpoint, save_checkpoint, load_checkpoint
+from crp.engine import TrafficSimulator
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from crp.routing.policies import SlidingWindowUCBPolicy, GaussianThompsonPolicy, EXP3Policy
+from crp.routing.q_routing import QRoutingNode, QRoutingGateway
+from crp.topology import reference_mesh
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "state.crpk")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def trained(self, node_factory, gateway_factory):
+        network = reference_mesh(random.Random(1), node_factory, gateway_factory)
+        simulator = TrafficSimulator(network)
+        for k in range(200):
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * 1.0)
+        simulator.run()
+        return network, simulator.scheduler.now
+
+    def assert_round_trip(self, node_factory, gateway_factory):
+        network, clock = self.trained(node_factory, gateway_factory)
+        rng = random.Random(5)
+        rng.random()
+        checkpoint = Checkpoint.capture(network, clock, {'traffic': rng})
+        save_checkpoint(checkpoint, self.file)
+        loaded = load_checkpoint(self.file)
+
+        self.assertEqual(loaded.clock, clock)
+        self.assertEqual(loaded.rng_states, checkpoint.rng_states)
+        self.assertEqual(len(loaded.tables), len(checkpoint.tables))
+        for (node_id, destination_id, name, state), expected in zip(loaded.tables, checkpoint.tables):
+            self.assertEqual((node_id, destination_id, name), expected[:3])
+            self.assertEqual(state['arms'], expected[3]['arms'])
+            for section in ('columns', 'sequences'):
+                self.assertEqual({key: list(values) for key, values in state[section].items()},
+                                 {key: list(values) for key, values in expected[3][section].items()})
+            self.assertEqual(state['scalars'], expected[3]['scalars'])
+
+        # Restoring into a fresh network reproduces the learned tables and the RNG.
+        fresh = reference_mesh(random.Random(1), node_factory, gateway_factory)
+        restored_rng = random.Random()
+        report = loaded.restore(fresh, {'traffic': restored_rng})
+        self.assertEqual(report['nodes_missing'], 0)
+        self.assertEqual(restored_rng.random(), rng.random())
+        self.assertEqual(repr(Checkpoint.capture(fresh, clock).tables),
+                         repr(Checkpoint.capture(network, clock).tables))
+
+    def test_cognitive_round_trip(self):
+        self.assert_round_trip(lambda node_id: CognitiveNode(node_id, SlidingWindowUCBPolicy()),
+                               lambda node_id: CognitiveGateway(node_id, SlidingWindowUCBPolicy()))
+
+    def test_q_routing_round_trip(self):
+        self.assert_round_trip(QRoutingNode, QRoutingGateway)
+
+    def paths(self, network):
+        simulator = TrafficSimulator(network)
+        paths = []
+        simulator.completion_callbacks.append(lambda packet, success: paths.append(list(packet.path_taken)))
+        for k in range(100):
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * 1.0)
+        simulator.run()
+        return paths
+
+    def assert_same_decisions(self, node_factory, gateway_factory):
+        network, clock = self.trained(node_factory, gateway_factory)
+        save_checkpoint(Checkpoint.capture(network, clock), self.file)
+        # The fresh network's generators start elsewhere; the checkpoint carries theirs.
+        fresh = reference_mesh(random.Random(1), node_factory, gateway_factory)
+        load_checkpoint(self.file).restore(fresh)
+        self.assertEqual(self.paths(fresh), self.paths(network))
+
+    def test_sampling_policies_resume_their_draws(self):
+        for policy in (GaussianThompsonPolicy, EXP3Policy):
+            with self.subTest(policy=policy.__name__):
+                self.assert_same_decisions(lambda node_id: CognitiveNode(node_id, policy()),
+                                           lambda node_id: CognitiveGateway(node_id, policy()))
+
+    def test_q_routing_resumes_its_exploration(self):
+        self.assert_same_decisions(lambda node_id: QRoutingNode(node_id, epsilon=0.3),
+                                   lambda node_id: QRoutingGateway(node_id, epsilon=0.3))
+
+
+if __name__ == "__main__":
+    unittest.main()
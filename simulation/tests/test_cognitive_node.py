@@ -0,0 +1,121 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that batched compact bandit decisions match sequential ones, and that
+# the compact router decides like CognitiveNode.
+
+import copy
+import random
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.routing.cognitive_node import CompactCognitiveRouter, CognitiveNode, CognitiveGateway
+from crp.simulation import Network
+from crp.topology import random_geometric, to_network
+
+
+class CompactCognitiveRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.topology = random_geometric(60, mean_degree=5.0, seed=11)
+        self.rng = random.Random(11)
+
+    def random_batch(self, size):
+        """Packets concentrated on a few nodes, so groups repeat within the batch."""
+        nodes = [self.rng.randrange(2) for _ in range(size)]
+        prevs = []
+        for node in nodes:
+            slots = self.topology.edge_slots(node)
+            prevs.append(self.topology.neighbors[self.rng.choice(slots)] if slots and self.rng.random() < 0.3 else -1)
+        return nodes, prevs
+
+    def test_batch_matches_sequential_calls(self):
+        router = CompactCognitiveRouter(self.topology)
+        for round_number in range(100):
+            nodes, prevs = self.random_batch(50)
+            sequential = copy.deepcopy(router)
+            expected = [sequential.choose_next_hop(node, prev) for node, prev in zip(nodes, prevs)]
+
+            self.assertEqual(list(router.choose_next_hops(nodes, prevs)), expected, f"round {round_number}")
+            self.assertEqual(list(router.total_pulls), list(sequential.total_pulls))
+
+            # Rewards arrive between batches, so later rounds exercise the UCB1 scores.
+            router.update_rewards(expected, [self.rng.uniform(0, 10) for _ in expected])
+
+    def test_exploration_term_advances_within_a_batch(self):
+        network = Network()
+        for node_id in ("A", "B", "C"):
+            network.add_node(node_id)
+        network.connect_nodes("A", "B", 1.0, 100)
+        network.connect_nodes("A", "C", 1.0, 100)
+        topology = network.freeze()
+        router = CompactCognitiveRouter(topology)
+        a = topology.get_index("A")
+        to_b, to_c = (topology.find_slot(a, topology.get_index(node_id)) for node_id in ("B", "C"))
+        # B is barely tried and scores 0, C is well known and scores 1.5: C wins
+        # while the pull count is low, B once the exploration term has grown.
+        router.counts[to_b], router.values[to_b] = 1, 0.0
+        router.counts[to_c], router.values[to_c] = 100, 1.5
+        router.total_pulls[a] = 1
+
+        sequential = copy.deepcopy(router)
+        expected = [sequential.choose_next_hop(a) for _ in range(5)]
+        self.assertEqual(expected, [to_c, to_c, to_c, to_b, to_b])
+        self.assertEqual(list(router.choose_next_hops([a] * 5)), expected)
+
+    def test_long_batches_match_sequential_calls(self):
+        router = CompactCognitiveRouter(self.topology)
+        # Every arm tried, with few pulls so that rankings flip often within a batch.
+        for slot in range(self.topology.num_edges):
+            router.counts[slot] = self.rng.randint(1, 20)
+            router.values[slot] = self.rng.uniform(0, 2)
+        for round_number in range(5):
+            nodes, prevs = self.random_batch(3000)
+            sequential = copy.deepcopy(router)
+            expected = [sequential.choose_next_hop(node, prev) for node, prev in zip(nodes, prevs)]
+            self.assertGreater(len(set(expected)), 2)
+            self.assertEqual(list(router.choose_next_hops(nodes, prevs)), expected, f"round {round_number}")
+            router.update_rewards(expected, [self.rng.uniform(0, 2) for _ in expected])
+
+    def test_tied_arms_keep_the_first_slot(self):
+        network = Network()
+        for node_id in ("A", "B", "C"):
+            network.add_node(node_id)
+        network.connect_nodes("A", "B", 1.0, 100)
+        network.connect_nodes("A", "C", 1.0, 100)
+        topology = network.freeze()
+        router = CompactCognitiveRouter(topology)
+        a = topology.get_index("A")
+        for slot in topology.edge_slots(a):
+            router.counts[slot], router.values[slot] = 7, 0.3
+        router.total_pulls[a] = 14
+
+        sequential = copy.deepcopy(router)
+        expected = [sequential.choose_next_hop(a) for _ in range(50)]
+        self.assertEqual(set(expected), {topology.edge_slots(a)[0]})
+        self.assertEqual(list(router.choose_next_hops([a] * 50)), expected)
+
+    def test_matches_cognitive_nodes(self):
+        topology = self.topology
+        router = CompactCognitiveRouter(topology)
+        network = to_network(topology, CognitiveNode, CognitiveGateway)
+        node_ids, neighbors = topology.node_ids, topology.neighbors
+        for _ in range(200):
+            node, prev = 0, -1
+            for _ in range(30):
+                slot = router.choose_next_hop(node, prev)
+                cognitive_node = network.get_node(node_ids[node])
+                chosen = cognitive_node.choose_next_hop(node_ids[prev] if prev >= 0 else None)
+                self.assertEqual(chosen, node_ids[neighbors[slot]] if slot >= 0 else None)
+                if chosen is None:
+                    break
+                reward = self.rng.random()
+                router.update_reward(slot, reward)
+                cognitive_node.update_reward(chosen, reward)
+                prev, node = node, neighbors[slot]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the daemons' wire format, the expiry of decisions whose ACK never
+# arrives, and drives loopback node daemons remotely through a ReportCollector.
+
+import asyncio
+import os
+import random
+import sys
+import time
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.daemon import (LoopbackCluster, NodeDaemon, ReportCollector, decode_message, encode_message,
+                        MSG_ACK, MSG_DATA, MSG_REPORT)
+from crp.network.packet import Packet
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from crp.routing.policies import EXP3Policy
+from crp.topology import reference_mesh
+
+
+class WireFormatTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        messages = [
+            (MSG_DATA, 7, 123456789, 12.5, ["GATEWAY_WEST", "GATEWAY_EAST", "GATEWAY_WEST", "NODE_1"], False),
+            (MSG_ACK, 2 ** 63 - 1, -1, 0.0, ["NODE_1"], False),
+            (MSG_REPORT, 0, 0, 3.25, ["A", "B", "A", "C", "B"], True),
+            # No strings at all, and non-ASCII node IDs.
+            (MSG_ACK, 1, 0, 0.0, [], False),
+            (MSG_DATA, 1, 0, 0.0, ["nœud-α", "узел"], False),
+        ]
+        for kind, packet_id, echo_ns, total_latency, strings, delivered in messages:
+            data = encode_message(kind, packet_id, echo_ns, total_latency, strings, delivered=delivered)
+            self.assertEqual(decode_message(data), (kind, delivered, packet_id, echo_ns, total_latency, strings))
+
+
+class _Transport:
+    """Collects sent datagrams instead of sending them."""
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((decode_message(data), addr))
+
+
+class ProbabilityExpiryTest(unittest.TestCase):
+
+    def setUp(self):
+        node = CognitiveNode("A", EXP3Policy(rng=random.Random(1)))
+        for neighbor_id in ("B", "C"):
+            node.add_link(neighbor_id, 1.0, 100)
+        self.directory = {"B": ("127.0.0.1", 1), "C": ("127.0.0.1", 2)}
+        self.daemon = NodeDaemon(node, self.directory, emulate_latency=False)
+        self.daemon.connection_made(_Transport())
+
+    def forward(self, packet_id):
+        """Sends a packet on from A and returns (its send time, the chosen neighbor)."""
+        self.daemon.handle(Packet(packet_id, "A", "Z"))
+        (_, _, _, echo_ns, _, _), address = self.daemon.transport.sent[-1]
+        return echo_ns, next(node_id for node_id, addr in self.directory.items() if addr == address)
+
+    def test_acked_decisions_are_released(self):
+        echo_ns, next_node_id = self.forward(1)
+        self.assertIn((1, next_node_id), self.daemon._probabilities)
+        self.daemon.datagram_received(encode_message(MSG_ACK, 1, echo_ns, 0.0, [next_node_id]), None)
+        self.assertEqual(self.daemon._probabilities, {})
+        self.assertEqual(self.daemon.stats['acks'], 1)
+
+    def test_lost_acks_expire(self):
+        for packet_id in range(100):
+            self.forward(packet_id)
+        self.assertEqual(len(self.daemon._probabilities), 100)
+        # Every decision so far is now overdue; the next send sweeps them out.
+        self.daemon.ack_timeout = 0.001
+        time.sleep(0.002)
+        self.forward(100)
+        self.assertEqual(len(self.daemon._probabilities), 1)
+        self.assertEqual(self.daemon.stats['expired_acks'], 100)
+
+
+class ReportCollectorTest(unittest.TestCase):
+
+    def test_remote_injections_are_reported(self):
+        async def run():
+            # The collector shares the cluster's directory once the nodes are bound.
+            collector = ReportCollector({})
+            await collector.start()
+            network = reference_mesh(random.Random(42), CognitiveNode, CognitiveGateway)
+            cluster = LoopbackCluster(network, emulate_latency=False, report_addr=collector.address)
+            await cluster.start()
+            collector.directory = cluster.directory
+            try:
+                packet_ids = [collector.inject("GATEWAY_WEST", "GATEWAY_EAST") for _ in range(20)]
+                finished = await collector.wait_for(20, timeout=10.0)
+            finally:
+                cluster.close()
+                collector.close()
+            return packet_ids, finished, collector, cluster
+
+        packet_ids, finished, collector, cluster = asyncio.run(run())
+        self.assertEqual(packet_ids, list(range(1, 21)))
+        self.assertTrue(finished)
+        self.assertEqual(collector.completed, 20)
+        self.assertEqual(collector.delivered, cluster.delivered)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that routing tables agree with single-pair Dijkstra, serially and in
+# parallel, on both the dict-based and the compact graph.
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.network.compact import CompactTopology
+from crp.routing.dumb_router import (compute_gateway_routing_table, compute_routing_table, find_path_dijkstra,
+                                     shortest_path_tree)
+from crp.topology import grid, to_network
+
+
+class RoutingTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.topology = grid(4, 5, seed=3)
+        self.network = to_network(self.topology)
+
+    def assert_matches_dijkstra(self, network, table, sources):
+        self.assertEqual(sorted(table.sources()), sorted(sources))
+        for source_id in sources:
+            for destination_id in self.topology.node_ids:
+                path, latency = find_path_dijkstra(network, source_id, destination_id)
+                self.assertAlmostEqual(table.latency(source_id, destination_id), latency, places=9)
+                # Ties may pick another path of equal cost, so check the table's own path.
+                table_path = table.path(source_id, destination_id)
+                self.assertEqual((table_path[0], table_path[-1]), (source_id, destination_id))
+                cost = sum(network.get_node(a).neighbors[b]['latency'] for a, b in zip(table_path, table_path[1:]))
+                self.assertAlmostEqual(cost, latency, places=9)
+
+    def test_all_pairs_match_dijkstra(self):
+        sources = list(self.topology.node_ids)
+        self.assert_matches_dijkstra(self.network, compute_routing_table(self.network), sources)
+        self.assert_matches_dijkstra(self.network, compute_routing_table(self.topology), sources)
+
+    def test_process_pool_matches_dijkstra(self):
+        sources = list(self.topology.node_ids)
+        table = compute_routing_table(self.topology, processes=2, chunk_size=3)
+        self.assert_matches_dijkstra(self.network, table, sources)
+
+    def test_gateway_table_has_one_tree_per_gateway(self):
+        for network in (self.network, self.topology):
+            table = compute_gateway_routing_table(network)
+            self.assertEqual(sorted(table.sources()), ["GATEWAY_EAST", "GATEWAY_WEST"])
+            self.assertIn("GATEWAY_WEST", table)
+            self.assertNotIn("NODE_1", table)
+        self.assert_matches_dijkstra(self.network, table, ["GATEWAY_EAST", "GATEWAY_WEST"])
+
+    def test_unreachable_destination(self):
+        topology = CompactTopology.from_edges(["A", "B", "C"], [0], [1], [1.0], [100])
+        for network in (topology, to_network(topology)):
+            table = compute_routing_table(network, ["A"])
+            self.assertEqual(table.latency("A", "C"), float('inf'))
+            self.assertIsNone(table.path("A", "C"))
+            self.assertEqual(table.path("A", "B"), ["A", "B"])
+
+    def test_unknown_source_reaches_only_itself(self):
+        for network in (self.network, self.topology):
+            self.assertEqual(shortest_path_tree(network, "NOWHERE"), ({"NOWHERE": 0.0}, {"NOWHERE": None}))
+            table = compute_routing_table(network, ["NOWHERE"])
+            self.assertEqual(table.path("NOWHERE", "NOWHERE"), ["NOWHERE"])
+            self.assertEqual(table.latency("NOWHERE", "GATEWAY_EAST"), float('inf'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that incremental shortest-path repairs agree with full recomputation,
+# and that the engine's adaptive Dijkstra baseline routes around congestion.
+
+import random
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.simulation import Network
+from crp.routing.dumb_router import find_path_dijkstra
+from crp.routing.dynamic_router import DynamicShortestPathTree
+from crp.routing.route_cache import RouteCache
+
+
+def random_network(rng, num_nodes=40, extra_links=60):
+    """A connected random graph: a random spanning tree plus extra random links."""
+    network = Network()
+    for i in range(num_nodes):
+        network.add_node(f"NODE_{i}")
+    for i in range(1, num_nodes):
+        network.connect_nodes(f"NODE_{i}", f"NODE_{rng.randrange(i)}", rng.uniform(1, 20), 100)
+    for _ in range(extra_links):
+        a, b = rng.sample(range(num_nodes), 2)
+        network.connect_nodes(f"NODE_{a}", f"NODE_{b}", rng.uniform(1, 20), 100)
+    return network
+
+
+class DynamicShortestPathTreeTest(unittest.TestCase):
+
+    def assert_matches_dijkstra(self, network, tree):
+        for node_id in network.nodes:
+            path, latency = find_path_dijkstra(network, tree.source_id, node_id)
+            self.assertAlmostEqual(tree.latency(node_id), latency, places=9)
+            # Ties may pick another path of equal cost, so check the tree's own path is valid.
+            tree_path = tree.path(node_id)
+            self.assertEqual(tree_path[0], tree.source_id)
+            self.assertEqual(tree_path[-1], node_id)
+            cost = sum(network.get_node(a).neighbors[b]['latency'] for a, b in zip(tree_path, tree_path[1:]))
+            self.assertAlmostEqual(cost, latency, places=9)
+
+    def test_random_updates_match_full_dijkstra(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            network = random_network(rng)
+            tree = DynamicShortestPathTree(network, "NODE_0")
+            links = [(node_id, neighbor_id) for node_id, node in network.nodes.items()
+                     for neighbor_id in node.neighbors if node_id < neighbor_id]
+            for _ in range(200):
+                a, b = rng.choice(links)
+                old_latency = network.get_node(a).neighbors[b]['latency']
+                # Mix increases and decreases, including large congestion spikes.
+                latency = old_latency * rng.choice((0.2, 0.5, 0.9, 1.5, 3.0, 10.0))
+                network.get_node(a).neighbors[b]['latency'] = latency
+                network.get_node(b).neighbors[a]['latency'] = latency
+                tree.update_link(a, b, latency)
+                self.assert_matches_dijkstra(network, tree)
+
+    def test_unchanged_latency_is_a_no_op(self):
+        network = random_network(random.Random(7))
+        tree = DynamicShortestPathTree(network, "NODE_0")
+        a, b = next((node_id, neighbor_id) for node_id, node in network.nodes.items() for neighbor_id in node.neighbors)
+        updated = tree.nodes_updated
+        tree.update_link(a, b, network.get_node(a).neighbors[b]['latency'])
+        self.assertEqual(tree.nodes_updated, updated)
+
+
+class AdaptiveRoutingTest(unittest.TestCase):
+
+    def setUp(self):
+        # A reaches D via B (1ms + 1ms) or via C (2ms + 2ms).
+        self.network = Network()
+        for node_id in "ABCD":
+            self.network.add_node(node_id)
+        for a, b, latency in (("A", "B", 1.0), ("B", "D", 1.0), ("A", "C", 2.0), ("C", "D", 2.0)):
+            self.network.connect_nodes(a, b, latency, 100)
+
+    def paths(self, **options):
+        """Routes one packet before, during and after congestion on B-D (x10)."""
+        simulator = TrafficSimulator(self.network, **options)
+        paths = []
+        simulator.completion_callbacks.append(lambda packet, success: paths.append(''.join(packet.path_taken)))
+        simulator.set_congestion("B", "D", 10.0, at=10.0)
+        simulator.set_congestion("B", "D", 1.0, at=20.0)
+        for t in (0.0, 15.0, 25.0):
+            simulator.inject("A", "D", at=t)
+        simulator.run()
+        return simulator, paths
+
+    def test_adaptive_routing_avoids_congested_links(self):
+        simulator, paths = self.paths(adaptive_routing=True)
+        self.assertEqual(paths, ["ABD", "ACD", "ABD"])
+        self.assertEqual(simulator.stats['total_latency'], 2.0 + 4.0 + 2.0)
+
+    def test_tree_built_during_congestion_sees_it(self):
+        simulator = TrafficSimulator(self.network, adaptive_routing=True)
+        simulator.set_congestion("D", "B", 10.0)
+        simulator.run()
+        self.assertEqual(simulator._static_path("A", "D"), ["A", "C", "D"])
+
+    def test_static_routing_keeps_its_cached_path_through_congestion(self):
+        cache = RouteCache()
+        simulator, paths = self.paths(route_cache=cache)
+        self.assertEqual(paths, ["ABD", "ABD", "ABD"])
+        # The static path does not depend on congestion, so it is computed once.
+        self.assertEqual(cache.stats['stores'], 1)
+        self.assertEqual(cache.stats['invalidations'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
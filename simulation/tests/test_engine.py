@@ -0,0 +1,135 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the event scheduler's ordering and stopping rules, and the per-packet
+# loop avoidance and dead-end handling of per-destination routing.
+
+import os
+import random
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import EventScheduler, TrafficSimulator
+from crp.network.compact import CompactTopology
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from crp.routing.q_routing import QRoutingNode, QRoutingGateway
+from crp.topology import reference_mesh, to_network
+
+
+class EventSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = EventScheduler()
+        self.dispatched = []
+        self.scheduler.register(0, lambda payload: self.dispatched.append((self.scheduler.now, payload)))
+
+    def test_events_run_in_time_order(self):
+        for time, payload in ((3.0, "c"), (1.0, "a"), (2.0, "b")):
+            self.scheduler.schedule_at(time, 0, payload)
+        self.assertEqual(self.scheduler.run(), 3)
+        self.assertEqual(self.dispatched, [(1.0, "a"), (2.0, "b"), (3.0, "c")])
+
+    def test_equal_times_are_first_in_first_out(self):
+        for payload in "abcde":
+            self.scheduler.schedule(1.0, 0, payload)
+        # Payloads are never compared, even when they would not be orderable.
+        self.scheduler.schedule(1.0, 0, {"f": 1})
+        self.scheduler.run()
+        self.assertEqual([payload for _, payload in self.dispatched], list("abcde") + [{"f": 1}])
+
+    def test_run_until_stops_before_later_events(self):
+        for time in (1.0, 2.0, 5.0):
+            self.scheduler.schedule_at(time, 0, time)
+        self.assertEqual(self.scheduler.run(until=2.0), 2)
+        # The clock advances to the horizon; the later event stays queued.
+        self.assertEqual(self.scheduler.now, 2.0)
+        self.assertEqual(self.scheduler.pending(), 1)
+        self.scheduler.run(until=4.0)
+        self.assertEqual(self.scheduler.now, 4.0)
+        self.assertEqual(self.scheduler.run(), 1)
+        self.assertEqual(self.scheduler.now, 5.0)
+        self.assertEqual(self.scheduler.events_processed, 3)
+
+    def test_max_events_bounds_one_call(self):
+        for time in range(5):
+            self.scheduler.schedule_at(float(time), 0, time)
+        self.assertEqual(self.scheduler.run(max_events=2), 2)
+        self.assertEqual([payload for _, payload in self.dispatched], [0, 1])
+        self.assertEqual(self.scheduler.next_time(), 2.0)
+        self.assertEqual(self.scheduler.run(max_events=10), 3)
+
+    def test_schedule_at_rejects_the_past(self):
+        self.scheduler.schedule_at(2.0, 0)
+        self.scheduler.run()
+        with self.assertRaises(ValueError):
+            self.scheduler.schedule_at(1.0, 0)
+        self.scheduler.schedule_at(2.0, 0)
+        self.assertEqual(self.scheduler.pending(), 1)
+
+
+class VisitedSetTest(unittest.TestCase):
+
+    def test_visited_holds_only_the_packets_own_path(self):
+        rng = random.Random(42)
+        network = reference_mesh(rng, lambda node_id: QRoutingNode(node_id, rng=rng),
+                                 lambda node_id: QRoutingGateway(node_id, rng=rng))
+        simulator = TrafficSimulator(network)
+        finished = []
+        simulator.completion_callbacks.append(lambda packet, success: finished.append((packet, success)))
+        for k in range(50):
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * 1.0)
+            simulator.inject("GATEWAY_EAST", "NODE_1", at=k * 1.0)
+        simulator.run()
+
+        self.assertEqual(len(finished), 100)
+        for packet, success in finished:
+            path = packet.path_taken
+            # Every node but the last one decided, and a node is only ever re-entered
+            # by stepping back from a dead end to where the packet first came from.
+            decided = path[:-1] if success else path
+            # Each maps to the path index of its first decision.
+            self.assertEqual(packet.visited, {node_id: path.index(node_id) for node_id in decided})
+            for i in range(len(path) - 1):
+                if path[i + 1] in path[:i + 1]:
+                    self.assertEqual(path[i + 1], path[path.index(path[i]) - 1])
+
+
+class DeadEndTest(unittest.TestCase):
+
+    def cul_de_sac(self, node_factory, gateway_factory):
+        """A reaches the destination C directly (10ms) or the leaf B (1ms), which looks closer."""
+        topology = CompactTopology.from_edges(["A", "B", "C"], [0, 0], [1, 2], [1.0, 10.0], [100, 100],
+                                              gateway_ids=["C"])
+        return to_network(topology, node_factory, gateway_factory)
+
+    def run_one(self, network):
+        simulator = TrafficSimulator(network)
+        finished = []
+        simulator.completion_callbacks.append(lambda packet, success: finished.append((list(packet.path_taken),
+                                                                                       success)))
+        simulator.inject("A", "C")
+        simulator.run()
+        return finished
+
+    def test_q_routing_steps_back_and_penalises_once(self):
+        network = self.cul_de_sac(lambda node_id: QRoutingNode(node_id, epsilon=0.0),
+                                  lambda node_id: QRoutingGateway(node_id, epsilon=0.0))
+        self.assertEqual(self.run_one(network), [(["A", "B", "A", "C"], True)])
+        node = network.get_node("A")
+        # One sample for the hop into the dead end: 1 + 0.5 * ((1 + 1000) - 1).
+        self.assertEqual(node.q_values["C"][node.arms.index("B")], 501.0)
+
+    def test_cognitive_credits_the_abandoned_decision_with_zero(self):
+        network = self.cul_de_sac(lambda node_id: CognitiveNode(node_id, per_destination=True),
+                                  lambda node_id: CognitiveGateway(node_id, per_destination=True))
+        self.assertEqual(self.run_one(network), [(["A", "B", "A", "C"], True)])
+        policy = network.get_node("A").policy_for("C")
+        self.assertEqual(policy.estimate("B"), (0.0, 1))
+        self.assertEqual(policy.estimate("C"), (100.0 / 12.0, 1))
+        # The back-step was not B's decision.
+        self.assertEqual(network.get_node("B").policy_for("C").estimate("A"), (0.0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks link validation and the queueing counters of the bandwidth model.
+
+import os
+import random
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.network.link import Link
+from crp.topology import reference_mesh
+
+
+class LinkTest(unittest.TestCase):
+
+    def test_bandwidth_must_be_positive(self):
+        for bandwidth in (0, -10.0):
+            with self.assertRaises(ValueError):
+                Link("A", "B", bandwidth)
+
+    def test_overload_queues_and_drops(self):
+        simulator = TrafficSimulator(reference_mesh(random.Random(42)), bandwidth_model=True,
+                                     buffer_size=10, packet_size=1500)
+        # 100 packets at once, far beyond what the first link serializes in 0.1ms.
+        for k in range(100):
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * 0.001)
+        simulator.run()
+        self.assertGreater(simulator.stats['dropped'], 0)
+        self.assertEqual(simulator.stats['delivered'] + simulator.stats['dropped'], 100)
+        self.assertGreater(sum(link.queueing_time for link in simulator.links.values()), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
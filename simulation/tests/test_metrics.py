@@ -0,0 +1,57 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the run-wide counters and link utilisation of the metrics pipeline.
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.metrics import MetricsCollector, SnapshotWriter
+from crp.topology import reference_mesh
+
+
+class MetricsCollectorTest(unittest.TestCase):
+
+    def run_simulation(self, metrics, **options):
+        simulator = TrafficSimulator(reference_mesh(random.Random(42)), **options)
+        for k in range(100):
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST", at=k * 1.0)
+        return simulator
+
+    def test_totals_are_kept_without_snapshots(self):
+        metrics = MetricsCollector()
+        simulator = self.run_simulation(metrics)
+        metrics.attach(simulator)
+        simulator.run()
+        self.assertEqual(sum(metrics.link_packets.values()), simulator.stats['hops'])
+        self.assertEqual(sum(metrics.node_decisions.values()), simulator.stats['hops'])
+        self.assertEqual(metrics.link_packets, metrics.window_link_packets)
+
+    def test_link_utilisation_is_busy_time_over_elapsed_time(self):
+        metrics = MetricsCollector()
+        simulator = self.run_simulation(metrics, service_time=0.25)
+        with tempfile.TemporaryDirectory() as directory:
+            with SnapshotWriter(directory) as writer:
+                metrics.attach(simulator, interval=20.0, writer=writer)
+                simulator.run()
+            with open(os.path.join(directory, 'links.csv')) as f:
+                rows = list(csv.DictReader(f))
+
+        # 100 packets, one every ms, each occupies the first link of its static path for 0.25ms.
+        utilisation = metrics.link_utilisation(100.0)
+        self.assertAlmostEqual(max(utilisation.values()), 0.25)
+        self.assertTrue(all(0.0 <= float(row['utilisation']) <= 1.0 for row in rows))
+        # The first window holds the packets sent at t=0..20: the one injected at
+        # t=20 was scheduled before the snapshot, so it goes first.
+        first_window = [float(row['utilisation']) for row in rows if float(row['time']) == 20.0]
+        self.assertAlmostEqual(max(first_window), 21 * 0.25 / 20.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
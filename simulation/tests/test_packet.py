@@ -0,0 +1,115 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that pooled packets are reset and reused, and that the columnar
+# PacketStore keeps every field of the packets it records.
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.network.compact import CompactTopology
+from crp.network.packet import Packet, PacketPool
+from crp.network.packet_store import PacketStore
+from crp.topology import to_network
+
+
+def line_network():
+    """A - B - C, 1ms and 2ms."""
+    topology = CompactTopology.from_edges(["A", "B", "C"], [0, 1], [1, 2], [1.0, 2.0], [100, 100])
+    return to_network(topology)
+
+
+class PacketPoolTest(unittest.TestCase):
+
+    def test_released_packets_are_reset_and_reused(self):
+        pool = PacketPool()
+        packet = pool.acquire(1, "A", "C", size=500, creation_time=2.0)
+        packet.log_hop("B", 1.0)
+        packet.visited = {"A": 0}
+        path = packet.path_taken
+        pool.release(packet)
+        self.assertEqual(len(pool), 1)
+
+        reused = pool.acquire(2, "B", "A")
+        self.assertIs(reused, packet)
+        self.assertIs(reused.path_taken, path)
+        self.assertEqual((reused.packet_id, reused.source_id, reused.destination_id), (2, "B", "A"))
+        self.assertEqual((reused.path_taken, reused.total_latency, reused.size), (["B"], 0.0, 1500))
+        self.assertEqual((reused.creation_time, reused.current_location_id, reused.route), (0.0, "B", None))
+        self.assertEqual(reused.visited, {})
+        self.assertEqual((pool.created, pool.reused, len(pool)), (1, 1, 0))
+
+    def test_idle_packets_are_bounded(self):
+        pool = PacketPool(max_size=2)
+        for packet in [pool.acquire(k, "A", "B") for k in range(3)]:
+            pool.release(packet)
+        self.assertEqual(len(pool), 2)
+
+    def test_pooled_simulation_reuses_packets_and_reports_ids(self):
+        pool = PacketPool()
+        simulator = TrafficSimulator(line_network(), packet_pool=pool)
+        finished = []
+        simulator.completion_callbacks.append(lambda packet, success: finished.append(packet.packet_id))
+        # Each packet is injected after the previous one finished, so it reuses it.
+        packet_ids = []
+        for _ in range(5):
+            packet_ids.append(simulator.inject("A", "C"))
+            simulator.run()
+        self.assertEqual(packet_ids, list(range(5)))
+        self.assertEqual(finished, packet_ids)
+        self.assertEqual((pool.created, pool.reused), (1, 4))
+
+
+class PacketStoreTest(unittest.TestCase):
+
+    def test_columns_hold_every_record(self):
+        store = PacketStore()
+        delivered = Packet(7, "A", "C", size=800, creation_time=1.5)
+        delivered.log_hop("B", 1.0)
+        delivered.log_hop("C", 2.0)
+        store.record(delivered, True)
+        store.record(Packet(8, "C", "D"), False)
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.node_ids, ["A", "C", "B", "D"])
+        self.assertEqual(list(store.packet_id), [7, 8])
+        self.assertEqual(list(store.source), [0, 1])
+        self.assertEqual(list(store.destination), [1, 3])
+        self.assertEqual(list(store.creation_time), [1.5, 0.0])
+        self.assertEqual(list(store.total_latency), [3.0, 0.0])
+        self.assertEqual(list(store.hops), [2, 0])
+        self.assertEqual(list(store.size), [800, 1500])
+        self.assertEqual(list(store.delivered), [1, 0])
+        self.assertEqual(list(store.path_offsets), [0, 3, 4])
+        self.assertEqual(store.path(0), ["A", "B", "C"])
+        self.assertEqual(store.row(1), {'packet_id': 8, 'source_id': "C", 'destination_id': "D",
+                                        'creation_time': 0.0, 'total_latency': 0.0, 'hops': 0, 'size': 1500,
+                                        'delivered': False, 'path': ["C"]})
+        self.assertEqual(list(store.latencies()), [3.0])
+
+        store.clear()
+        self.assertEqual((len(store), store.nbytes(), list(store.path_offsets)), (0, 8, [0]))
+        self.assertEqual(store.node_ids, ["A", "C", "B", "D"])
+
+    def test_without_paths(self):
+        store = PacketStore(keep_paths=False)
+        store.record(Packet(1, "A", "B"), True)
+        self.assertEqual((store.path(0), list(store.path_offsets)), ([], [0, 0]))
+
+    def test_attached_store_outlives_pooled_packets(self):
+        store = PacketStore()
+        simulator = TrafficSimulator(line_network(), packet_pool=PacketPool())
+        store.attach(simulator)
+        packet_ids = [simulator.inject("A", "C", at=k * 10.0) for k in range(3)]
+        packet_ids.append(simulator.inject("C", "A", at=30.0))
+        simulator.run()
+        self.assertEqual(list(store.packet_id), packet_ids)
+        self.assertEqual([store.path(k) for k in range(4)], [["A", "B", "C"]] * 3 + [["C", "B", "A"]])
+        self.assertEqual(list(store.total_latency), [3.0] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
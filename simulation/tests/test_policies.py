@@ -0,0 +1,115 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the bookkeeping of the bandit policies, and that the non-stationary
+# ones follow an arm whose reward changes.
+
+import math
+import random
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.routing.cognitive_node import CognitiveNode
+from crp.routing.policies import (DiscountedUCBPolicy, EXP3Policy, GaussianThompsonPolicy,
+                                  SlidingWindowUCBPolicy, UCB1Policy)
+
+
+def switched_arm_choices(policy, before=500, after=300, last=100):
+    """
+    Plays two arms, A paying 10 and B paying 1, then swaps their rewards. Returns
+    how often B was chosen in the `last` rounds after the switch.
+    """
+    policy.add_arm("A")
+    policy.add_arm("B")
+    rewards = {"A": 10.0, "B": 1.0}
+    chosen_b = 0
+    for round_number in range(before + after):
+        if round_number == before:
+            rewards = {"A": 1.0, "B": 10.0}
+        arm_id = policy.select(["A", "B"])
+        policy.update(arm_id, rewards[arm_id])
+        if round_number >= before + after - last and arm_id == "B":
+            chosen_b += 1
+    return chosen_b
+
+
+class SwitchedArmTest(unittest.TestCase):
+
+    def test_cumulative_ucb1_keeps_the_stale_arm(self):
+        self.assertLess(switched_arm_choices(UCB1Policy()), 10)
+
+    def test_sliding_window_forgets_the_old_rewards(self):
+        policy = SlidingWindowUCBPolicy(window=50)
+        self.assertGreater(switched_arm_choices(policy), 80)
+        # Nothing from before the switch is left in the window.
+        mean_a, _ = policy.estimate("A")
+        mean_b, _ = policy.estimate("B")
+        self.assertIn(mean_a, (0.0, 1.0))
+        self.assertEqual(mean_b, 10.0)
+
+    def test_discounting_follows_the_switched_arm(self):
+        policy = DiscountedUCBPolicy(gamma=0.95)
+        self.assertGreater(switched_arm_choices(policy), 80)
+        # The stale arm's effective pulls decay towards zero.
+        self.assertLess(policy.estimate("A")[1], 5.0)
+
+    def test_discounted_thompson_follows_the_switched_arm(self):
+        policy = GaussianThompsonPolicy(sigma=5.0, discount=0.9, rng=random.Random(1))
+        self.assertGreater(switched_arm_choices(policy), 80)
+        self.assertGreater(policy.estimate("B")[0], 9.0)
+
+
+class EXP3PolicyTest(unittest.TestCase):
+
+    def test_update_uses_the_probability_of_the_rewarded_decision(self):
+        policy = EXP3Policy(gamma=0.1, max_reward=20.0, rng=random.Random(3))
+        for arm_id in ("A", "B", "C"):
+            policy.add_arm(arm_id)
+        chosen = policy.select(["A", "B", "C"])
+        probability = policy.selection_probability
+        self.assertAlmostEqual(probability, 1.0 / 3.0)
+
+        # A later decision offers the same arm alone, at probability 1, before the
+        # first decision's reward comes back.
+        policy.select([chosen])
+        self.assertEqual(policy.selection_probability, 1.0)
+
+        policy.update(chosen, 10.0, probability)
+        index = policy.arms.index(chosen)
+        self.assertAlmostEqual(policy.weights[index], math.exp(0.1 * (0.5 / probability) / 3))
+
+    def test_exploration_uses_the_same_k_as_the_update(self):
+        policy = EXP3Policy(gamma=0.3, rng=random.Random(5))
+        for arm_id in ("A", "B", "C", "D"):
+            policy.add_arm(arm_id)
+        policy.weights[0] = 4.0
+        # Two of four arms are offered: each gets gamma / 4, the rest follows the weights.
+        chosen = policy.select(["A", "B"])
+        expected = {"A": 0.075 + 0.85 * 4.0 / 5.0, "B": 0.075 + 0.85 * 1.0 / 5.0}
+        self.assertAlmostEqual(sum(expected.values()), 1.0)
+        probability = policy.selection_probability
+        self.assertAlmostEqual(probability, expected[chosen])
+
+        policy.update(chosen, 20.0, probability)
+        weight = 4.0 if chosen == "A" else 1.0
+        self.assertAlmostEqual(policy.weights[policy.arms.index(chosen)], weight * math.exp(0.3 / probability / 4))
+
+
+class CognitiveNodeViewTest(unittest.TestCase):
+
+    def test_mab_data_reads_the_policy(self):
+        node = CognitiveNode("A")
+        node.add_link("B", 1.0, 100)
+        node.add_link("C", 1.0, 100)
+        node.update_reward(node.choose_next_hop(), 4.0)
+        node.update_reward("B", 2.0)
+        self.assertEqual(node.mab_data, {"B": {'counts': 2, 'values': 3.0}, "C": {'counts': 0, 'values': 0.0}})
+        self.assertEqual(node.total_pulls, 1)
+        with self.assertRaises(AttributeError):
+            node.total_pulls = 0
+
+
+if __name__ == "__main__":
+    unittest.main()
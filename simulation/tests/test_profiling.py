@@ -0,0 +1,97 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that the profiler restores every callable it wraps exactly, and that
+# sampled timings still count every call.
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp import engine
+from crp.engine import TrafficSimulator
+from crp.network.compact import CompactTopology
+from crp.network.node import Node
+from crp.profiling import Profiler, CHOOSE_NEXT_HOP, DISPATCH, FIND_PATH, LINK_LATENCY, UPDATE_REWARD
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from crp.topology import to_network
+
+
+def line_topology():
+    """GATEWAY_WEST - B - GATEWAY_EAST."""
+    return CompactTopology.from_edges(["GATEWAY_WEST", "B", "GATEWAY_EAST"], [0, 1], [1, 2], [1.0, 2.0],
+                                      [100, 100], gateway_ids=["GATEWAY_WEST", "GATEWAY_EAST"])
+
+
+class InstrumentRestoreTest(unittest.TestCase):
+
+    def test_instance_methods_fall_back_to_the_class(self):
+        network = to_network(line_topology(), CognitiveNode, CognitiveGateway)
+        node = network.get_node("B")
+        with Profiler() as profiler:
+            profiler.instrument_network(network)
+            self.assertIn('choose_next_hop', vars(node))
+            node.update_reward(node.choose_next_hop(), 1.0)
+        self.assertNotIn('choose_next_hop', vars(node))
+        self.assertNotIn('update_reward', vars(node))
+        self.assertIs(node.choose_next_hop.__func__, CognitiveNode.choose_next_hop)
+        self.assertEqual(profiler.subsystems[CHOOSE_NEXT_HOP].calls, 1)
+        self.assertEqual(profiler.subsystems[UPDATE_REWARD].calls, 1)
+
+    def test_own_attributes_are_put_back_as_they_were(self):
+        simulator = TrafficSimulator(to_network(line_topology()))
+        latency_fn = simulator.latency_fn
+        profiler = Profiler()
+        profiler.instrument(simulator, 'latency_fn', LINK_LATENCY)
+        # Wrapping the same attribute twice unwinds in reverse order.
+        profiler.instrument(simulator, 'latency_fn', LINK_LATENCY)
+        profiler.restore()
+        self.assertIs(vars(simulator)['latency_fn'], latency_fn)
+
+    def test_module_functions_are_restored(self):
+        find_path = engine.find_path_dijkstra
+        simulator = TrafficSimulator(to_network(line_topology(), Node))
+        with Profiler() as profiler:
+            profiler.instrument_simulator(simulator)
+            self.assertIsNot(engine.find_path_dijkstra, find_path)
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST")
+            simulator.inject("GATEWAY_EAST", "GATEWAY_WEST")
+            simulator.run()
+        self.assertIs(engine.find_path_dijkstra, find_path)
+        self.assertEqual(profiler.subsystems[FIND_PATH].calls, 2)
+        self.assertEqual(profiler.subsystems[LINK_LATENCY].calls, 4)
+
+    def test_scheduler_handlers_are_restored(self):
+        simulator = TrafficSimulator(to_network(line_topology(), Node))
+        handlers = list(simulator.scheduler._handlers)
+        with Profiler() as profiler:
+            profiler.instrument_scheduler(simulator.scheduler)
+            self.assertNotEqual(simulator.scheduler._handlers, handlers)
+            simulator.inject("GATEWAY_WEST", "GATEWAY_EAST")
+            simulator.run()
+        self.assertEqual(len(simulator.scheduler._handlers), len(handlers))
+        for restored, original in zip(simulator.scheduler._handlers, handlers):
+            self.assertIs(restored, original)
+        self.assertEqual(profiler.subsystems[DISPATCH].calls, simulator.scheduler.events_processed)
+
+
+class SamplingTest(unittest.TestCase):
+
+    def test_every_call_is_counted_and_totals_are_extrapolated(self):
+        profiler = Profiler(sample_every=3)
+        double = profiler.wrap(lambda x: 2 * x, 'double')
+        self.assertEqual([double(k) for k in range(10)], [2 * k for k in range(10)])
+        stats = profiler.subsystems['double']
+        self.assertEqual((stats.calls, stats.sampled), (10, 3))
+        self.assertAlmostEqual(stats.total_ns(), stats.ns / 3 * 10)
+        row = profiler.report()['subsystems'][0]
+        self.assertEqual((row['calls'], row['sampled']), (10, 3))
+
+    def test_sample_every_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            Profiler(sample_every=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
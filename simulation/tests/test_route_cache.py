@@ -0,0 +1,155 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the flow-level route cache: its eviction and invalidation rules, when
+# it trusts a learned route, and that the engine skips decisions for cached flows.
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.network.compact import CompactTopology
+from crp.network.node import Node, Gateway
+from crp.routing.cognitive_node import CognitiveNode, CognitiveGateway
+from crp.routing.q_routing import QRoutingNode, QRoutingGateway
+from crp.routing.route_cache import RouteCache
+from crp.topology import to_network
+
+
+def diamond(node_factory, gateway_factory):
+    """A reaches the gateway D via B (1ms + 1ms) or via C (2ms + 1ms)."""
+    topology = CompactTopology.from_edges(["A", "B", "C", "D"], [0, 0, 1, 2], [1, 2, 3, 3],
+                                          [1.0, 2.0, 1.0, 1.0], [100, 100, 100, 100], gateway_ids=["D"])
+    return to_network(topology, node_factory, gateway_factory)
+
+
+class RouteCacheTest(unittest.TestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = RouteCache(max_entries=2)
+        cache.put("A", "C", ["A", "B", "C"])
+        cache.put("B", "D", ["B", "C", "D"])
+        self.assertEqual(cache.get("A", "C"), ["A", "B", "C"])
+        cache.put("C", "E", ["C", "D", "E"])
+        self.assertNotIn(("B", "D"), cache)
+        self.assertIn(("A", "C"), cache)
+        self.assertIn(("C", "E"), cache)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test_byte_budget_evicts_until_it_fits(self):
+        probe = RouteCache()
+        probe.put("A", "C", ["A", "B", "C"])
+        cache = RouteCache(max_bytes=2 * probe.nbytes)
+        cache.put("A", "C", ["A", "B", "C"])
+        cache.put("B", "D", ["B", "C", "D"])
+        cache.put("C", "E", ["C", "D", "E"])
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(("A", "C"), cache)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        # A route larger than the whole budget is not kept at all.
+        cache.put("A", "Z", [str(i) for i in range(1000)])
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_invalidate_link_drops_routes_crossing_it_in_either_direction(self):
+        cache = RouteCache()
+        cache.put("A", "C", ["A", "B", "C"])
+        cache.put("D", "C", ["D", "B", "C"])
+        cache.put("C", "A", ["C", "B", "A"])
+        cache.put("E", "F", ["E", "F"])
+        cache.invalidate_link("C", "B")
+        self.assertEqual(list(cache._entries), [("E", "F")])
+        self.assertEqual(cache.stats['invalidations'], 3)
+        # Dropped routes leave nothing behind in the link index.
+        self.assertEqual(set(cache._by_link), {("E", "F")})
+        cache.invalidate_link("B", "C")
+        self.assertEqual(cache.stats['invalidations'], 3)
+
+    def test_learned_route_must_be_earned_again_after_revalidate_every_uses(self):
+        cache = RouteCache(revalidate_every=2)
+        cache.put("A", "C", ["A", "B", "C"], learned=True)
+        cache.put("C", "A", ["C", "B", "A"])
+        self.assertEqual(cache.get("A", "C"), ["A", "B", "C"])
+        self.assertEqual(cache.get("A", "C"), ["A", "B", "C"])
+        self.assertIsNone(cache.get("A", "C"))
+        self.assertNotIn(("A", "C"), cache)
+        self.assertEqual(cache.stats['revalidations'], 1)
+        # Static routes are never revalidated.
+        for _ in range(5):
+            self.assertEqual(cache.get("C", "A"), ["C", "B", "A"])
+
+
+class TrustsTest(unittest.TestCase):
+
+    def cognitive(self, reward_b, reward_c, pulls=5):
+        network = diamond(CognitiveNode, CognitiveGateway)
+        a, b = network.get_node("A"), network.get_node("B")
+        for _ in range(pulls):
+            a.update_reward("B", reward_b)
+            a.update_reward("C", reward_c)
+            b.update_reward("D", 10.0)
+        return network
+
+    def test_cognitive_route_needs_pulls_and_a_margin(self):
+        cache = RouteCache(min_pulls=5, min_margin=0.1)
+        self.assertTrue(cache.trusts(self.cognitive(10.0, 5.0), ["A", "B", "D"]))
+        self.assertFalse(cache.trusts(self.cognitive(10.0, 9.5), ["A", "B", "D"]))
+        self.assertFalse(cache.trusts(self.cognitive(10.0, 5.0, pulls=4), ["A", "B", "D"]))
+        self.assertFalse(cache.trusts(self.cognitive(10.0, 5.0), ["A", "B", "A", "B", "D"]))
+
+    def test_q_routing_route_needs_samples_and_a_lower_estimate(self):
+        network = diamond(lambda node_id: QRoutingNode(node_id, epsilon=0.0),
+                          lambda node_id: QRoutingGateway(node_id, epsilon=0.0))
+        a, b = network.get_node("A"), network.get_node("B")
+        cache = RouteCache(min_pulls=3, min_margin=0.1)
+        for _ in range(3):
+            a.update_estimate("B", "D", 1.0, 1.0)
+            a.update_estimate("C", "D", 1.0, 5.0)
+            self.assertFalse(cache.trusts(network, ["A", "B", "D"]))
+            b.update_estimate("D", "D", 1.0, 0.0)
+        # B's estimate via A (where the packet came from) is never a competitor.
+        b.update_estimate("A", "D", 0.1, 0.0)
+        self.assertTrue(cache.trusts(network, ["A", "B", "D"]))
+        self.assertFalse(cache.trusts(network, ["A", "C", "D"]))
+
+    def test_nodes_without_estimates_are_never_trusted(self):
+        network = diamond(Node, Gateway)
+        self.assertFalse(RouteCache(min_pulls=0).trusts(network, ["A", "B", "D"]))
+
+
+class CachedFlowTest(unittest.TestCase):
+
+    def test_cached_flow_skips_routing_decisions(self):
+        network = diamond(lambda node_id: QRoutingNode(node_id, epsilon=0.0),
+                          lambda node_id: QRoutingGateway(node_id, epsilon=0.0))
+        decisions = []
+        for node in network.nodes.values():
+            def counted(*args, choose=node.choose_next_hop, node_id=node.node_id):
+                decisions.append(node_id)
+                return choose(*args)
+            node.choose_next_hop = counted
+        cache = RouteCache(min_pulls=1, min_margin=0.0)
+        simulator = TrafficSimulator(network, route_cache=cache)
+        paths = []
+        simulator.completion_callbacks.append(lambda packet, success: paths.append(list(packet.path_taken)))
+
+        simulator.inject("A", "D")
+        simulator.run()
+        self.assertEqual(len(decisions), 2)
+        self.assertIn(("A", "D"), cache)
+
+        for k in range(5):
+            simulator.inject("A", "D", at=simulator.scheduler.now + k)
+        simulator.run()
+        self.assertEqual(len(decisions), 2)
+        self.assertEqual(paths, [paths[0]] * 6)
+        self.assertEqual(cache.stats['hits'], 5)
+        # Every hop of a cached packet still feeds back.
+        a = network.get_node("A")
+        self.assertEqual(a.estimate(paths[0][1], "D")[1], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
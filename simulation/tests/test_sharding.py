@@ -0,0 +1,137 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the shared-memory ring buffers that carry cross-shard messages, and
+# that sharded runs agree with single-process runs.
+
+import random
+import sys
+import os
+import threading
+import unittest
+from array import array
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.routing.q_routing import QRoutingNode, QRoutingGateway
+from crp.sharding import ShardRing, ShardSimulator, ShardedSimulation, build_shard, partition_by_gateway
+from crp.topology import grid, to_network
+
+
+def node_factory(node_id):
+    return QRoutingNode(node_id, rng=random.Random(node_id))
+
+def gateway_factory(node_id):
+    return QRoutingGateway(node_id, rng=random.Random(node_id))
+
+
+class ShardRingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = ShardRing(capacity=64)
+
+    def tearDown(self):
+        self.ring.close(unlink=True)
+
+    def test_records_wrap_around_the_end(self):
+        # 4-byte length prefix + 20 bytes: the third record straddles the end of the
+        # 64-byte data area, and later rounds keep wrapping at shifting positions.
+        for round_number in range(20):
+            records = [bytes([round_number, i]) * 10 for i in range(2)]
+            for record in records:
+                self.assertTrue(self.ring.put(record))
+            self.assertEqual(self.ring.take(), records)
+        self.assertEqual(self.ring.take(), [])
+
+    def test_full_ring_rejects_records_until_read(self):
+        self.assertTrue(self.ring.put(b'a' * 28))
+        self.assertTrue(self.ring.put(b'b' * 28))
+        self.assertFalse(self.ring.put(b'c'))
+        self.assertEqual(self.ring.take(), [b'a' * 28, b'b' * 28])
+        self.assertTrue(self.ring.put(b'c' * 60))
+        self.assertEqual(self.ring.take(), [b'c' * 60])
+
+    def test_record_larger_than_the_ring_raises(self):
+        with self.assertRaises(ValueError):
+            self.ring.put(b'x' * 61)
+
+
+class ShardedSimulationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.topology = grid(6, 6, seed=5)
+        rng = random.Random(5)
+        node_ids = list(self.topology.node_ids)
+        self.injections = [(k * 0.5,) + tuple(rng.sample(node_ids, 2)) for k in range(300)]
+
+    def setup(self, simulator):
+        """Injects the packets of the simulator's own sources and records how each one finished."""
+        local = simulator.network.nodes
+        for at, source_id, destination_id in self.injections:
+            if source_id in local:
+                simulator.inject(source_id, destination_id, at=at)
+        simulator.finished = []
+        simulator.completion_callbacks.append(lambda packet, success: simulator.finished.append(
+            (packet.packet_id, success, tuple(packet.path_taken), packet.total_latency)))
+
+    def report(self, simulator):
+        return simulator.finished
+
+    def run_single(self):
+        simulator = TrafficSimulator(to_network(self.topology, node_factory, gateway_factory), max_hops=100)
+        self.setup(simulator)
+        simulator.run()
+        return simulator.stats, sorted(simulator.finished)
+
+    def run_sharded(self, partition):
+        result = ShardedSimulation(self.topology, partition, node_factory, gateway_factory,
+                                   setup=self.setup, report=self.report, max_hops=100).run()
+        return result, sorted(record for shard in result['shards'] for record in shard['report'])
+
+    def test_one_shard_matches_the_single_process_run(self):
+        stats, finished = self.run_single()
+        result, sharded = self.run_sharded(array('i', bytes(4 * self.topology.num_nodes)))
+        self.assertEqual(result['stats'], stats)
+        self.assertEqual(sharded, finished)
+
+    def test_two_shards_deliver_every_packet(self):
+        stats, _ = self.run_single()
+        self.assertEqual(stats['delivered'], len(self.injections))
+        result, finished = self.run_sharded(partition_by_gateway(self.topology, 2))
+        self.assertGreater(sum(shard['messages_sent'] for shard in result['shards']), 0)
+        self.assertEqual(result['stats']['injected'], stats['injected'])
+        self.assertEqual(result['stats']['delivered'], stats['delivered'])
+        # Every packet finished exactly once (shards draw packet IDs from disjoint sequences).
+        self.assertEqual(len({record[0] for record in finished}), len(self.injections))
+        self.assertTrue(all(record[1] for record in finished))
+
+    def shard(self, lookahead):
+        partition = array('i', bytes(4 * self.topology.num_nodes))
+        network, owner = build_shard(self.topology, partition, 0, node_factory, gateway_factory)
+        return ShardSimulator(network, 0, owner, lookahead)
+
+    def test_window_horizon_is_exclusive(self):
+        simulator = self.shard(lookahead=5.0)
+        windows = []
+        simulator.scheduler.register(9, lambda _: windows.append(simulator.exchange_stats['rounds']))
+        for at in (0.0, 4.0, 5.0, 12.0):
+            simulator.scheduler.schedule_at(at, 9)
+        rounds = simulator.run_synchronized({}, [], threading.Barrier(1), [0.0], [0])
+        # [0, 5) then [5, 10) then [12, 17): the event at 5 starts the second window.
+        self.assertEqual(windows, [0, 0, 1, 2])
+        self.assertEqual(rounds, 3)
+
+    def test_congestion_cannot_speed_links_up(self):
+        simulator = self.shard(lookahead=1.0)
+        node_id = next(iter(simulator.network.nodes))
+        neighbor_id = next(iter(simulator.network.get_node(node_id).neighbors))
+        with self.assertRaises(ValueError):
+            simulator.set_congestion(node_id, neighbor_id, 0.5)
+        simulator.set_congestion(node_id, neighbor_id, 2.0)
+        simulator.scheduler.schedule(0.0, 3, (node_id, neighbor_id, 0.9))
+        with self.assertRaises(ValueError):
+            simulator.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It round-trips topologies and traces through their binary files.
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.storage import StorageFormatError, Trace, save_topology, load_topology, save_trace, load_trace
+from crp.topology import random_geometric
+
+
+class StorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_topology_round_trip(self):
+        topology = random_geometric(300, seed=3)
+        save_topology(topology, self.path("mesh.crpt"))
+        for use_mmap in (True, False):
+            loaded = load_topology(self.path("mesh.crpt"), use_mmap=use_mmap)
+            self.assertEqual(list(loaded.node_ids), list(topology.node_ids))
+            for name in ('is_gateway', 'offsets', 'neighbors', 'latency', 'bandwidth'):
+                self.assertEqual(list(getattr(loaded, name)), list(getattr(topology, name)), name)
+            del loaded
+
+    def test_trace_round_trip_sorts_by_time(self):
+        trace = Trace()
+        trace.add_injection(5.0, 0, 1)
+        trace.add_link_change(1.0, 2, 3, 10.0)
+        trace.add_injection(1.0, 1, 0)
+        save_trace(trace, self.path("run.crpx"))
+        loaded = load_trace(self.path("run.crpx"))
+        self.assertEqual(list(loaded.times), [1.0, 1.0, 5.0])
+        self.assertEqual(list(loaded.kinds), [1, 0, 0])
+        self.assertEqual(list(loaded.a), [2, 1, 0])
+        self.assertEqual(list(loaded.b), [3, 0, 1])
+        self.assertEqual(list(loaded.values), [10.0, 0.0, 0.0])
+        del loaded
+
+    def test_truncated_files_raise_storage_format_error(self):
+        save_topology(random_geometric(50, seed=3), self.path("mesh.crpt"))
+        trace = Trace()
+        trace.add_injection(1.0, 0, 1)
+        save_trace(trace, self.path("run.crpx"))
+        for name, load in (("mesh.crpt", load_topology), ("run.crpx", load_trace)):
+            with open(self.path(name), 'rb') as f:
+                data = f.read()
+            # Cut inside the header, inside the columns, and to nothing at all.
+            for size in (10, len(data) - 9, 0):
+                with open(self.path("cut"), 'wb') as f:
+                    f.write(data[:size])
+                for use_mmap in (True, False):
+                    with self.assertRaises(StorageFormatError):
+                        load(self.path("cut"), use_mmap=use_mmap)
+
+
+if __name__ == "__main__":
+    unittest.main()
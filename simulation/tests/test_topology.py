@@ -0,0 +1,66 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks the argument validation of the synthetic topology generators and the
+# structure of the hierarchical DePIN layout.
+
+import random
+import sys
+import os
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.topology import random_geometric, barabasi_albert, grid, hierarchical_depin, _components
+
+
+class GeneratorArgumentsTest(unittest.TestCase):
+
+    def test_invalid_arguments_raise_value_error(self):
+        invalid = [
+            lambda: random_geometric(0),
+            lambda: random_geometric(10, mean_degree=0.0),
+            lambda: random_geometric(3, num_gateways=5),
+            lambda: barabasi_albert(3, m=3),
+            lambda: barabasi_albert(10, m=0),
+            lambda: grid(0, 5),
+            lambda: grid(1, 1),
+            lambda: hierarchical_depin(0, 10),
+            lambda: hierarchical_depin(2, 10, gateways_per_region=0),
+            lambda: hierarchical_depin(2, 1, gateways_per_region=2),
+        ]
+        for make in invalid:
+            with self.assertRaises(ValueError):
+                make()
+
+    def test_smallest_valid_graphs(self):
+        self.assertEqual(random_geometric(1, num_gateways=1).num_nodes, 1)
+        self.assertEqual(barabasi_albert(4, m=3).num_edges, 12)
+        self.assertEqual(grid(1, 2).num_edges, 2)
+        self.assertEqual(hierarchical_depin(1, 1).num_nodes, 1)
+
+
+class HierarchicalDepinTest(unittest.TestCase):
+
+    def test_sparse_regions_are_connected(self):
+        for seed in range(5):
+            # At mean degree 2 every regional mesh falls into many components.
+            self.assertGreater(len(_components(random_geometric(100, 2.0, seed=seed))), 1)
+            topology = hierarchical_depin(4, 100, gateways_per_region=2, mean_degree=2.0, seed=seed)
+            self.assertEqual(len(_components(topology)), 1)
+
+    def test_regional_links_keep_their_properties(self):
+        topology = hierarchical_depin(3, 60, seed=7)
+        # The first region is generated from the first seed drawn.
+        local = random_geometric(60, 6.0, 1, random.Random(7).getrandbits(64))
+        region_ids = ["GATEWAY_0_0"] + [f"NODE_0_{k}" for k in range(1, 60)]
+        for a in range(local.num_nodes):
+            for slot in local.edge_slots(a):
+                b = local.neighbors[slot]
+                copied = topology.find_slot(topology.get_index(region_ids[a]), topology.get_index(region_ids[b]))
+                self.assertGreaterEqual(copied, 0)
+                self.assertEqual(topology.latency[copied], local.latency[slot])
+                self.assertEqual(topology.bandwidth[copied], local.bandwidth[slot])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# Note: This file has no dependencies other than Python's standard library.
+# It checks that the arrival processes keep their flow's mean rate, the shape of
+# the traffic-matrix builders, and the split of flows no path can deliver.
+
+import itertools
+import os
+import random
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crp.engine import TrafficSimulator
+from crp.network.compact import CompactTopology
+from crp.topology import to_network
+from crp.workload import OnOffArrivals, ParetoArrivals, PoissonArrivals, TrafficMatrix, Workload
+
+
+class ArrivalRateTest(unittest.TestCase):
+
+    def mean_rate(self, arrivals, rate, samples):
+        gaps = arrivals.gaps(rate, random.Random(42))
+        return samples / sum(itertools.islice(gaps, samples))
+
+    def test_poisson_keeps_the_mean_rate(self):
+        self.assertAlmostEqual(self.mean_rate(PoissonArrivals(), 2.0, 50000), 2.0, delta=0.04)
+
+    def test_on_off_keeps_the_mean_rate(self):
+        # Bursts make the estimate noisier, so it needs many more arrivals.
+        self.assertAlmostEqual(self.mean_rate(OnOffArrivals(mean_on=5.0, mean_off=20.0), 0.5, 200000), 0.5,
+                               delta=0.015)
+
+    def test_pareto_keeps_the_mean_rate(self):
+        # A shape above 2 keeps the variance finite, so the sample mean settles.
+        self.assertAlmostEqual(self.mean_rate(ParetoArrivals(shape=3.0), 4.0, 100000), 4.0, delta=0.08)
+
+    def test_pareto_rejects_an_infinite_mean(self):
+        with self.assertRaises(ValueError):
+            ParetoArrivals(shape=1.0)
+
+
+class TrafficMatrixTest(unittest.TestCase):
+
+    def test_uniform_covers_every_ordered_pair(self):
+        matrix = TrafficMatrix.uniform(["A", "B", "C", "D"], 6.0)
+        self.assertEqual(len(matrix), 12)
+        self.assertEqual(len({(s, d) for s, d, _ in matrix}), 12)
+        self.assertTrue(all(s != d and rate == 0.5 for s, d, rate in matrix))
+
+        to_gateways = TrafficMatrix.uniform(["A", "B", "C"], 2.0, destinations=["C", "G"])
+        self.assertEqual(sorted((s, d) for s, d, _ in to_gateways),
+                         [("A", "C"), ("A", "G"), ("B", "C"), ("B", "G"), ("C", "G")])
+        self.assertAlmostEqual(to_gateways.total_rate(), 2.0)
+
+    def test_gravity_is_proportional_to_both_weights(self):
+        matrix = TrafficMatrix.gravity({"G": 4.0, "A": 1.0, "B": 1.0, "Z": 0.0}, 10.0)
+        rates = {(s, d): rate for s, d, rate in matrix}
+        # Flows to or from a weightless node carry nothing and are left out.
+        self.assertEqual(len(matrix), 6)
+        self.assertAlmostEqual(matrix.total_rate(), 10.0)
+        self.assertAlmostEqual(rates[("G", "A")], 4.0 * rates[("A", "B")])
+        self.assertEqual(rates[("G", "A")], rates[("A", "G")])
+
+    def test_split_routable(self):
+        # A-B and C-D are two separate islands.
+        topology = CompactTopology.from_edges(["A", "B", "C", "D"], [0, 2], [1, 3], [1.0, 1.0], [100, 100])
+        matrix = TrafficMatrix([("A", "B", 1.0), ("A", "C", 2.0), ("D", "C", 3.0), ("A", "X", 4.0)])
+        for network in (topology, to_network(topology)):
+            routable, unroutable = matrix.split_routable(network)
+            self.assertEqual(list(routable), [("A", "B", 1.0), ("D", "C", 3.0)])
+            self.assertEqual(list(unroutable), [("A", "C", 2.0), ("A", "X", 4.0)])
+
+
+class WorkloadTest(unittest.TestCase):
+
+    def test_streams_the_offered_load(self):
+        topology = CompactTopology.from_edges(["A", "B", "C"], [0, 1], [1, 2], [1.0, 1.0], [100, 100])
+        simulator = TrafficSimulator(to_network(topology))
+        matrix = TrafficMatrix([("A", "C", 1.0), ("C", "B", 0.5), ("B", "A", 0.0)])
+        workload = Workload(simulator, matrix, rng=random.Random(1), until=2000.0)
+        workload.start()
+        simulator.run()
+        self.assertAlmostEqual(workload.flow_packets[0] / 2000.0, 1.0, delta=0.1)
+        self.assertAlmostEqual(workload.flow_packets[1] / 2000.0, 0.5, delta=0.05)
+        self.assertEqual(workload.flow_packets[2], 0)
+        self.assertEqual(simulator.stats['delivered'], workload.injected)
+
+    def test_max_packets_stops_every_flow(self):
+        topology = CompactTopology.from_edges(["A", "B"], [0], [1], [1.0], [100])
+        simulator = TrafficSimulator(to_network(topology))
+        workload = Workload(simulator, TrafficMatrix.uniform(["A", "B"], 4.0), rng=random.Random(2),
+                            max_packets=25)
+        workload.start()
+        simulator.run()
+        self.assertEqual(workload.injected, 25)
+        self.assertEqual(simulator.scheduler.pending(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()